@@ -0,0 +1,127 @@
+"""
+This module defines base authentication classes for all packages.
+
+Views requiring authentication should use `AUTHENTICATION_CLASSES`,
+read-only views may use `READ_AUTHENTICATION_CLASSES`, which also accept signed access tokens.
+"""
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    BaseAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.exceptions import AuthenticationFailed
+
+from base_idcu.lib.cache import MISSING, TwoTierCache
+from users import exceptions
+from users.lib.access_tokens import parse_access_token
+from users.models import AuthToken
+
+token_cache = TwoTierCache(
+    namespace="auth-token",
+    local_ttl=settings.AUTH_TOKEN_LOCAL_CACHE_TTL,
+    shared_ttl=settings.AUTH_TOKEN_CACHE_TTL,
+    max_size=settings.AUTH_TOKEN_LOCAL_CACHE_SIZE,
+)
+
+
+def invalidate_cached_tokens(keys: list[str]) -> None:
+    """
+    Drop cached tokens.
+
+    :param keys: Token keys to drop.
+    """
+    for key in keys:
+        token_cache.delete(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication with expiring `AuthToken`, caching token with its user (without password hash)
+    and user's company (with IBANs, without order counters).
+
+    Tokens are cached shortly in a local LRU and in the shared cache,
+    cache is invalidated on token deletion and user or company changes (see `users.signals`).
+    """
+
+    model = AuthToken
+
+    def authenticate_credentials(self, key: str):
+        """
+        Authenticate the token key.
+
+        :param key: Token key.
+        :return: Tuple of user and token.
+
+        :raises AuthenticationFailed: If token is invalid, expired or user is inactive.
+        """
+        token = token_cache.get(key)
+        if token is MISSING:
+            model = self.get_model()
+            try:
+                token = (
+                    model.objects.select_related("user__company")
+                    .prefetch_related("user__company__iban_set__bank")
+                    .defer("user__password")
+                    .get(key=key)
+                )
+            except model.DoesNotExist:
+                raise AuthenticationFailed(_("Invalid token."))
+
+            token_cache.set(key, token)
+
+        if token.is_expired:
+            raise AuthenticationFailed(_("Token expired."))
+
+        if not token.user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+
+        return token.user, token
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authentication with signed access tokens (`Authorization: Bearer <token>`), verified without DB lookups.
+
+    User is built from token claims, it has only `id` and `company_id` set and must not be saved,
+    so this authentication is meant for read-only views.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        """
+        Authenticate the request.
+
+        :param request: The DRF request.
+        :return: Tuple of user and `AccessToken`, None if request has no bearer token.
+
+        :raises AuthenticationFailed: If token is invalid, expired or revoked.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed(_("Invalid bearer header."))
+
+        try:
+            access_token = parse_access_token(auth[1].decode())
+        except (exceptions.AccessTokenError, UnicodeError, ValueError) as exc:
+            raise AuthenticationFailed(getattr(exc, "detail", _("Invalid access token.")))
+
+        return access_token.get_user(), access_token
+
+    def authenticate_header(self, request) -> str:
+        """Value of `WWW-Authenticate` header."""
+        return self.keyword
+
+
+AUTHENTICATION_CLASSES = [SessionAuthentication, CachedTokenAuthentication]
+READ_AUTHENTICATION_CLASSES = [
+    *AUTHENTICATION_CLASSES,
+    *([SignedTokenAuthentication] if settings.ACCESS_TOKENS_ENABLED else []),
+]
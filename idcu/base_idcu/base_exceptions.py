@@ -25,3 +25,27 @@ class PermissionNotPermitted(WebHttpException):
     status_code = 404
     default_detail = "User have not access to requested data."
     default_code = "access_not_permitted"
+
+
+class InvalidIdempotencyKeyError(WebHttpException):
+    """Raised when `Idempotency-Key` header is malformed."""
+
+    status_code = 400
+    default_detail = "Idempotency key must be 1-255 printable ASCII characters."
+    default_code = "invalid_idempotency_key"
+
+
+class IdempotencyKeyInUseError(WebHttpException):
+    """Raised when request with the same idempotency key is still processed."""
+
+    status_code = 409
+    default_detail = "A request with this idempotency key is in progress, retry later."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyReusedError(WebHttpException):
+    """Raised when idempotency key is reused for a different request."""
+
+    status_code = 422
+    default_detail = "Idempotency key was already used for a different request."
+    default_code = "idempotency_key_reused"
@@ -3,11 +3,13 @@ This module defines base permission rules around all packages.
 
 In our project, all view entries (which needs authentication)
 should be checked, that request.user has an access to the company he's making request for.
+
+Company resolved by the permission is kept in the request-scoped identity map,
+so views and services reuse it without querying it again.
 """
 
-from rest_framework import permissions
-from django.shortcuts import get_object_or_404
-from companies.models import Company
+from rest_framework import exceptions, permissions
+from companies.repositories import CompanyRepository
 from base_idcu.views.base import get_request_payload
 from base_idcu.base_exceptions import PermissionNotPermitted
 
@@ -25,16 +27,16 @@ class HasSpecificCompanyPermission(permissions.BasePermission):
         :param view: The DRF view.
         :return: True, if access permitted.
 
-        :raises PermissionNotPermitted: If user has not access to requested company, or company's data.
+        :raises NotFound: If company doesn't exist, or user has not access to requested company, or company's data.
         """
-        vat_number = get_request_payload(request)["vat_number"]
+        vat_number = get_request_payload(request).get("vat_number")
 
         if vat_number is None:
             return False
 
-        company = get_object_or_404(Company, vat_number=vat_number)
+        company = CompanyRepository().get_company_by_vat(vat_number=vat_number)
 
-        if request.user.company != company:
-            raise PermissionNotPermitted
+        if company is None or request.user.company_id != company.id:
+            raise exceptions.NotFound(PermissionNotPermitted.default_detail)
 
         return True
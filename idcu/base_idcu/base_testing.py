@@ -0,0 +1,70 @@
+"""
+Test helpers for `idcu` project.
+
+`QueryCountSnapshotMixin` snapshots per-endpoint query counts into a JSON file committed next to the tests,
+so query count regressions (including new N+1 patterns) fail the suite:
+
+    class OrderEndpointsTest(QueryCountSnapshotMixin, TestCase):
+        query_snapshot_path = Path(__file__).with_name("query_counts.json")
+
+        def test_get_orders(self):
+            with self.assertQueryCountSnapshot("get-orders"):
+                self.client.get("/documents/get-orders", headers=self.auth_headers)
+
+New snapshots are recorded on first run, run tests with `UPDATE_QUERY_SNAPSHOTS=1` to update changed ones.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from base_idcu.lib.queries import QueryLog, query_log_scope, track_queries
+
+__all__ = [
+    "QueryCountSnapshotMixin",
+]
+
+
+class QueryCountSnapshotMixin:
+    """Mixin for `TestCase` classes asserting query counts against snapshots."""
+
+    query_snapshot_path: Path
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._query_snapshots = json.loads(cls.query_snapshot_path.read_text()) if cls.query_snapshot_path.exists() else {}
+        cls._query_snapshots_changed = False
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if cls._query_snapshots_changed:
+            cls.query_snapshot_path.write_text(json.dumps(cls._query_snapshots, indent=2, sort_keys=True) + "\n")
+        super().tearDownClass()
+
+    @contextmanager
+    def assertQueryCountSnapshot(self, name: str) -> Iterator[QueryLog]:
+        """
+        Assert count of queries run within the context equals the snapshot.
+
+        :param name: Snapshot name, e.g. endpoint name.
+        :return: Query log of the context.
+        """
+        query_log = QueryLog()
+        with track_queries(), query_log_scope(query_log):
+            yield query_log
+
+        expected = self._query_snapshots.get(name)
+        if expected is None or os.environ.get("UPDATE_QUERY_SNAPSHOTS"):
+            self._query_snapshots[name] = query_log.count
+            type(self)._query_snapshots_changed = expected != query_log.count or self._query_snapshots_changed
+            return
+
+        if query_log.count != expected:
+            shapes = "\n".join(f"{count} x {shape}" for shape, count in query_log.shapes.most_common())
+            self.fail(
+                f"`{name}` ran {query_log.count} queries, snapshot is {expected}. "
+                f"Run with UPDATE_QUERY_SNAPSHOTS=1 if the change is intended. Queries:\n{shapes}"
+            )
@@ -0,0 +1,107 @@
+"""
+This module defines base throttle classes for all packages.
+
+Throttles run before request deserialization, so over-limit requests are rejected
+without any DB or password hashing work. Views set `throttle_scope`, and limits are
+configured in `THROTTLE_RATES` as `<scope>_<ident>` entries, e.g. `login_ip`.
+"""
+
+from django.conf import settings
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+from base_idcu.lib.throttling import get_throttle_store
+from base_idcu.views.base import get_request_payload
+
+PERIODS = {"s": 1, "min": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """
+    Parse rate, e.g. `10/min`.
+
+    :param rate: Count of requests per period (`s`, `min`, `h` or `d`).
+    :return: Count of requests and period in seconds.
+    """
+    count, period = rate.split("/")
+    return int(count), PERIODS[period]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle.
+
+    Bucket capacity is the count of requests of the rate (allowed burst),
+    the bucket is refilled evenly over the rate period.
+    Subclasses provide `ident_name` and `get_ident_value`.
+    """
+
+    ident_name: str
+
+    def __init__(self) -> None:
+        self.wait_seconds: float | None = None
+
+    def get_ident_value(self, request: Request) -> str | None:
+        """
+        Get value the requests are limited by.
+
+        :param request: The DRF request.
+        :return: Value, None to skip throttling.
+        """
+        raise NotImplementedError("get_ident_value is not implemented")
+
+    def allow_request(self, request: Request, view) -> bool:
+        """
+        Take a token from the request's bucket.
+
+        :param request: The DRF request.
+        :param view: The DRF view.
+        :return: True, if request is allowed.
+        """
+        scope = f"{view.throttle_scope}_{self.ident_name}"
+        rate = settings.THROTTLE_RATES.get(scope)
+        if not rate:
+            return True
+
+        ident_value = self.get_ident_value(request)
+        if ident_value is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        self.wait_seconds = get_throttle_store().consume(
+            key=f"throttle:{scope}:{ident_value}",
+            capacity=capacity,
+            refill_rate=capacity / period,
+        )
+        return self.wait_seconds == 0
+
+    def wait(self) -> float | None:
+        """Seconds until the next request is allowed."""
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Limits requests per client IP (honors `X-Forwarded-For` with `NUM_PROXIES` DRF setting)."""
+
+    ident_name = "ip"
+
+    def get_ident_value(self, request: Request) -> str | None:
+        """Get client IP."""
+        return self.get_ident(request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    """Limits requests per `email` of the request payload."""
+
+    ident_name = "email"
+
+    def get_ident_value(self, request: Request) -> str | None:
+        """Get normalized email."""
+        email = get_request_payload(request).get("email")
+        if not isinstance(email, str) or not email.strip():
+            return None
+
+        return email.strip().lower()
+
+
+THROTTLE_CLASSES = [IPTokenBucketThrottle, EmailTokenBucketThrottle]
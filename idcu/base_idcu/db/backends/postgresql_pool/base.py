@@ -0,0 +1,36 @@
+"""
+PostgreSQL backend taking connections from an in-process pool (see `base_idcu.lib.db_pool`).
+
+Closing the Django connection (at the end of every request, as `CONN_MAX_AGE` is 0) returns it to the pool
+instead of closing it. Pool is configured by the `POOL` key of the database settings:
+
+    DATABASES = {"default": {"ENGINE": "base_idcu.db.backends.postgresql_pool", ..., "POOL": {"MAX_SIZE": 10}}}
+"""
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from base_idcu.lib.db_pool import ConnectionPool, get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL database wrapper using pooled connections."""
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """Connection pool of the database alias."""
+        return get_pool(self.alias, self.settings_dict.get("POOL", {}))
+
+    def get_new_connection(self, conn_params):
+        """Take connection from the pool, opening a new one if no idle one is available."""
+        connection = self.pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        """Return connection to the pool."""
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
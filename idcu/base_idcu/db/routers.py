@@ -0,0 +1,34 @@
+"""Database routers for `idcu` project."""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from base_idcu.lib.replicas import REPLICA_DB, get_routing_state
+
+
+class ReplicaRouter:
+    """
+    Routes reads of read-only `IDCUView` requests to the replica, everything else to the primary.
+
+    See `base_idcu.lib.replicas` for when a request reads from the replica.
+    """
+
+    def db_for_read(self, model, **hints) -> str:
+        """Read from the replica if the current request is routed there."""
+        state = get_routing_state()
+        return state.read_db if state is not None else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        """Write to the primary, following reads of the request go to the primary too."""
+        state = get_routing_state()
+        if state is not None:
+            state.mark_write()
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """Primary and replica hold the same data."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        """Migrate the primary only."""
+        return db != REPLICA_DB
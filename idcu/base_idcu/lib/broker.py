@@ -0,0 +1,237 @@
+"""
+Event brokers used to push events to long-lived (SSE) subscribers.
+
+Subscribers are asyncio queues living on the event loop of the ASGI process.
+Publishers are regular (sync) code paths, usually called from `transaction.on_commit`.
+
+Two backends are available:
+ - `InProcessBroker` fans events out only inside the current process (development, tests).
+ - `PostgresBroker` sends events with `pg_notify` and keeps a single `LISTEN` connection
+   per process, so any worker can publish and every ASGI process receives the event.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "InProcessBroker",
+    "PostgresBroker",
+    "get_broker",
+]
+
+BROKER_BACKENDS = {
+    "inprocess": "base_idcu.lib.broker.InProcessBroker",
+    "postgres": "base_idcu.lib.broker.PostgresBroker",
+}
+
+
+class InProcessBroker:
+    """Broker delivering events to subscribers of the current process."""
+
+    def __init__(self, channel: str, queue_size: int = 100) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to the topic for the lifetime of the context.
+
+        :param topic: The topic to receive events for.
+        :return: Queue receiving published events.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (loop, queue)
+
+        await self._on_subscribe(loop)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                topic_subscribers = self._subscribers.get(topic, set())
+                topic_subscribers.discard(subscriber)
+                if not topic_subscribers:
+                    self._subscribers.pop(topic, None)
+
+    def publish(self, topic: str, event: dict[str, Any]) -> None:
+        """
+        Publish an event for the topic.
+
+        Safe to call from any thread.
+
+        :param topic: The topic to publish event to.
+        :param event: JSON serializable event.
+        """
+        self._dispatch(topic, event)
+
+    def _dispatch(self, topic: str, event: dict[str, Any]) -> None:
+        """Deliver event to local subscribers of the topic."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._deliver, queue, event)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: dict[str, Any]) -> None:
+        """Put event to the subscriber queue, dropping it for too slow subscribers."""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropping event for slow subscriber, queue is full.")
+
+    async def _on_subscribe(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Hook called before a subscriber is registered."""
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Broker using Postgres `LISTEN/NOTIFY`.
+
+    A single listening connection is kept per process and read with `loop.add_reader`,
+    so idle subscribers cost nothing but their queue.
+    """
+
+    reconnect_delay = 3
+    max_reconnect_delay = 60
+
+    def __init__(self, channel: str, queue_size: int = 100) -> None:
+        super().__init__(channel, queue_size)
+        self._listen_connection = None
+        self._listen_loop: asyncio.AbstractEventLoop | None = None
+        # Serializes opening the connection, so concurrent first subscribers share one.
+        self._connect_lock: asyncio.Lock | None = None
+        self._connect_lock_loop: asyncio.AbstractEventLoop | None = None
+        self._reconnect_task: asyncio.Task | None = None
+
+    def publish(self, topic: str, event: dict[str, Any]) -> None:
+        """
+        Publish an event for the topic with `pg_notify`.
+
+        :param topic: The topic to publish event to.
+        :param event: JSON serializable event (payload must stay under 8000 bytes).
+        """
+        payload = json.dumps({"topic": topic, "event": event}, default=str)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    async def _on_subscribe(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start listening on the first subscription of the event loop."""
+        if self._listen_loop is loop and self._listen_connection is not None:
+            return
+
+        if self._connect_lock_loop is not loop:
+            self._connect_lock, self._connect_lock_loop = asyncio.Lock(), loop
+
+        async with self._connect_lock:
+            if self._listen_loop is loop and self._listen_connection is not None:
+                return
+
+            await loop.run_in_executor(None, self._connect)
+            self._listen_loop = loop
+            loop.add_reader(self._listen_connection.fileno(), self._on_readable)
+
+    def _connect(self) -> None:
+        """Open the dedicated `LISTEN` connection."""
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        db_settings = settings.DATABASES["default"]
+        listen_connection = psycopg2.connect(
+            dbname=db_settings["NAME"],
+            user=db_settings["USER"],
+            password=db_settings["PASSWORD"],
+            host=db_settings["HOST"],
+            port=db_settings["PORT"],
+        )
+        listen_connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with listen_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+
+        self._listen_connection = listen_connection
+
+    def _on_readable(self) -> None:
+        """Read pending notifications and dispatch them to local subscribers."""
+        try:
+            self._listen_connection.poll()
+        except Exception:  # noqa: BLE001 - connection is dropped and re-opened below
+            logger.exception("Lost `LISTEN` connection, reconnecting.")
+            self._reset()
+            return
+
+        while self._listen_connection.notifies:
+            notify = self._listen_connection.notifies.pop(0)
+            message = json.loads(notify.payload)
+            self._dispatch(message["topic"], message["event"])
+
+    def _reset(self) -> None:
+        """Drop the listening connection and schedule reconnect."""
+        loop = self._listen_loop
+        loop.remove_reader(self._listen_connection.fileno())
+        self._listen_connection.close()
+        self._listen_connection = None
+        self._schedule_reconnect(loop, self.reconnect_delay)
+
+    def _schedule_reconnect(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """
+        Schedule reconnect of the listening connection.
+
+        :param loop: Event loop of the subscribers.
+        :param delay: Seconds to wait before reconnecting.
+        """
+        def reconnect() -> None:
+            # Referenced, so the task isn't garbage collected while pending.
+            self._reconnect_task = loop.create_task(self._reconnect(loop, delay))
+
+        loop.call_later(delay, reconnect)
+
+    async def _reconnect(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """
+        Reconnect the listening connection, retrying with doubled delay (up to `max_reconnect_delay`) on failure.
+
+        :param loop: Event loop of the subscribers.
+        :param delay: Seconds waited before this attempt.
+        """
+        try:
+            await self._on_subscribe(loop)
+        except Exception:  # noqa: BLE001 - subscribers get no events until reconnected, so keep retrying
+            next_delay = min(delay * 2, self.max_reconnect_delay)
+            logger.exception("Reconnecting `LISTEN` connection failed, retrying in %ss.", next_delay)
+            self._schedule_reconnect(loop, next_delay)
+
+
+_broker: InProcessBroker | None = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> InProcessBroker:
+    """
+    Get the process-wide broker configured with `EVENT_BROKER_BACKEND`.
+
+    :return: Broker instance.
+    """
+    global _broker
+
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_cls = import_string(BROKER_BACKENDS[settings.EVENT_BROKER_BACKEND])
+                _broker = broker_cls(channel=settings.EVENT_BROKER_CHANNEL)
+
+    return _broker
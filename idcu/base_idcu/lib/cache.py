@@ -0,0 +1,184 @@
+"""
+Caching helpers for `idcu` project.
+
+`TwoTierCache` keeps hot values in a small per-process LRU in front of the shared Django cache.
+Local entries can't be invalidated across processes, so they should live only for a few seconds.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache import caches
+
+__all__ = [
+    "LocalLRUCache",
+    "TwoTierCache",
+    "MISSING",
+]
+
+MISSING = object()
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """
+        Get value for the key.
+
+        :param key: Cache key.
+        :return: Cached value or `MISSING`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Set value for the key.
+
+        :param key: Cache key.
+        :param value: Value to cache.
+        :param ttl: Time to live in seconds.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """
+        Delete the key.
+
+        :param key: Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all keys."""
+        with self._lock:
+            self._entries.clear()
+
+
+class TwoTierCache:
+    """
+    Local LRU cache in front of the shared Django cache.
+
+    Local tier keeps values pickled, so every caller gets its own copy (e.g. of model instances),
+    the same way as with the shared cache.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local_ttl: float,
+        shared_ttl: float,
+        max_size: int = 1024,
+        cache_alias: str = "default",
+    ) -> None:
+        self.namespace = namespace
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.cache_alias = cache_alias
+        self.local = LocalLRUCache(max_size=max_size)
+
+    @property
+    def shared(self):
+        """Shared Django cache."""
+        return caches[self.cache_alias]
+
+    def make_key(self, key: str) -> str:
+        """
+        Make namespaced cache key.
+
+        :param key: Key within the namespace.
+        :return: Cache key.
+        """
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        """
+        Get value, looking into local cache first.
+
+        :param key: Key within the namespace.
+        :return: Cached value or `MISSING`.
+        """
+        cache_key = self.make_key(key)
+        pickled = self.local.get(cache_key)
+        if pickled is not MISSING:
+            return pickle.loads(pickled)
+
+        value = self.shared.get(cache_key, MISSING)
+        if value is not MISSING:
+            self.local.set(cache_key, pickle.dumps(value), self.local_ttl)
+
+        return value
+
+    async def aget(self, key: str) -> Any:
+        """
+        Async version of `get`, the shared cache is called without blocking the event loop.
+
+        :param key: Key within the namespace.
+        :return: Cached value or `MISSING`.
+        """
+        cache_key = self.make_key(key)
+        pickled = self.local.get(cache_key)
+        if pickled is not MISSING:
+            return pickle.loads(pickled)
+
+        value = await self.shared.aget(cache_key, MISSING)
+        if value is not MISSING:
+            self.local.set(cache_key, pickle.dumps(value), self.local_ttl)
+
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Set value to both tiers.
+
+        :param key: Key within the namespace.
+        :param value: Value to cache.
+        """
+        cache_key = self.make_key(key)
+        self.shared.set(cache_key, value, self.shared_ttl)
+        self.local.set(cache_key, pickle.dumps(value), self.local_ttl)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """
+        Async version of `set`.
+
+        :param key: Key within the namespace.
+        :param value: Value to cache.
+        """
+        cache_key = self.make_key(key)
+        await self.shared.aset(cache_key, value, self.shared_ttl)
+        self.local.set(cache_key, pickle.dumps(value), self.local_ttl)
+
+    def delete(self, key: str) -> None:
+        """
+        Delete value from both tiers (local tier of the current process only).
+
+        :param key: Key within the namespace.
+        """
+        cache_key = self.make_key(key)
+        self.shared.delete(cache_key)
+        self.local.delete(cache_key)
@@ -0,0 +1,62 @@
+"""
+Per-request dependency container for views.
+
+Views are instantiated for every request, `RequestScoped` attributes build their dependency (e.g. a service
+with its repositories) on first access by the view instance, so no service instance is shared between requests
+or threads of `gthread` workers:
+
+    class BaseCompanyView(APIView):
+        service_class = RequestScoped(CompanyServices)
+
+Tests can replace the dependency with `RequestScoped.override`.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Generic, Iterator, TypeVar, overload
+
+__all__ = [
+    "RequestScoped",
+]
+
+T = TypeVar("T")
+
+
+class RequestScoped(Generic[T]):
+    """View attribute holding a dependency built once per view instance, i.e. per request."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        """
+        :param factory: Builds the dependency, e.g. service class.
+        """
+        self.factory = factory
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, view: None, owner: type) -> "RequestScoped[T]": ...
+
+    @overload
+    def __get__(self, view: Any, owner: type) -> T: ...
+
+    def __get__(self, view, owner=None):
+        """Build the dependency and store it on the view instance, so later accesses skip the descriptor."""
+        if view is None:
+            return self
+
+        dependency = view.__dict__[self.name] = self.factory()
+        return dependency
+
+    @contextmanager
+    def override(self, factory: Callable[[], T]) -> Iterator[None]:
+        """
+        Build dependencies with another factory within the context, e.g. a stub in tests.
+
+        :param factory: Replacement factory.
+        """
+        original, self.factory = self.factory, factory
+        try:
+            yield
+        finally:
+            self.factory = original
@@ -0,0 +1,168 @@
+"""
+In-process pool of database connections.
+
+Used by `base_idcu.db.backends.postgresql_pool` backend, so threads of a worker process (gthread/ASGI workers)
+share a bounded set of open connections instead of connecting for every request. Connections are checked when
+taken from the pool: closed or broken ones are dropped, ones idle longer than `check_after` seconds are pinged,
+ones older than `max_lifetime` seconds are recycled (e.g. to pick up RDS failover or rotated credentials).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from django.db import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+__all__ = [
+    "ConnectionPool",
+    "PoolTimeout",
+    "get_pool",
+]
+
+_pools: dict[tuple[str, int], "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """No pooled connection was released in time."""
+
+
+class ConnectionPool:
+    """Bounded pool of DB-API connections."""
+
+    def __init__(self, max_size: int, timeout: float, max_lifetime: float, check_after: float) -> None:
+        """
+        :param max_size: Max count of open connections, in use and idle.
+        :param timeout: Seconds to wait for a connection when all are in use.
+        :param max_lifetime: Seconds after which connection is closed instead of returned to the pool.
+        :param check_after: Seconds of idling after which connection is pinged before it's used.
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # (connection, connected at, released at), most recently released last.
+        self._idle: deque[tuple[Any, float, float]] = deque()
+        self._connected_at: dict[int, float] = {}
+
+    def acquire(self, connect: Callable[[], Any]) -> Any:
+        """
+        Take idle connection from the pool or open a new one.
+
+        :param connect: Opens new connection.
+        :return: Connection.
+
+        :raises PoolTimeout: If all connections stayed in use for `timeout` seconds.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"No database connection was released within {self.timeout}s (pool size {self.max_size}).")
+
+        try:
+            while idle := self._pop_idle():
+                connection, idle_for = idle
+                if self._is_usable(connection, idle_for):
+                    return connection
+                self._discard(connection)
+
+            connection = connect()
+            with self._lock:
+                self._connected_at[id(connection)] = time.monotonic()
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: Any) -> None:
+        """
+        Return connection to the pool, rolling back unfinished transaction.
+
+        :param connection: Connection taken with `acquire`.
+        """
+        try:
+            now = time.monotonic()
+            connected_at = self._connected_at.get(id(connection), now)
+            if connection.closed or now - connected_at > self.max_lifetime:
+                self._discard(connection)
+                return
+
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except Exception:
+                    self._discard(connection)
+                    return
+
+            with self._lock:
+                self._idle.append((connection, connected_at, now))
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close idle connections."""
+        while idle := self._pop_idle():
+            self._discard(idle[0])
+
+    def _pop_idle(self) -> tuple[Any, float] | None:
+        """Pop most recently released connection with seconds it idled, so rarely used ones idle out."""
+        with self._lock:
+            if not self._idle:
+                return None
+            connection, _, released_at = self._idle.pop()
+
+        return connection, time.monotonic() - released_at
+
+    def _is_usable(self, connection: Any, idle_for: float) -> bool:
+        """Check connection before handing it out."""
+        if connection.closed or connection.get_transaction_status() == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - self._connected_at.get(id(connection), 0) > self.max_lifetime:
+            return False
+        if idle_for < self.check_after:
+            return True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+        except Exception:
+            return False
+
+        return True
+
+    def _discard(self, connection: Any) -> None:
+        """Close and forget connection."""
+        with self._lock:
+            self._connected_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(alias: str, options: dict) -> ConnectionPool:
+    """
+    Get pool of the database alias for the current process, pools aren't shared with forked workers.
+
+    :param alias: Database alias.
+    :param options: `POOL` options of the database settings.
+    :return: Connection pool.
+    """
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 10),
+                    max_lifetime=options.get("MAX_LIFETIME", 3600),
+                    check_after=options.get("CHECK_AFTER", 30),
+                )
+
+    return pool
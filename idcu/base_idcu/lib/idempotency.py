@@ -0,0 +1,152 @@
+"""
+Idempotency keys of `IDCUView` POST requests.
+
+Clients retrying a POST request send the same `Idempotency-Key` header with every attempt:
+ - the first request with a key runs and its successful response is stored for `IDEMPOTENCY_TTL` seconds,
+ - retries get the stored response (with `Idempotent-Replayed: true` header), the request isn't processed again,
+ - retries arriving while the first request runs wait up to `IDEMPOTENCY_WAIT_TIMEOUT` seconds for its response,
+   then get 409,
+ - reusing a key for a different request (path or payload) gets 422.
+
+Keys are scoped by user, requests of anonymous users ignore them. Failed requests aren't stored, their retries
+run again. Stored responses live in the default cache, which must be shared between workers (`CACHE_URL`).
+"""
+
+import hashlib
+import json
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from django.http import QueryDict
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from base_idcu.base_exceptions import (
+    IdempotencyKeyInUseError,
+    IdempotencyKeyReusedError,
+    InvalidIdempotencyKeyError,
+)
+
+__all__ = [
+    "IDEMPOTENCY_HEADER",
+    "REPLAYED_HEADER",
+    "IdempotentRequest",
+    "get_idempotent_request",
+]
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Polling of the in-flight request by waiting retries, doubled up to the max.
+_POLL_INTERVAL = 0.05
+_MAX_POLL_INTERVAL = 0.5
+
+
+class IdempotentRequest:
+    """POST request sent with an idempotency key."""
+
+    def __init__(self, key: str, user_id: int, fingerprint: str) -> None:
+        """
+        :param key: Idempotency key sent by client.
+        :param user_id: Id of the request user.
+        :param fingerprint: Digest of the request path and payload.
+        """
+        key_digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        self.cache_key = f"idempotency:{user_id}:{key_digest}"
+        self.fingerprint = fingerprint
+
+    def begin(self) -> Response | None:
+        """
+        Claim the key, or wait for the response of the request which claimed it.
+
+        :return: Stored response for retries, None if the request should be processed.
+
+        :raises IdempotencyKeyReusedError: If key was used for a different request.
+        :raises IdempotencyKeyInUseError: If request with the key didn't finish in time.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        poll_interval = _POLL_INTERVAL
+        while True:
+            in_flight = {"fingerprint": self.fingerprint, "status_code": None}
+            if cache.add(self.cache_key, in_flight, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                return None
+
+            record = cache.get(self.cache_key)
+            if record is None:
+                # The request holding the key failed meanwhile, claim it again.
+                continue
+            if record["fingerprint"] != self.fingerprint:
+                raise IdempotencyKeyReusedError()
+            if record["status_code"] is not None:
+                return Response(record["data"], status=record["status_code"], headers={REPLAYED_HEADER: "true"})
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInUseError()
+
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, _MAX_POLL_INTERVAL)
+
+    def complete(self, response: Response) -> None:
+        """
+        Store successful response for retries, release the key otherwise.
+
+        :param response: Response of the processed request.
+        """
+        if response.status_code >= 300:
+            self.release()
+            return
+
+        record = {"fingerprint": self.fingerprint, "status_code": response.status_code, "data": response.data}
+        cache.set(self.cache_key, record, timeout=settings.IDEMPOTENCY_TTL)
+
+    def release(self) -> None:
+        """Release the key after a failure, so a retry processes the request again."""
+        cache.delete(self.cache_key)
+
+
+def get_idempotent_request(request: Request, payload: Any) -> IdempotentRequest | None:
+    """
+    Get idempotent request if the request carries an idempotency key.
+
+    :param request: The DRF request, authenticated.
+    :param payload: Request payload.
+    :return: Idempotent request, None for requests without key, non-POST and anonymous requests.
+
+    :raises InvalidIdempotencyKeyError: If the key is malformed.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key or request.method != "POST" or not request.user.is_authenticated:
+        return None
+    if len(key) > 255 or not key.isascii() or not key.isprintable():
+        raise InvalidIdempotencyKeyError()
+
+    return IdempotentRequest(key=key, user_id=request.user.id, fingerprint=get_fingerprint(request, payload))
+
+
+def get_fingerprint(request: Request, payload: Any) -> str:
+    """
+    Get digest of the request path and payload, uploaded files are hashed by content.
+
+    :param request: The DRF request.
+    :param payload: Request payload.
+    :return: Hex digest.
+    """
+    if isinstance(payload, QueryDict):
+        payload = dict(payload.lists())
+
+    serialized = json.dumps([request.path, payload], sort_keys=True, default=_serialize_value)
+    return hashlib.blake2b(serialized.encode(), digest_size=16).hexdigest()
+
+
+def _serialize_value(value: Any) -> Any:
+    """Serialize payload value, which isn't JSON serializable."""
+    if isinstance(value, UploadedFile):
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in value.chunks():
+            digest.update(chunk)
+        value.seek(0)
+        return {"name": value.name, "digest": digest.hexdigest()}
+
+    return str(value)
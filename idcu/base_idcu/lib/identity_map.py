@@ -0,0 +1,68 @@
+"""
+Request-scoped identity map.
+
+Model instances loaded while handling a request are registered by their lookup fields,
+so later lookups of the same row (e.g. in permission check, then in view and service)
+reuse the instance instead of querying it again.
+
+The map lives in a context variable set up by `IdentityMapMiddleware` for every request,
+outside of requests (commands, workers) lookups always miss and nothing is registered.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, TypeVar
+
+from django.db.models import Model
+
+__all__ = [
+    "identity_map_scope",
+    "get_identity",
+    "add_identity",
+]
+
+ModelT = TypeVar("ModelT", bound=Model)
+
+_identity_map: ContextVar[dict[tuple[type[Model], str, Any], Model] | None] = ContextVar("identity_map", default=None)
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[None]:
+    """Set up an empty identity map for the lifetime of the context."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+def get_identity(model: type[ModelT], field: str, value: Any) -> ModelT | None:
+    """
+    Get registered instance.
+
+    :param model: Model class.
+    :param field: Lookup field name (`pk` or a unique field).
+    :param value: Lookup value.
+    :return: Model instance, None if not registered.
+    """
+    identity_map = _identity_map.get()
+    if identity_map is None:
+        return None
+
+    return identity_map.get((model, field, value))
+
+
+def add_identity(instance: ModelT, fields: tuple[str, ...]) -> ModelT:
+    """
+    Register instance by its lookup fields.
+
+    :param instance: Model instance.
+    :param fields: Lookup fields (unique fields looked up with `get_identity`) to register the instance by.
+    :return: The instance.
+    """
+    identity_map = _identity_map.get()
+    if identity_map is not None:
+        for field in fields:
+            identity_map[(type(instance), field, getattr(instance, field))] = instance
+
+    return instance
@@ -0,0 +1,144 @@
+"""
+Query budgets and N+1 detection.
+
+Views declare the most queries a request may run with `@query_budget(<count>)` (or `max_queries` attribute).
+`QueryBudgetMiddleware` records queries of every request and, depending on `QUERY_BUDGET_MODE`, logs or raises
+`QueryBudgetError` if the budget was exceeded, or the same `SELECT` shape (SQL with parameters and `IN` lists
+collapsed) was run `QUERY_REPEAT_THRESHOLD` or more times, which is an N+1 pattern.
+"""
+
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, TypeVar
+
+from django.db import connections
+
+__all__ = [
+    "QueryBudgetError",
+    "QueryLog",
+    "query_budget",
+    "query_log_scope",
+    "track_queries",
+]
+
+ViewT = TypeVar("ViewT")
+
+_IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+_VALUES_RE = re.compile(r"VALUES (?:\((?:%s, )*%s\)(?:, )?)+")
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+_current_logs: ContextVar[tuple["QueryLog", ...]] = ContextVar("query_logs", default=())
+
+
+class QueryBudgetError(Exception):
+    """Request exceeded its query budget or ran repeated queries."""
+
+
+def query_budget(max_queries: int) -> Callable[[ViewT], ViewT]:
+    """
+    Declare the most queries a request to the view may run.
+
+    :param max_queries: Max count of queries.
+    :return: Decorator for `IDCUView` subclasses.
+    """
+    def decorator(view: ViewT) -> ViewT:
+        view.max_queries = max_queries
+        return view
+
+    return decorator
+
+
+def get_sql_shape(sql: str) -> str:
+    """
+    Get SQL shape, same for queries differing only by parameters or `IN`/`VALUES` list lengths.
+
+    :param sql: SQL with parameter placeholders.
+    :return: SQL shape.
+    """
+    return _VALUES_RE.sub("VALUES (...)", _IN_LIST_RE.sub("IN (...)", sql))
+
+
+class QueryLog:
+    """Queries run within a request."""
+
+    def __init__(self) -> None:
+        self.shapes: Counter[str] = Counter()
+
+    @property
+    def count(self) -> int:
+        """Count of recorded queries."""
+        return sum(self.shapes.values())
+
+    def record(self, sql: str) -> None:
+        """
+        Record a query.
+
+        :param sql: SQL with parameter placeholders.
+        """
+        if not sql.startswith(_IGNORED_PREFIXES):
+            self.shapes[get_sql_shape(sql)] += 1
+
+    def get_violations(self, max_queries: int | None, repeat_threshold: int) -> list[str]:
+        """
+        Get budget and N+1 violations.
+
+        :param max_queries: Max count of queries, None if not limited.
+        :param repeat_threshold: Count of identical SQL shapes considered an N+1 pattern.
+        :return: Violation descriptions.
+        """
+        violations = []
+        if max_queries is not None and self.count > max_queries:
+            violations.append(f"{self.count} queries run, budget is {max_queries}")
+
+        for shape, count in self.shapes.most_common():
+            if count < repeat_threshold:
+                break
+            if not shape.startswith("SELECT"):
+                continue
+            violations.append(f"{count} repeated queries: {shape}")
+
+        return violations
+
+
+@contextmanager
+def query_log_scope(query_log: QueryLog) -> Iterator[None]:
+    """
+    Record queries run within the context (including `sync_to_async` threads) to the log.
+
+    Queries are recorded on connections of threads within `track_queries`. Scopes can be nested,
+    queries are recorded to all logs of enclosing scopes.
+
+    :param query_log: Query log.
+    """
+    token = _current_logs.set((*_current_logs.get(), query_log))
+    try:
+        yield
+    finally:
+        _current_logs.reset(token)
+
+
+@contextmanager
+def track_queries() -> Iterator[None]:
+    """
+    Record queries of the current thread connections within the context.
+
+    Must be entered in the thread running the queries (for async views, the `sync_to_async` thread),
+    the execute wrappers are removed on exit, so queries outside of the context don't pay for them.
+    Nested contexts (e.g. a test around the middleware) reuse the wrappers, so queries are recorded once.
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            connection = connections[alias]
+            if _record_query not in connection.execute_wrappers:
+                stack.enter_context(connection.execute_wrapper(_record_query))
+        yield
+
+
+def _record_query(execute, sql, params, many, context):
+    """DB execute wrapper recording queries into the current query logs."""
+    for query_log in _current_logs.get():
+        query_log.record(sql)
+
+    return execute(sql, params, many, context)
@@ -0,0 +1,174 @@
+"""
+Read replica routing of `IDCUView` requests.
+
+Views declaring `read_only = True` read from the `replica` database (see `base_idcu.db.routers.ReplicaRouter`),
+unless:
+ - the user wrote something within the last `REPLICA_STICKY_SECONDS` (read-your-writes),
+ - the replica lags behind the primary more than `REPLICA_MAX_LAG` seconds or can't be reached,
+ - the request itself wrote something, all following queries of the request go to the primary then.
+
+Replica lag is checked at most every `REPLICA_LAG_CHECK_INTERVAL` seconds per worker process.
+Without `replica` in `DATABASES` every query goes to the primary.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger("base_idcu.replicas")
+
+__all__ = [
+    "REPLICA_DB",
+    "RoutingState",
+    "get_routing_state",
+    "route_request",
+    "routing_scope",
+]
+
+REPLICA_DB = "replica"
+
+_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')
+    END
+"""
+
+_current_state: ContextVar["RoutingState | None"] = ContextVar("routing_state", default=None)
+
+
+@dataclass
+class RoutingState:
+    """Database routing of a single request."""
+
+    use_replica: bool = False
+    user_id: int | None = None
+    wrote: bool = False
+    # set when reads must stay on the current database, e.g. within a transaction spanning several views
+    pinned: bool = False
+
+    @property
+    def read_db(self) -> str:
+        """Database alias for reads."""
+        return REPLICA_DB if self.use_replica else DEFAULT_DB_ALIAS
+
+    def mark_write(self) -> None:
+        """Send following reads of the request to the primary."""
+        self.wrote = True
+        self.use_replica = False
+
+
+class _ReplicaLag:
+    """Replica lag of the worker process, refreshed by one thread at a time."""
+
+    def __init__(self) -> None:
+        self.value = float("inf")
+        self.checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> float:
+        """
+        Get replica lag, refreshing it if it's older than `REPLICA_LAG_CHECK_INTERVAL` seconds.
+
+        :return: Lag in seconds, infinity if replica can't be reached.
+        """
+        now = time.monotonic()
+        is_stale = self.checked_at is None or now - self.checked_at >= settings.REPLICA_LAG_CHECK_INTERVAL
+        if is_stale and self._lock.acquire(blocking=self.checked_at is None):
+            try:
+                self.value = self._query()
+                self.checked_at = now
+            finally:
+                self._lock.release()
+
+        return self.value
+
+    def _query(self) -> float:
+        """Query replica lag."""
+        try:
+            with connections[REPLICA_DB].cursor() as cursor:
+                cursor.execute(_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning("Replica can't be reached, reading from primary.", exc_info=True)
+            connections[REPLICA_DB].close()
+            return float("inf")
+
+        if lag > settings.REPLICA_MAX_LAG:
+            logger.warning("Replica lags %.1fs behind, reading from primary.", lag)
+
+        return lag
+
+
+replica_lag = _ReplicaLag()
+
+
+def get_routing_state() -> RoutingState | None:
+    """
+    Get database routing of the current request.
+
+    :return: Routing state, None outside of `routing_scope`.
+    """
+    return _current_state.get()
+
+
+@contextmanager
+def routing_scope() -> Iterator[RoutingState]:
+    """
+    Route queries run within the context (including `sync_to_async` threads) by a new request routing state.
+
+    Remembers the user wrote something if any write was routed, so the user's next reads go to the primary.
+    Nested scopes (views run by the batch view) share the outer routing state.
+
+    :return: Routing state.
+    """
+    outer_state = _current_state.get()
+    if outer_state is not None:
+        yield outer_state
+        return
+
+    state = RoutingState()
+    token = _current_state.set(state)
+    try:
+        yield state
+    finally:
+        _current_state.reset(token)
+        if state.wrote and state.user_id is not None and settings.REPLICA_STICKY_SECONDS:
+            cache.set(_get_sticky_key(state.user_id), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def route_request(user_id: int | None, read_only: bool) -> None:
+    """
+    Route the current request once its user is known.
+
+    Reads of read-only requests go to the replica, if it's configured, healthy and the user didn't write recently.
+    Must be called from the thread running the request queries, as the replica lag is queried.
+
+    :param user_id: Id of the request user, None for anonymous requests.
+    :param read_only: Whether the view only reads.
+    """
+    state = _current_state.get()
+    if state is None or state.pinned:
+        return
+
+    state.user_id = user_id
+    state.use_replica = False
+    if not read_only or state.wrote or REPLICA_DB not in settings.DATABASES:
+        return
+    if user_id is not None and cache.get(_get_sticky_key(user_id)):
+        return
+
+    state.use_replica = replica_lag.get() <= settings.REPLICA_MAX_LAG
+
+
+def _get_sticky_key(user_id: int) -> str:
+    """Get cache key marking recent writes of the user."""
+    return f"replica_sticky:{user_id}"
@@ -0,0 +1,244 @@
+"""
+Caching of repository lookups.
+
+Repository methods opt in with `@cached_lookup`, declaring models whose changes invalidate cached results:
+
+    @cached_lookup(namespace="bank-by-name", invalidated_by=[models.Bank])
+    def get_bank_by_name(self, bank_name: str) -> models.Bank | None:
+        ...
+
+ - Cache keys are derived from the method arguments, model instances are keyed by their primary keys.
+ - Results (including None) are kept in a `TwoTierCache`: a short-lived local LRU in front of the shared cache.
+ - Every cached namespace has a version, saving or deleting an instance of a declared model replaces it
+   once the transaction commits, so all cached results of the namespace are dropped at once.
+   Bulk operations (`QuerySet.update`, `bulk_create`) don't send signals and don't invalidate.
+ - Concurrent misses of the same key within a process are coalesced, only one caller runs the query,
+   the others wait for its result (each gets its own copy).
+ - Within transactions (write paths) lookups bypass the cache, so rows aren't updated from stale copies,
+   unless the method declares `in_transactions=True` (e.g. for rows used as foreign keys only).
+"""
+
+import asyncio
+import hashlib
+import inspect
+import pickle
+import threading
+from functools import wraps
+from typing import Any, Callable, Iterable, TypeVar
+from uuid import uuid4
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+from base_idcu.lib.cache import MISSING, TwoTierCache
+
+__all__ = [
+    "cached_lookup",
+]
+
+FuncT = TypeVar("FuncT", bound=Callable)
+
+VERSION_KEY = "version"
+
+
+class _Flight:
+    """Query of a key in progress, shared by concurrent callers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.pickled: bytes | None = None
+        self.error: BaseException | None = None
+
+
+class CachedLookup:
+    """Cache of a repository method."""
+
+    def __init__(
+        self,
+        func: Callable,
+        namespace: str,
+        invalidated_by: Iterable[type[Model]],
+        local_ttl: float,
+        shared_ttl: float,
+        in_transactions: bool,
+    ) -> None:
+        self.func = func
+        self.signature = inspect.signature(func)
+        self.cache = TwoTierCache(namespace=f"lookup:{namespace}", local_ttl=local_ttl, shared_ttl=shared_ttl)
+        self.in_transactions = in_transactions
+        self._flights: dict[str, _Flight] = {}
+        self._async_flights: dict[tuple[int, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+        for model in invalidated_by:
+            post_save.connect(self._on_change, sender=model, weak=False)
+            post_delete.connect(self._on_change, sender=model, weak=False)
+
+    def make_key(self, version: str, args: tuple, kwargs: dict) -> str:
+        """
+        Make cache key from method arguments.
+
+        :param version: Namespace version.
+        :param args: Positional arguments, including `self`.
+        :param kwargs: Keyword arguments.
+        :return: Cache key.
+        """
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        parts = [
+            f"{name}={_get_key_part(value)}" for name, value in list(bound.arguments.items())[1:]
+        ]
+        digest = hashlib.blake2b("&".join(parts).encode(), digest_size=16).hexdigest()
+        return f"{version}:{digest}"
+
+    def get_version(self) -> str:
+        """
+        Get namespace version, initializing it if it's missing.
+
+        :return: Namespace version.
+        """
+        version = self.cache.get(VERSION_KEY)
+        if version is MISSING:
+            self.cache.shared.add(self.cache.make_key(VERSION_KEY), uuid4().hex, None)
+            version = self.cache.shared.get(self.cache.make_key(VERSION_KEY))
+            self.cache.set(VERSION_KEY, version)
+
+        return version
+
+    def invalidate(self) -> None:
+        """Drop all cached results of the namespace."""
+        self.cache.set(VERSION_KEY, uuid4().hex)
+
+    def should_bypass(self) -> bool:
+        """Whether the cache is bypassed, i.e. lookup runs within a transaction of a write path."""
+        return not self.in_transactions and connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+    def call(self, *args, **kwargs) -> Any:
+        """Get cached result, running the method on miss."""
+        if self.should_bypass():
+            return self.func(*args, **kwargs)
+
+        key = self.make_key(self.get_version(), args, kwargs)
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return pickle.loads(flight.pickled)
+
+        try:
+            value = self.func(*args, **kwargs)
+            flight.pickled = pickle.dumps(value)
+            self.cache.set(key, value)
+            return value
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def acall(self, *args, **kwargs) -> Any:
+        """Async version of `call`, concurrent misses are coalesced within the event loop."""
+        version = await self.cache.aget(VERSION_KEY)
+        if version is MISSING:
+            version = await asyncio.to_thread(self.get_version)
+
+        key = self.make_key(version, args, kwargs)
+        value = await self.cache.aget(key)
+        if value is not MISSING:
+            return value
+
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._async_flights.get(flight_key)
+        if flight is not None:
+            return pickle.loads(await asyncio.shield(flight))
+
+        flight = self._async_flights[flight_key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await self.func(*args, **kwargs)
+            pickled = pickle.dumps(value)
+            await self.cache.aset(key, value)
+            flight.set_result(pickled)
+            return value
+        except BaseException as error:
+            flight.set_exception(error)
+            # Retrieve the exception, so it's not logged as never retrieved if nobody waits for it.
+            flight.exception()
+            raise
+        finally:
+            del self._async_flights[flight_key]
+
+    def _on_change(self, sender, **kwargs) -> None:
+        """Invalidate the namespace once the change is committed."""
+        transaction.on_commit(self.invalidate, using=kwargs.get("using") or DEFAULT_DB_ALIAS)
+
+
+def cached_lookup(
+    namespace: str,
+    invalidated_by: Iterable[type[Model]],
+    local_ttl: float | None = None,
+    shared_ttl: float | None = None,
+    in_transactions: bool = False,
+) -> Callable[[FuncT], FuncT]:
+    """
+    Cache results of a repository method, see module docs.
+
+    :param namespace: Cache namespace, unique per method.
+    :param invalidated_by: Models whose saves and deletes invalidate cached results.
+    :param local_ttl: Seconds to keep results in local cache, `REPOSITORY_CACHE_LOCAL_TTL` by default.
+    :param shared_ttl: Seconds to keep results in shared cache, `REPOSITORY_CACHE_TTL` by default.
+    :param in_transactions: Whether to use the cache within transactions too.
+    :return: Decorator for repository methods, sync or async.
+    """
+    def decorator(func: FuncT) -> FuncT:
+        lookup = CachedLookup(
+            func=func,
+            namespace=namespace,
+            invalidated_by=invalidated_by,
+            local_ttl=settings.REPOSITORY_CACHE_LOCAL_TTL if local_ttl is None else local_ttl,
+            shared_ttl=settings.REPOSITORY_CACHE_TTL if shared_ttl is None else shared_ttl,
+            in_transactions=in_transactions,
+        )
+
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.REPOSITORY_CACHE_ENABLED:
+                    return await func(*args, **kwargs)
+                return await lookup.acall(*args, **kwargs)
+
+            async_wrapper.cache = lookup
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.REPOSITORY_CACHE_ENABLED:
+                return func(*args, **kwargs)
+            return lookup.call(*args, **kwargs)
+
+        wrapper.cache = lookup
+        return wrapper
+
+    return decorator
+
+
+def _get_key_part(value: Any) -> str:
+    """Get cache key part for an argument."""
+    if isinstance(value, Model):
+        return f"{value._meta.label}:{value.pk}"
+
+    return repr(value)
@@ -0,0 +1,142 @@
+"""
+Token bucket stores used by throttles (see `base_idcu.base_throttling`).
+
+A bucket holds up to `capacity` tokens and is refilled with `refill_rate` tokens per second,
+every request consumes one token. Two backends are available:
+ - `LocalTokenBucketStore` keeps buckets in process memory, limits are per worker process.
+ - `RedisTokenBucketStore` keeps buckets in Redis (or any server supporting Lua scripts),
+   limits are shared by all workers. The client is injectable, so any Redis-compatible
+   stand-in can be used instead of a real server.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "LocalTokenBucketStore",
+    "RedisTokenBucketStore",
+    "get_throttle_store",
+]
+
+THROTTLE_BACKENDS = {
+    "local": "base_idcu.lib.throttling.LocalTokenBucketStore",
+    "redis": "base_idcu.lib.throttling.RedisTokenBucketStore",
+}
+
+
+class LocalTokenBucketStore:
+    """Thread-safe in-process token buckets, least recently used buckets are evicted over `max_size`."""
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self.max_size = max_size
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Take a token from the bucket.
+
+        :param key: Bucket key.
+        :param capacity: Max count of tokens in the bucket.
+        :param refill_rate: Tokens added per second.
+        :return: 0 if the token was taken, else seconds to wait for the next token.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / refill_rate
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+
+class RedisTokenBucketStore:
+    """
+    Token buckets shared through Redis.
+
+    Bucket is updated atomically by a Lua script using the server clock, so workers' clocks don't matter.
+    When the server is unavailable requests are allowed (fail open).
+    """
+
+    script = """
+    local capacity = tonumber(ARGV[1])
+    local refill_rate = tonumber(ARGV[2])
+    local server_time = redis.call('TIME')
+    local now = tonumber(server_time[1]) + tonumber(server_time[2]) / 1000000
+
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / refill_rate
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str | None = None, client=None) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or settings.THROTTLE_REDIS_URL)
+
+        self.client = client
+        self._consume = client.register_script(self.script)
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Take a token from the bucket.
+
+        :param key: Bucket key.
+        :param capacity: Max count of tokens in the bucket.
+        :param refill_rate: Tokens added per second.
+        :return: 0 if the token was taken (or server is unavailable), else seconds to wait for the next token.
+        """
+        try:
+            return float(self._consume(keys=[key], args=[capacity, refill_rate]))
+        except Exception:  # noqa: BLE001 - throttling must not take logins down with it
+            logger.exception("Token bucket store is unavailable, request is not throttled.")
+            return 0.0
+
+
+_store: LocalTokenBucketStore | RedisTokenBucketStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_throttle_store() -> LocalTokenBucketStore | RedisTokenBucketStore:
+    """
+    Get the process-wide store configured with `THROTTLE_BACKEND`.
+
+    :return: Token bucket store.
+    """
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(THROTTLE_BACKENDS[settings.THROTTLE_BACKEND])()
+
+    return _store
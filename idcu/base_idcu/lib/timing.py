@@ -0,0 +1,238 @@
+"""
+Per-request stage timing for `IDCUView`.
+
+When `REQUEST_TIMING_ENABLED` is set, every view request gets a `RequestTimer` that records
+how long each stage took (authentication, deserialization, processing, output serialization, rendering)
+and how many DB queries were run and for how long. Timings are:
+ - returned in the `Server-Timing` response header (shown by browser dev tools),
+ - logged as a single line by the `base_idcu.timing` logger,
+ - observed into per-view histograms, exposed in Prometheus text format by `render_metrics`.
+
+When disabled, views get `NULL_TIMER`, whose stages are no-op context managers.
+"""
+
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Iterator
+
+from django.db import connections
+
+logger = logging.getLogger("base_idcu.timing")
+
+__all__ = [
+    "RequestTimer",
+    "NULL_TIMER",
+    "request_timer_scope",
+    "render_metrics",
+]
+
+# Histogram bucket upper bounds, in milliseconds.
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_timer: ContextVar["RequestTimer | None"] = ContextVar("request_timer", default=None)
+
+
+class RequestTimer:
+    """Collects stage durations and DB query stats of a single request."""
+
+    enabled = True
+
+    def __init__(self, view_name: str) -> None:
+        self.view_name = view_name
+        self.started_at = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.db_queries = 0
+        self.db_time = 0.0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the stage, repeated stages are summed up.
+
+        :param name: Stage name.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started_at
+
+    @contextmanager
+    def track_queries(self) -> Iterator[None]:
+        """
+        Count DB queries of the current thread connections within the context.
+
+        Must be entered in the thread running the request queries (for async views, the `sync_to_async` thread),
+        the execute wrappers are removed on exit, so they don't pile up on persistent connections.
+        """
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(_time_query))
+            yield
+
+    def finish(self, status_code: int, method: str) -> str:
+        """
+        Finish timing, log it, observe it into histograms and build `Server-Timing` header value.
+
+        :param status_code: Response status code.
+        :param method: Request method.
+        :return: `Server-Timing` header value.
+        """
+        total = time.perf_counter() - self.started_at
+        durations_ms = {name: duration * 1000 for name, duration in self.stages.items()}
+        durations_ms["db"] = self.db_time * 1000
+        durations_ms["total"] = total * 1000
+
+        for name, duration_ms in durations_ms.items():
+            histograms.observe(self.view_name, name, duration_ms)
+
+        logger.info(
+            "request_timing view=%s method=%s status=%s db_queries=%s %s",
+            self.view_name,
+            method,
+            status_code,
+            self.db_queries,
+            " ".join(f"{name}_ms={duration_ms:.2f}" for name, duration_ms in durations_ms.items()),
+            extra={
+                "view": self.view_name,
+                "method": method,
+                "status_code": status_code,
+                "db_queries": self.db_queries,
+                "durations_ms": durations_ms,
+            },
+        )
+
+        return ", ".join(
+            f'{name};dur={duration_ms:.2f}' + (f';desc="{self.db_queries} queries"' if name == "db" else "")
+            for name, duration_ms in durations_ms.items()
+        )
+
+
+class _NullTimer:
+    """Timer used when timing is disabled."""
+
+    enabled = False
+    _stage = nullcontext()
+
+    def stage(self, name: str) -> nullcontext:
+        """No-op stage."""
+        return self._stage
+
+    def track_queries(self) -> nullcontext:
+        """No-op query tracking."""
+        return self._stage
+
+
+NULL_TIMER = _NullTimer()
+
+
+@contextmanager
+def request_timer_scope(timer: RequestTimer) -> Iterator[None]:
+    """
+    Attribute DB queries run within the context (including `sync_to_async` threads) to the timer.
+
+    Queries are counted on connections the timer tracks (see `RequestTimer.track_queries`).
+
+    :param timer: Request timer.
+    """
+    token = _current_timer.set(timer)
+    try:
+        yield
+    finally:
+        _current_timer.reset(token)
+
+
+def _time_query(execute, sql, params, many, context):
+    """DB execute wrapper counting queries of the current request timer."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.db_queries += 1
+        timer.db_time += time.perf_counter() - started_at
+
+
+class Histogram:
+    """Cumulative histogram of durations, in milliseconds."""
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Add observation.
+
+        :param value: Duration in milliseconds.
+        """
+        for i, upper_bound in enumerate(BUCKETS_MS):
+            if value <= upper_bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class HistogramRegistry:
+    """Per view and stage histograms of the worker process."""
+
+    def __init__(self) -> None:
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view_name: str, stage: str, value: float) -> None:
+        """
+        Add observation to the view stage histogram.
+
+        :param view_name: View name.
+        :param stage: Stage name.
+        :param value: Duration in milliseconds.
+        """
+        with self._lock:
+            histogram = self._histograms.get((view_name, stage))
+            if histogram is None:
+                histogram = self._histograms[(view_name, stage)] = Histogram()
+            histogram.observe(value)
+
+    def render(self) -> str:
+        """
+        Render histograms in Prometheus text format.
+
+        :return: Prometheus text exposition.
+        """
+        lines = [
+            "# HELP idcu_view_stage_duration_ms Duration of view request stages in milliseconds.",
+            "# TYPE idcu_view_stage_duration_ms histogram",
+        ]
+        with self._lock:
+            for (view_name, stage), histogram in sorted(self._histograms.items()):
+                labels = f'view="{view_name}",stage="{stage}"'
+                cumulative = 0
+                for upper_bound, bucket_count in zip(BUCKETS_MS, histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'idcu_view_stage_duration_ms_bucket{{{labels},le="{upper_bound}"}} {cumulative}')
+                lines.append(f'idcu_view_stage_duration_ms_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"idcu_view_stage_duration_ms_sum{{{labels}}} {histogram.sum:.3f}")
+                lines.append(f"idcu_view_stage_duration_ms_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+histograms = HistogramRegistry()
+
+
+def render_metrics() -> str:
+    """
+    Render request timing histograms of this worker process in Prometheus text format.
+
+    :return: Prometheus text exposition.
+    """
+    return histograms.render()
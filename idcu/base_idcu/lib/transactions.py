@@ -0,0 +1,84 @@
+"""
+Read/write annotations of service methods.
+
+ - `@read_only` methods only read. They run in autocommit mode, without a transaction, so no locks are held
+   and no `BEGIN`/`COMMIT` round trips are made. With `READ_ONLY_TRANSACTIONS` enabled (e.g. in development),
+   they run in a `READ ONLY` transaction instead, so the database rejects writes sneaking into read paths.
+ - `@read_write` methods run in a transaction on the primary. Nested in another transaction they join it,
+   without a savepoint round trip, so a failure rolls back the outermost transaction.
+
+Both keep the method's sync or async flavour, async methods are annotated only, as the async ORM runs
+every query in autocommit mode.
+"""
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, TypeVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from base_idcu.lib.replicas import get_routing_state
+
+__all__ = [
+    "read_only",
+    "read_only_transaction",
+    "read_write",
+]
+
+FuncT = TypeVar("FuncT", bound=Callable)
+
+
+def read_only(func: FuncT) -> FuncT:
+    """
+    Annotate service method which only reads.
+
+    :param func: Service method.
+    :return: Decorated method.
+    """
+    func.db_access = "read"
+    if iscoroutinefunction(func):
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not settings.READ_ONLY_TRANSACTIONS:
+            return func(*args, **kwargs)
+
+        state = get_routing_state()
+        using = state.read_db if state is not None else DEFAULT_DB_ALIAS
+        if connections[using].in_atomic_block:
+            return func(*args, **kwargs)
+
+        with read_only_transaction(using=using):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def read_only_transaction(using: str) -> Iterator[None]:
+    """
+    Run the context in a `READ ONLY` transaction.
+
+    :param using: Database alias.
+    """
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute("SET TRANSACTION READ ONLY")
+        yield
+
+
+def read_write(func: FuncT) -> FuncT:
+    """
+    Annotate service method which writes, running it in a transaction on the primary.
+
+    :param func: Service method.
+    :return: Decorated method.
+    """
+    func.db_access = "write"
+    if iscoroutinefunction(func):
+        return func
+
+    return transaction.atomic(using=DEFAULT_DB_ALIAS, savepoint=False)(func)
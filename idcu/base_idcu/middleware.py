@@ -0,0 +1,180 @@
+"""Middlewares for `idcu` project."""
+
+import logging
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from base_idcu.lib.compression import acompress_stream, choose_encoding, compress, compress_stream
+from base_idcu.lib.identity_map import identity_map_scope
+from base_idcu.lib.queries import QueryBudgetError, QueryLog, query_log_scope, track_queries
+
+logger = logging.getLogger("base_idcu.queries")
+
+
+class IdentityMapMiddleware:
+    """Sets up request-scoped identity map (see `base_idcu.lib.identity_map`)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with identity_map_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_map_scope():
+            return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses of views declaring `compress_response = True` (all `IDCUView`s) with Brotli or gzip,
+    negotiated by `Accept-Encoding` (see `base_idcu.lib.compression`).
+
+    Responses smaller than `COMPRESSION_MIN_SIZE` bytes are sent as is, streamed responses are compressed chunk by chunk.
+    `COMPRESSION_ENABLED` disables the middleware, e.g. when a proxy compresses responses.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self.compress_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress_response(request, await self.get_response(request))
+
+    def compress_response(self, request, response):
+        """
+        Compress the response if the view and the client allow it.
+
+        :param request: The HTTP request.
+        :param response: The HTTP response.
+        :return: The response, compressed in place.
+        """
+        resolver_match = request.resolver_match
+        view_class = getattr(resolver_match.func, "view_class", None) if resolver_match else None
+        if not getattr(view_class, "compress_response", False) or response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response.headers["Content-Length"]
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Compressed representation differs byte by byte, strong ETags must become weak.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks queries of every request against the view query budget and for N+1 patterns
+    (see `base_idcu.lib.queries`).
+
+    `QUERY_BUDGET_MODE` is `log` (log violations), `raise` (raise `QueryBudgetError`) or `off` (middleware is unused).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.QUERY_BUDGET_MODE == "off":
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        query_log = QueryLog()
+        with track_queries(), query_log_scope(query_log):
+            response = self.get_response(request)
+
+        self.check_queries(request, query_log)
+        return response
+
+    async def __acall__(self, request):
+        # Async views run queries in the `sync_to_async` thread, so tracking starts and stops there.
+        tracking = ExitStack()
+        await sync_to_async(tracking.enter_context)(track_queries())
+        query_log = QueryLog()
+        try:
+            with query_log_scope(query_log):
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(tracking.close)()
+
+        self.check_queries(request, query_log)
+        return response
+
+    def check_queries(self, request, query_log: QueryLog) -> None:
+        """
+        Log or raise query budget violations of the request.
+
+        :param request: The HTTP request.
+        :param query_log: Queries of the request.
+
+        :raises QueryBudgetError: If there are violations and `QUERY_BUDGET_MODE` is `raise`.
+        """
+        resolver_match = request.resolver_match
+        view_class = getattr(resolver_match.func, "view_class", None) if resolver_match else None
+        violations = query_log.get_violations(
+            max_queries=getattr(view_class, "max_queries", None),
+            repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+        )
+        if not violations:
+            return
+
+        message = f"{request.method} {request.path}: " + "; ".join(violations)
+        if settings.QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetError(message)
+
+        logger.warning(message)
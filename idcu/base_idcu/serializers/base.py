@@ -1,11 +1,22 @@
 """Base DRF serializer."""
 
-from typing import Any
+from typing import Any, Iterable
 from rest_framework import serializers
 
 
 class BasicSerializer(serializers.Serializer):
-    """Basic serializer for all serializers."""
+    """
+    Basic serializer for all serializers.
+
+    Output serializers can be narrowed to a sparse fieldset with `fields`, e.g. `OrderResponse(order, fields={"order_id"})`,
+    with `many=True` the fieldset applies to every item.
+    """
+
+    def __init__(self, *args, fields: Iterable[str] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def update(self, instance: "BasicSerializer", validated_data: Any) -> None:
         """The method is called to save field for an instance that already exists."""
@@ -0,0 +1,38 @@
+"""Module with serializers for the `batch` endpoint."""
+
+from django.conf import settings
+from rest_framework import serializers
+
+from base_idcu.serializers.base import BasicSerializer
+
+
+class SubRequest(BasicSerializer):
+    """Serializer to input a request of the batch."""
+
+    method = serializers.ChoiceField(choices=["GET", "POST"], default="GET")
+    path = serializers.CharField(max_length=255, allow_null=False, required=True)
+    params = serializers.DictField(allow_null=False, required=False, default=dict)
+
+
+class BatchToProcess(BasicSerializer):
+    """Serializer to input requests of the batch."""
+
+    requests = serializers.ListField(
+        child=SubRequest(),
+        allow_empty=False,
+        max_length=settings.BATCH_MAX_REQUESTS,
+    )
+    read_only_transaction = serializers.BooleanField(default=False)
+
+
+class SubResponse(BasicSerializer):
+    """Serializer to output a response of the batch."""
+
+    status = serializers.IntegerField()
+    body = serializers.JSONField()
+
+
+class BatchResponse(BasicSerializer):
+    """Serializer to output responses of the batch."""
+
+    responses = serializers.ListField(child=SubResponse())
@@ -1,17 +1,27 @@
 """Base DRF view."""
 
 from abc import abstractmethod
+from contextlib import ExitStack
+from inspect import isawaitable
 from typing import cast, OrderedDict, Any
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import QueryDict
+from django.utils.functional import classproperty
 
+from rest_framework.authentication import get_authorization_header
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework.serializers import BaseSerializer
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, ValidationError
 
-from base_idcu.serializers.base import BasicSerializer, EmptyInputRequest
+from base_idcu.base_authentication import SignedTokenAuthentication
+from base_idcu.lib.idempotency import IdempotentRequest, get_idempotent_request
+from base_idcu.lib.replicas import route_request, routing_scope
+from base_idcu.lib.timing import NULL_TIMER, RequestTimer, request_timer_scope
+from base_idcu.serializers.base import EmptyInputRequest
 from companies.exceptions import WebHttpException
 
 
@@ -38,12 +48,147 @@ def get_request_payload(request: Request) -> dict | QueryDict:
 
 
 class IDCUView(APIView):
-    """Abstract base class API views for `company` `inventory` and `document` apps."""
+    """
+    Abstract base class API views for `company` `inventory` and `document` apps.
+
+    `process_request` can be defined either as a regular or as an `async` method.
+    Async views are dispatched natively under ASGI, authentication and permission checks
+    run in a thread, while the request itself is processed on the event loop.
+    Input serializers of async views should not touch the database.
+
+    `process_request` returns plain data, which is serialized with `out_serializer_cls`.
+
+    Views declare their query budget with `@query_budget(<count>)`, checked by `QueryBudgetMiddleware`.
+
+    Views which only read declare `read_only = True`, their reads may go to the replica (see `base_idcu.lib.replicas`).
+
+    With `REQUEST_TIMING_ENABLED`, every stage of the request is timed (see `base_idcu.lib.timing`).
+
+    Responses are compressed with Brotli or gzip if the client accepts it (see `CompressionMiddleware`).
+
+    POST requests with an `Idempotency-Key` header are processed once per key (see `base_idcu.lib.idempotency`).
+
+    Views declaring `sparse_fields = True` accept `fields` query parameter (comma separated output fields),
+    available as `requested_fields` to pass on to services, which load only the data needed for these fields.
+    """
 
     # input serializer
     in_serializer_cls: type[BaseSerializer] | None = EmptyInputRequest
     in_serializer_kwargs: dict = {}
 
+    # output serializer, response data is returned as is if not provided
+    out_serializer_cls: type[BaseSerializer] | None = None
+    out_serializer_kwargs: dict = {}
+
+    # max count of queries per request, see `base_idcu.lib.queries.query_budget`
+    max_queries: int | None = None
+
+    # reads may be routed to the replica
+    read_only: bool = False
+
+    # responses are compressed, see `base_idcu.middleware.CompressionMiddleware`
+    compress_response: bool = True
+
+    # clients may request a sparse fieldset of the output serializer with `fields` query parameter
+    sparse_fields: bool = False
+    requested_fields: frozenset[str] | None = None
+
+    timer = NULL_TIMER
+
+    @classproperty
+    def view_is_async(cls) -> bool:
+        """Whether view is processed asynchronously, based on `process_request`."""
+        return iscoroutinefunction(cls.process_request)
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Dispatch an incoming request.
+
+        :param request: The HTTP request.
+        :return: DRF response, or awaitable of it for async views.
+        """
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+
+        with routing_scope():
+            if not settings.REQUEST_TIMING_ENABLED:
+                return super().dispatch(request, *args, **kwargs)
+
+            self.timer = RequestTimer(view_name=type(self).__name__)
+            with request_timer_scope(self.timer), self.timer.track_queries():
+                return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs) -> None:
+        """
+        Run authentication, permission and throttling checks, then route the request database reads.
+
+        :param request: The DRF request.
+        """
+        with self.timer.stage("auth"):
+            super().initial(request, *args, **kwargs)
+
+        route_request(user_id=request.user.id, read_only=self.read_only)
+        if self.sparse_fields:
+            self.requested_fields = self.get_requested_fields(request)
+
+    def get_requested_fields(self, request) -> frozenset[str] | None:
+        """
+        Get sparse fieldset requested with `fields` query parameter, e.g. `?fields=order_id,cargo_name`.
+
+        :param request: The DRF request.
+        :return: Requested output fields, None if all fields are requested.
+
+        :raises ValidationError: If unknown fields are requested.
+        """
+        fields_param = request.query_params.get("fields")
+        if not fields_param:
+            return None
+
+        fields = frozenset(name.strip() for name in fields_param.split(",") if name.strip())
+        unknown_fields = fields - set(self.out_serializer_cls._declared_fields)
+        if unknown_fields:
+            raise ValidationError({"fields": [f"Unknown fields: {', '.join(sorted(unknown_fields))}."]})
+
+        return fields
+
+    def get_authenticate_header(self, request) -> str | None:
+        """
+        Get `WWW-Authenticate` header for failed authentication.
+
+        Failed bearer access tokens get 401 with the `Bearer` challenge, so clients know to refresh the token,
+        other failures get the header of the first authenticator (none for session authentication, so 403).
+
+        :param request: The DRF request.
+        :return: Header value, None for 403 responses.
+        """
+        scheme = b"".join(get_authorization_header(request).split()[:1]).lower()
+        for authenticator in request.authenticators:
+            if isinstance(authenticator, SignedTokenAuthentication) and scheme == authenticator.keyword.lower().encode():
+                return authenticator.authenticate_header(request)
+
+        return super().get_authenticate_header(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Finalize the response, adding `Server-Timing` header if timing is enabled.
+
+        Timed responses are rendered here, so rendering time is included.
+
+        :param request: The DRF request.
+        :param response: The DRF response.
+        :return: Finalized response.
+        """
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if not self.timer.enabled:
+            return response
+
+        if callable(getattr(response, "render", None)):
+            with self.timer.stage("render"):
+                response.render()
+
+        response["Server-Timing"] = self.timer.finish(status_code=response.status_code, method=request.method)
+        return response
+
     def post(self, request, *args, **kwargs):
         """
         Handle an incoming POST request.
@@ -79,6 +224,74 @@ class IDCUView(APIView):
 
         return cast(OrderedDict, in_serializer.validated_data)
 
+    def serialize_response(self, response_data: Any) -> Any:
+        """
+        Transform the response data with the output serializer.
+
+        :param response_data: Data returned by `process_request`.
+        :return: Serialized response data.
+        """
+        if self.out_serializer_cls is None:
+            return response_data
+
+        serializer_kwargs = self.out_serializer_kwargs
+        if self.requested_fields is not None:
+            serializer_kwargs = {**serializer_kwargs, "fields": self.requested_fields}
+
+        return self.out_serializer_cls(response_data, **serializer_kwargs).data
+
+    async def _adispatch(self, request, *args, **kwargs) -> Response:
+        """
+        Async version of `APIView.dispatch`.
+
+        :param request: The HTTP request.
+        :return: DRF response.
+        """
+        with routing_scope():
+            if not settings.REQUEST_TIMING_ENABLED:
+                return await self._adispatch_request(request, *args, **kwargs)
+
+            self.timer = RequestTimer(view_name=type(self).__name__)
+            with request_timer_scope(self.timer):
+                # Queries run in the `sync_to_async` thread, so tracking starts and stops there.
+                tracking = ExitStack()
+                await sync_to_async(tracking.enter_context)(self.timer.track_queries())
+                try:
+                    return await self._adispatch_request(request, *args, **kwargs)
+                finally:
+                    await sync_to_async(tracking.close)()
+
+    async def _adispatch_request(self, request, *args, **kwargs) -> Response:
+        """
+        Dispatch an incoming request for async views, the same way `APIView.dispatch` does.
+
+        :param request: The HTTP request.
+        :return: DRF response.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
     def _handle_request(self, request: Request, *args, **kwargs) -> Response:
         """
         Handle request.
@@ -86,13 +299,111 @@ class IDCUView(APIView):
         :param request: The DRF request.
         :return: Serialized response.
         """
+        if self.view_is_async:
+            return self._ahandle_request(request)
+
+        idempotent_request = self._get_idempotent_request(request)
+        if idempotent_request is not None:
+            with self.timer.stage("idempotency"):
+                stored_response = self._begin_idempotent_request(idempotent_request)
+            if stored_response is not None:
+                return stored_response
+
+        try:
+            with self.timer.stage("deserialize"):
+                params = self.deserialize_request(request)
+            with self.timer.stage("process"):
+                response_data = self.process_request(params)
+
+            with self.timer.stage("serialize"):
+                response = Response(self.serialize_response(response_data))
+        except WebHttpException as exc:
+            if idempotent_request is not None:
+                idempotent_request.release()
+            raise self._get_api_exception(exc)
+        except BaseException:
+            if idempotent_request is not None:
+                idempotent_request.release()
+            raise
+
+        if idempotent_request is not None:
+            idempotent_request.complete(response)
+
+        return response
+
+    async def _ahandle_request(self, request: Request) -> Response:
+        """
+        Handle request for async views.
+
+        :param request: The DRF request.
+        :return: Serialized response.
+        """
+        idempotent_request = self._get_idempotent_request(request)
+        if idempotent_request is not None:
+            with self.timer.stage("idempotency"):
+                # Not thread sensitive, so waiting for the in-flight request doesn't block other sync work.
+                stored_response = await sync_to_async(self._begin_idempotent_request, thread_sensitive=False)(
+                    idempotent_request
+                )
+            if stored_response is not None:
+                return stored_response
+
         try:
-            params = self.deserialize_request(request)
-            serialized_response = self.process_request(params)
+            with self.timer.stage("deserialize"):
+                params = self.deserialize_request(request)
+            with self.timer.stage("process"):
+                response_data = await self.process_request(params)
+
+            with self.timer.stage("serialize"):
+                response = Response(self.serialize_response(response_data))
         except WebHttpException as exc:
-            raise APIException(detail=exc.detail, code=exc.status_code)
+            if idempotent_request is not None:
+                await sync_to_async(idempotent_request.release)()
+            raise self._get_api_exception(exc)
+        except BaseException:
+            if idempotent_request is not None:
+                await sync_to_async(idempotent_request.release)()
+            raise
+
+        if idempotent_request is not None:
+            await sync_to_async(idempotent_request.complete)(response)
 
-        return Response(serialized_response)
+        return response
+
+    def _get_idempotent_request(self, request: Request) -> IdempotentRequest | None:
+        """
+        Get idempotent request, if the request carries an `Idempotency-Key` header (see `base_idcu.lib.idempotency`).
+
+        :param request: The DRF request.
+        :return: Idempotent request or None.
+        """
+        try:
+            return get_idempotent_request(request, payload=get_request_payload(request))
+        except WebHttpException as exc:
+            raise self._get_api_exception(exc)
+
+    def _begin_idempotent_request(self, idempotent_request: IdempotentRequest) -> Response | None:
+        """
+        Claim the idempotency key of the request.
+
+        :param idempotent_request: Idempotent request.
+        :return: Stored response of an earlier request with the same key, None if the request should be processed.
+        """
+        try:
+            return idempotent_request.begin()
+        except WebHttpException as exc:
+            raise self._get_api_exception(exc)
+
+    def _get_api_exception(self, exc: WebHttpException) -> APIException:
+        """
+        Get DRF exception keeping the status code of the web exception.
+
+        :param exc: Web exception.
+        :return: DRF exception.
+        """
+        api_exception = APIException(detail=exc.detail, code=exc.error_code)
+        api_exception.status_code = exc.status_code
+        return api_exception
 
     def _get_input_serializer_cls(self) -> type[BaseSerializer]:
         """
@@ -103,11 +414,11 @@ class IDCUView(APIView):
         return self.in_serializer_cls
 
     @abstractmethod
-    def process_request(self, request_params: Any) -> BasicSerializer:
+    def process_request(self, request_params: Any) -> Any:
         """
-        Processes the request and returns the serialized response.
+        Processes the request and returns the response data.
 
         :param request_params: Serialized request.
-        :return: Serialized response.
+        :return: Response data, serialized with `out_serializer_cls`.
         """
         raise NotImplementedError("process_request is not implemented")
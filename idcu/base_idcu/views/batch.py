@@ -0,0 +1,198 @@
+"""
+The `batch` endpoint, running several `IDCUView` requests in one HTTP request.
+
+The batch is authenticated once, its requests run one after another in the same thread, so they share
+the database connection, the routing state (a write routes the next reads to the primary) and the identity map.
+With `read_only_transaction`, all requests run in one `READ ONLY` transaction and see the same snapshot,
+every request in a savepoint, so a failing request doesn't abort the others.
+
+Every request gets its status and body, failures of a request don't fail the batch.
+"""
+
+import io
+import json
+import logging
+from dataclasses import dataclass
+from inspect import isawaitable
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, ResolverMatch, resolve
+from rest_framework.decorators import authentication_classes, permission_classes
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated, NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from base_idcu.base_authentication import READ_AUTHENTICATION_CLASSES
+from base_idcu.lib.idempotency import IDEMPOTENCY_HEADER
+from base_idcu.lib.replicas import get_routing_state, route_request
+from base_idcu.lib.transactions import read_only_transaction
+from base_idcu.serializers.batch import BatchResponse, BatchToProcess
+from base_idcu.views.base import IDCUView
+
+logger = logging.getLogger(__name__)
+
+# Headers of the batch request, which aren't passed on to its requests.
+_BATCH_ONLY_META = {
+    "CONTENT_LENGTH",
+    "CONTENT_TYPE",
+    "QUERY_STRING",
+    f"HTTP_{IDEMPOTENCY_HEADER.upper().replace('-', '_')}",
+    "wsgi.input",
+}
+
+
+@dataclass
+class _SubRequest:
+    """Request of the batch, resolved to its view."""
+
+    method: str
+    path: str
+    query_string: str
+    params: dict
+    match: ResolverMatch | None = None
+    error: APIException | None = None
+
+
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
+@permission_classes([IsAuthenticated])
+class BatchView(IDCUView):
+    """Handles request to the `batch` endpoint."""
+
+    http_method_names = ['post']
+    in_serializer_cls = BatchToProcess
+    out_serializer_cls = BatchResponse
+
+    def process_request(self, request_params: Any) -> dict:
+        """
+        Process request for `batch` endpoint.
+
+        :param request_params: Request parameters.
+        :return: Response data.
+
+        :raises ValidationError: If a read-only transaction is requested for requests to views, which write.
+        """
+        sub_requests = [self._resolve(**sub_request) for sub_request in request_params["requests"]]
+        if not request_params["read_only_transaction"]:
+            return {"responses": [self._run(sub_request) for sub_request in sub_requests]}
+
+        if any(not sub_request.match.func.view_class.read_only for sub_request in sub_requests if sub_request.match):
+            raise ValidationError({"read_only_transaction": ["All requests must be to read-only endpoints."]})
+
+        # Route all reads of the batch once, so they stay in the transaction.
+        route_request(user_id=self.request.user.id, read_only=True)
+        state = get_routing_state()
+        state.pinned = True
+        with read_only_transaction(using=state.read_db):
+            responses = [self._run(sub_request, savepoint_using=state.read_db) for sub_request in sub_requests]
+
+        return {"responses": responses}
+
+    def _resolve(self, method: str, path: str, params: dict) -> _SubRequest:
+        """
+        Resolve a request of the batch to its view.
+
+        :param method: HTTP method.
+        :param path: URL path, may include the query string.
+        :param params: Query parameters of GET requests, body of POST requests.
+        :return: Resolved request, with the error to respond with if it can't run.
+        """
+        url = urlsplit(path)
+        sub_request = _SubRequest(method=method, path=url.path, query_string=url.query, params=params)
+        try:
+            sub_request.match = resolve(url.path)
+        except Resolver404:
+            sub_request.error = NotFound()
+            return sub_request
+
+        view_class = getattr(sub_request.match.func, "view_class", None)
+        if view_class is None or not issubclass(view_class, IDCUView) or issubclass(view_class, BatchView):
+            sub_request.match, sub_request.error = None, NotFound()
+        elif method.lower() not in view_class.http_method_names:
+            sub_request.match, sub_request.error = None, MethodNotAllowed(method)
+        elif type(self.request.successful_authenticator) not in view_class.authentication_classes:
+            # E.g. access tokens, which are accepted by read-only views only.
+            sub_request.match, sub_request.error = None, NotAuthenticated()
+
+        return sub_request
+
+    def _run(self, sub_request: _SubRequest, savepoint_using: str | None = None) -> dict:
+        """
+        Run a request of the batch.
+
+        :param sub_request: Resolved request.
+        :param savepoint_using: Database alias to run the request in a savepoint on, when in a transaction.
+        :return: Status and body of the response.
+        """
+        if sub_request.error is not None:
+            return {"status": sub_request.error.status_code, "body": {"detail": sub_request.error.detail}}
+
+        try:
+            if savepoint_using is None:
+                response = self._dispatch(sub_request)
+            else:
+                with transaction.atomic(using=savepoint_using):
+                    response = self._dispatch(sub_request)
+        except Exception:
+            logger.exception("Batch request to %s failed", sub_request.path)
+            return {"status": 500, "body": {"detail": APIException.default_detail}}
+
+        return {"status": response.status_code, "body": response.data}
+
+    def _dispatch(self, sub_request: _SubRequest) -> Response:
+        """
+        Dispatch a request of the batch to its view, authenticated as the batch.
+
+        :param sub_request: Resolved request.
+        :return: DRF response, not rendered.
+        """
+        match = sub_request.match
+        view = match.func.view_class(**match.func.view_initkwargs)
+        response = view.dispatch(self._get_http_request(sub_request), *match.args, **match.kwargs)
+        if isawaitable(response):
+            # Async views run on the event loop, their thread sensitive work comes back to this thread.
+            response = async_to_sync(_await)(response)
+
+        return response
+
+    def _get_http_request(self, sub_request: _SubRequest) -> HttpRequest:
+        """
+        Build HTTP request of a request of the batch.
+
+        :param sub_request: Resolved request.
+        :return: HTTP request, forced to authenticate as the batch (see `rest_framework.request.Request`).
+        """
+        batch_request: Request = self.request
+        http_request = HttpRequest()
+        http_request.method = sub_request.method
+        http_request.path = http_request.path_info = sub_request.path
+        http_request.resolver_match = sub_request.match
+        http_request.META = {key: value for key, value in batch_request.META.items() if key not in _BATCH_ONLY_META}
+        http_request.COOKIES = batch_request.COOKIES
+
+        if sub_request.method == "GET":
+            query_string = urlencode(sub_request.params, doseq=True)
+            http_request.META["QUERY_STRING"] = "&".join(filter(None, [sub_request.query_string, query_string]))
+        else:
+            body = json.dumps(sub_request.params).encode()
+            http_request.META.update(
+                QUERY_STRING=sub_request.query_string,
+                CONTENT_TYPE="application/json",
+                CONTENT_LENGTH=str(len(body)),
+            )
+            http_request._stream = io.BytesIO(body)
+            http_request._read_started = False
+
+        http_request.GET = QueryDict(http_request.META["QUERY_STRING"])
+        http_request._force_auth_user = batch_request.user
+        http_request._force_auth_token = batch_request.auth
+        return http_request
+
+
+async def _await(awaitable: Any) -> Any:
+    """Await the awaitable, for `async_to_sync`."""
+    return await awaitable
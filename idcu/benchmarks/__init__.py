@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for `idcu` project.
+
+Benchmarks are plain scripts, run them from the `idcu` directory, e.g.
+`python -m benchmarks.server_modes --help`. Every benchmark prints its report as JSON.
+"""
@@ -0,0 +1,330 @@
+"""
+API benchmark suite.
+
+Seeds a synthetic dataset (see `benchmarks.dataset`) in the configured database, then:
+ 1. drives every endpoint of `companies`, `users` and `documents` through the Django test client in process,
+    measuring latency percentiles, throughput and queries per request,
+ 2. starts gunicorn (see `gunicorn.conf.py`) and drives read endpoints, `login-user` and `ping-view`
+    with concurrent HTTP clients.
+
+The report is printed (or written with `--output`) as JSON, together with the commit and dataset sizes,
+so runs of different releases can be compared. Throttling is disabled for the run.
+`order-events` is a stream, it's not benchmarked. `create-order` uploads files to the configured storage.
+
+Usage:
+    python -m benchmarks.api --seed --companies 500 --orders 50000 --output bench.json
+    python -m benchmarks.api --skip-http --iterations 50
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.utils import PROJECT_DIR, generate_latency_report, print_report, run_http_load, start_server
+
+# method, path, client call kwargs
+Request = tuple[str, str, dict[str, Any]]
+
+# Empty rates disable throttles of the server, see `THROTTLE_RATES`.
+UNTHROTTLED_ENV = {
+    "THROTTLE_LOGIN_IP_RATE": "",
+    "THROTTLE_LOGIN_EMAIL_RATE": "",
+    "THROTTLE_CREATE_USER_IP_RATE": "",
+    "THROTTLE_CREATE_USER_EMAIL_RATE": "",
+    "THROTTLE_ACCEPT_INVITE_IP_RATE": "",
+}
+
+
+def build_scenarios(dataset, iterations: int) -> dict[str, Callable[[int], Request]]:
+    """
+    Build request factories for every endpoint.
+
+    :param dataset: Seeded `benchmarks.dataset.Dataset`.
+    :param iterations: Count of requests per endpoint.
+    :return: Request factories by endpoint name, called with the iteration number.
+    """
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from benchmarks.dataset import BENCH_EMAIL, BENCH_PASSWORD, PREFIX
+    from users.services import UserService
+
+    order_ids = dataset.order_ids or [0]
+
+    def unique(length: int = 12) -> str:
+        return uuid.uuid4().hex[:length]
+
+    # Invites are created up front, so `accept-invite` measures only the acceptance.
+    invite_keys = [
+        invite["invite_url"].rsplit("=", 1)[-1]
+        for invite in UserService().invite_users(
+            company_id=dataset.company_id,
+            users=[
+                {"first_name": "bench", "last_name": "invite", "email": f"{PREFIX}-{unique()}@example.com", "phone_number": f"b{unique()}"}
+                for _ in range(iterations)
+            ],
+        )
+    ]
+
+    def json_post(path: str, data: dict) -> Request:
+        return "post", path, {"data": json.dumps(data), "content_type": "application/json"}
+
+    scenarios = {
+        "companies/get-user-company": lambda i: ("get", "/companies/get-user-company", {}),
+        "companies/get-companies": lambda i: (
+            "get",
+            "/companies/get-companies",
+            {"data": {"search_keyword": f"{PREFIX} company {i % 10}", "company_type": "CARRIER"}},
+        ),
+        "companies/create-company": lambda i: json_post(
+            "/companies/create-company",
+            {"name": f"{PREFIX} company {unique()}", "party_type": "SHIPPER", "address": "bench", "vat_number": f"{PREFIX}-{unique(8)}"},
+        ),
+        "companies/update-company": lambda i: json_post(
+            "/companies/update-company",
+            {"name": f"{PREFIX} company 0", "party_type": "FORWARDER", "address": f"bench {i}", "vat_number": dataset.company_vat, "ibans": []},
+        ),
+        "users/get-user-info": lambda i: ("get", "/users/get-user-info", {}),
+        "users/create-user": lambda i: json_post(
+            "/users/create-user",
+            {
+                "first_name": "bench",
+                "last_name": "user",
+                "email": f"{PREFIX}-{unique()}@example.com",
+                "password": BENCH_PASSWORD,
+                "phone_number": f"b{unique()}",
+            },
+        ),
+        "users/login-user": lambda i: json_post("/users/login-user", {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}),
+        "users/invite-users": lambda i: json_post(
+            "/users/invite-users",
+            {"users": [
+                {"first_name": "bench", "last_name": "invite", "email": f"{PREFIX}-{unique()}@example.com", "phone_number": f"b{unique()}"}
+                for _ in range(10)
+            ]},
+        ),
+        "users/accept-invite": lambda i: json_post("/users/accept-invite", {"key": invite_keys[i], "password": BENCH_PASSWORD}),
+        "users/ping-view": lambda i: json_post("/users/ping-view", {"ping": "PING"}),
+        "documents/get-orders": lambda i: ("get", "/documents/get-orders", {}),
+        "documents/get-order": lambda i: ("get", "/documents/get-order", {"data": {"order_id": order_ids[i % len(order_ids)]}}),
+        "documents/create-order": lambda i: (
+            "post",
+            "/documents/create-order",
+            {"data": {
+                "shipper_company_vat": dataset.shipper_vat,
+                "carrier_company_vat": dataset.carrier_vat,
+                "start_location": "bench start",
+                "end_location": "bench end",
+                "transportation_type": "TENT",
+                "container_type": "MEGA",
+                "loading_type": "TOP_LOAD",
+                "cargo_type": "TEA",
+                "cargo_category": "STANDARD",
+                "cargo_name": f"{PREFIX} cargo",
+                "weight": "100",
+                "price": "1000",
+                "currency": "GEL",
+                "insurance": "false",
+                "files": [SimpleUploadedFile(f"{PREFIX}-{unique()}.pdf", b"%PDF-1.4 bench", content_type="application/pdf")],
+            }},
+        ),
+    }
+    if settings.ACCESS_TOKENS_ENABLED:
+        scenarios["users/refresh-access-token"] = lambda i: json_post("/users/refresh-access-token", {})
+
+    return scenarios
+
+
+def run_test_client(dataset, iterations: int, warmup: int) -> dict[str, Any]:
+    """
+    Drive every endpoint through the Django test client.
+
+    :param dataset: Seeded `benchmarks.dataset.Dataset`.
+    :param iterations: Count of measured requests per endpoint.
+    :param warmup: Count of not measured requests per endpoint.
+    :return: Reports by endpoint name.
+    """
+    from django.test import Client, override_settings
+
+    from base_idcu.lib.queries import QueryLog, query_log_scope, track_queries
+
+    client = Client(raise_request_exception=False, headers={"Authorization": f"Token {dataset.token}"})
+    scenarios = build_scenarios(dataset, iterations=iterations + warmup)
+    reports = {}
+
+    with override_settings(THROTTLE_RATES={}):
+        for name, build_request in scenarios.items():
+            latencies, query_counts, errors = [], [], 0
+            started = 0.0
+            for i in range(warmup + iterations):
+                if i == warmup:
+                    started = time.perf_counter()
+
+                method, path, kwargs = build_request(i)
+                track_queries()
+                query_log = QueryLog()
+                request_started = time.perf_counter()
+                with query_log_scope(query_log):
+                    response = getattr(client, method)(path, **kwargs)
+                duration = time.perf_counter() - request_started
+
+                if i < warmup:
+                    continue
+                if response.status_code == 200:
+                    latencies.append(duration)
+                    query_counts.append(query_log.count)
+                else:
+                    errors += 1
+
+            report = generate_latency_report(latencies, time.perf_counter() - started, errors)
+            if query_counts:
+                report["queries_per_request"] = {
+                    "mean": round(sum(query_counts) / len(query_counts), 2),
+                    "max": max(query_counts),
+                }
+            reports[name] = report
+
+    return reports
+
+
+def run_http(dataset, mode: str, workers: int, requests: int, concurrency: int, port: int) -> dict[str, Any]:
+    """
+    Drive read endpoints, `login-user` and `ping-view` with concurrent HTTP clients.
+
+    :param dataset: Seeded `benchmarks.dataset.Dataset`.
+    :param mode: Server mode, `wsgi` or `asgi`.
+    :param workers: Count of gunicorn workers.
+    :param requests: Count of requests per endpoint.
+    :param concurrency: Count of concurrent clients.
+    :param port: Port to bind.
+    :return: Reports by endpoint name.
+    """
+    from benchmarks.dataset import BENCH_EMAIL, BENCH_PASSWORD, PREFIX
+
+    headers = {"Authorization": f"Token {dataset.token}"}
+    endpoints = {
+        "companies/get-user-company": ("GET", "/companies/get-user-company", {}),
+        "companies/get-companies": (
+            "GET",
+            "/companies/get-companies",
+            {"params": {"search_keyword": f"{PREFIX} company 1", "company_type": "CARRIER"}},
+        ),
+        "users/get-user-info": ("GET", "/users/get-user-info", {}),
+        "users/login-user": ("POST", "/users/login-user", {"data": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}}),
+        "users/ping-view": ("POST", "/users/ping-view", {"data": {"ping": "PING"}}),
+        "documents/get-orders": ("GET", "/documents/get-orders", {}),
+        "documents/get-order": ("GET", "/documents/get-order", {"params": {"order_id": dataset.order_ids[0]}}),
+    }
+
+    process = start_server(port=port, workers=workers, extra_env={"SERVER_MODE": mode, **UNTHROTTLED_ENV})
+    try:
+        return {
+            name: run_http_load(
+                method=method,
+                url=f"http://127.0.0.1:{port}{path}",
+                headers=headers,
+                total_requests=requests,
+                concurrency=concurrency,
+                **kwargs,
+            )
+            for name, (method, path, kwargs) in endpoints.items()
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def get_commit() -> str | None:
+    """
+    Get current git commit.
+
+    :return: Commit hash, None if not in a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="Delete previous benchmark data and seed a new dataset.")
+    parser.add_argument("--companies", type=int, default=200, help="Companies to seed.")
+    parser.add_argument("--ibans-per-company", type=int, default=2, help="IBANs to seed per company.")
+    parser.add_argument("--orders", type=int, default=20000, help="Orders to seed.")
+    parser.add_argument("--files-per-order", type=int, default=1, help="Files to seed per order.")
+    parser.add_argument("--random-seed", type=int, default=0, help="Seed of the dataset generator.")
+    parser.add_argument("--iterations", type=int, default=200, help="Test client requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=5, help="Not measured test client requests per endpoint.")
+    parser.add_argument("--skip-http", action="store_true", help="Skip the HTTP load phase.")
+    parser.add_argument("--mode", default="asgi", choices=["wsgi", "asgi"], help="Server mode of the HTTP phase.")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers of the HTTP phase.")
+    parser.add_argument("--requests", type=int, default=2000, help="HTTP requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent HTTP clients.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path, help="Write report to the file instead of stdout.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idcu.settings")
+    import django
+    from django.test.utils import setup_test_environment
+
+    django.setup()
+    setup_test_environment()
+
+    from benchmarks.dataset import get_dataset, seed_dataset
+
+    if args.seed:
+        dataset = seed_dataset(
+            companies=args.companies,
+            ibans_per_company=args.ibans_per_company,
+            orders=args.orders,
+            files_per_order=args.files_per_order,
+            seed=args.random_seed,
+        )
+    else:
+        dataset = get_dataset()
+
+    report = {
+        "meta": {
+            "commit": get_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": dataset.describe(),
+            "args": {key: str(value) for key, value in vars(args).items()},
+        },
+        "test_client": run_test_client(dataset, iterations=args.iterations, warmup=args.warmup),
+    }
+    if not args.skip_http:
+        report["http"] = {
+            "mode": args.mode,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "endpoints": run_http(
+                dataset,
+                mode=args.mode,
+                workers=args.workers,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                port=args.port,
+            ),
+        }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Compare response compression of typical order lists.
+
+For order lists of each size, orders shaped like `get-orders` responses are rendered the way `IDCUView` renders
+them, then compressed with every encoding (see `base_idcu.lib.compression`), reporting bytes, ratio and
+compression time per response. With `--token`, gunicorn is started and `get-orders` of the token's company is
+driven with each `Accept-Encoding`, reporting latency and bytes on the wire.
+
+Usage:
+    python -m benchmarks.compression --sizes 20 100 500 --token <auth token>
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import requests
+
+from benchmarks.utils import print_report, run_http_load, start_server
+
+ACCEPT_ENCODINGS = {"identity": "identity", "gzip": "gzip", "br": "br"}
+
+LOCATIONS = ["Tbilisi", "Batumi", "Poti", "Kutaisi", "Rustavi", "Istanbul", "Baku", "Yerevan", "Trabzon", "Constanta"]
+CARGO = [("TENT", "TEA", "STANDARD"), ("REEFER", "FOOD", "PERISHABLE"), ("FLAT_BED", "MACHINERY", "OVERSIZED")]
+
+
+def generate_orders(count: int, seed: int) -> list[dict]:
+    """
+    Generate orders shaped like `get-orders` response items.
+
+    :param count: Count of orders.
+    :param seed: Random seed.
+    :return: Order response data.
+    """
+    from django.utils import timezone
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    orders = []
+    for index in range(count):
+        transportation_type, cargo_type, cargo_category = rng.choice(CARGO)
+        orders.append(
+            {
+                "order_id": 100_000 + index,
+                "start_location": rng.choice(LOCATIONS),
+                "end_location": rng.choice(LOCATIONS),
+                "transportation_type": transportation_type,
+                "cargo_type": cargo_type,
+                "cargo_category": cargo_category,
+                "cargo_name": f"Cargo {rng.randint(1, 500)}",
+                "weight": Decimal(rng.randint(100, 2_400_000)) / 100,
+                "dimension": rng.choice([None, f"{rng.randint(1, 13)}x{rng.randint(1, 3)}x{rng.randint(1, 4)}"]),
+                "created_datetime": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            }
+        )
+
+    return orders
+
+
+def render_orders(orders: list[dict]) -> bytes:
+    """
+    Render orders like `OrdersView` does.
+
+    :param orders: Order response data.
+    :return: JSON content.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    from documents.serializers.output import OrderResponse
+
+    return JSONRenderer().render(OrderResponse(orders, many=True).data)
+
+
+def measure_encodings(content: bytes, iterations: int) -> dict:
+    """
+    Compress content with every encoding.
+
+    :param content: Response content.
+    :param iterations: Compressions per encoding, time is averaged.
+    :return: Bytes, ratio and mean compression time per encoding.
+    """
+    from base_idcu.lib.compression import ENCODINGS, compress
+
+    report = {"identity": {"bytes": len(content)}}
+    for encoding in ENCODINGS:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            compressed = compress(content, encoding)
+        elapsed = time.perf_counter() - started
+        report[encoding] = {
+            "bytes": len(compressed),
+            "ratio": round(len(content) / len(compressed), 2),
+            "compress_ms": round(elapsed / iterations * 1000, 3),
+        }
+
+    return report
+
+
+def measure_http(port: int, token: str, encoding: str, requests_count: int, concurrency: int) -> dict:
+    """
+    Drive `get-orders` with the `Accept-Encoding`.
+
+    :param port: Server port.
+    :param token: Auth token.
+    :param encoding: `Accept-Encoding` header.
+    :param requests_count: Count of requests.
+    :param concurrency: Concurrent clients.
+    :return: Latency report with bytes on the wire.
+    """
+    url = f"http://127.0.0.1:{port}/documents/get-orders"
+    headers = {"Authorization": f"Token {token}", "Accept-Encoding": encoding}
+    response = requests.get(url, headers=headers, stream=True)
+    wire_bytes = len(response.raw.read(decode_content=False))
+
+    report = run_http_load(
+        method="GET",
+        url=url,
+        headers=headers,
+        total_requests=requests_count,
+        concurrency=concurrency,
+    )
+    return {"wire_bytes": wire_bytes, "content_encoding": response.headers.get("Content-Encoding"), **report}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500], help="Orders per list.")
+    parser.add_argument("--iterations", type=int, default=50, help="Compressions per encoding and size.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--token", help="Auth token of a forwarder user, enables the HTTP phase.")
+    parser.add_argument("--server-mode", default="wsgi", choices=["wsgi", "asgi"], help="Server mode of HTTP phase.")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers.")
+    parser.add_argument("--requests", type=int, default=1000, help="HTTP requests per encoding.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent HTTP clients.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idcu.settings")
+    import django
+
+    django.setup()
+
+    report = {
+        "in_process": {
+            size: measure_encodings(render_orders(generate_orders(size, args.seed)), args.iterations)
+            for size in args.sizes
+        }
+    }
+
+    if args.token:
+        process = start_server(port=args.port, workers=args.workers, extra_env={"SERVER_MODE": args.server_mode})
+        try:
+            report["http"] = {
+                name: measure_http(args.port, args.token, encoding, args.requests, args.concurrency)
+                for name, encoding in ACCEPT_ENCODINGS.items()
+            }
+        finally:
+            process.terminate()
+            process.wait()
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Synthetic dataset for benchmarks.
+
+Rows are inserted with `bulk_create`, all benchmark rows are marked with `PREFIX`, so they can be told apart
+from (and deleted without touching) other data. The dataset is reproducible: the same sizes and seed
+produce the same rows.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from schwifty import IBAN
+
+from companies.lib.enum import CompanyParty
+from companies.models import Bank, Company, Iban
+from documents.lib.enum import OrderStatus
+from documents.models import Order, OrderFile
+from users.models import AuthToken, TRSUser
+
+__all__ = [
+    "BENCH_EMAIL",
+    "BENCH_PASSWORD",
+    "Dataset",
+    "delete_dataset",
+    "get_dataset",
+    "seed_dataset",
+]
+
+PREFIX = "bench"
+BENCH_EMAIL = f"{PREFIX}@example.com"
+BENCH_PASSWORD = "bench-password"
+BENCH_BANK_NAME = "BENCH BANK"
+BENCH_BANK_CODE = "BB"
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    """Benchmark dataset handles."""
+
+    user_id: int
+    token: str
+    company_id: int
+    company_vat: str
+    shipper_vat: str
+    carrier_vat: str
+    order_ids: list[int]
+    companies: int
+    ibans: int
+    orders: int
+    files: int
+
+    def describe(self) -> dict:
+        """
+        Describe dataset sizes for reports.
+
+        :return: Counts of seeded rows.
+        """
+        return {key: value for key, value in asdict(self).items() if key in ("companies", "ibans", "orders", "files")}
+
+
+def generate_iban(index: int) -> str:
+    """
+    Generate valid Georgian IBAN of the benchmark bank.
+
+    :param index: Account index.
+    :return: IBAN.
+    """
+    return IBAN.generate("GE", bank_code=BENCH_BANK_CODE, account_code=f"{index:016d}").compact
+
+
+@transaction.atomic
+def seed_dataset(
+    companies: int,
+    ibans_per_company: int,
+    orders: int,
+    files_per_order: int,
+    seed: int = 0,
+) -> Dataset:
+    """
+    Delete previous benchmark rows and seed new ones.
+
+    A tenth of companies are forwarders, the rest are split between carriers and shippers. The benchmark user
+    belongs to the first forwarder, which gets the same share of orders as every other forwarder.
+
+    :param companies: Count of companies.
+    :param ibans_per_company: Count of IBANs per company.
+    :param orders: Count of orders.
+    :param files_per_order: Count of files per order.
+    :param seed: Random seed.
+    :return: Seeded dataset.
+    """
+    delete_dataset()
+    rng = random.Random(seed)
+
+    bank, _ = Bank.objects.get_or_create(bank_name=BENCH_BANK_NAME, defaults={"bank_code": BENCH_BANK_CODE})
+
+    forwarders_count = max(1, companies // 10)
+    party_types = [CompanyParty.FORWARDER.value] * forwarders_count + [
+        CompanyParty.CARRIER.value if i % 2 else CompanyParty.SHIPPER.value for i in range(companies - forwarders_count)
+    ]
+    created_companies = Company.objects.bulk_create(
+        [
+            Company(
+                name=f"{PREFIX} company {i}",
+                party_type=party_type,
+                address=f"{PREFIX} address {i}",
+                vat_number=f"{PREFIX}-{i}",
+                contact_email=f"{PREFIX}-company-{i}@example.com",
+            )
+            for i, party_type in enumerate(party_types)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    Iban.objects.bulk_create(
+        [
+            Iban(
+                bank=bank,
+                company=company,
+                currency="GEL",
+                account_number=generate_iban(company_index * ibans_per_company + i),
+            )
+            for company_index, company in enumerate(created_companies)
+            for i in range(ibans_per_company)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    forwarders = [company for company in created_companies if company.party_type == CompanyParty.FORWARDER.value]
+    carriers = [company for company in created_companies if company.party_type == CompanyParty.CARRIER.value] or forwarders
+    shippers = [company for company in created_companies if company.party_type == CompanyParty.SHIPPER.value] or forwarders
+
+    user = TRSUser.objects.create(
+        username=BENCH_EMAIL,
+        email=BENCH_EMAIL,
+        password=make_password(BENCH_PASSWORD),
+        phone_number=f"{PREFIX}-0",
+        company=forwarders[0],
+    )
+    token = AuthToken.objects.create(
+        key=AuthToken.generate_key(),
+        user=user,
+        expires_at=timezone.now() + timedelta(days=30),
+    )
+
+    created_orders = Order.objects.bulk_create(
+        [
+            Order(
+                forwarder=forwarders[i % len(forwarders)],
+                shipper=rng.choice(shippers),
+                carrier=rng.choice(carriers),
+                start_location=f"{PREFIX} start {rng.randrange(100)}",
+                end_location=f"{PREFIX} end {rng.randrange(100)}",
+                transportation_type="TENT",
+                container_type="MEGA",
+                loading_type="TOP_LOAD",
+                cargo_type="TEA",
+                cargo_category="STANDARD",
+                cargo_name=f"{PREFIX} cargo",
+                weight=rng.randrange(1, 20000),
+                price=rng.randrange(100, 10000),
+                currency="GEL",
+                status=OrderStatus.IN_PROGRESS.name,
+            )
+            for i in range(orders)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    OrderFile.objects.bulk_create(
+        [
+            OrderFile(file=f"order_files/{PREFIX}-{order.id}-{i}.pdf", order=order)
+            for order in created_orders
+            for i in range(files_per_order)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    return get_dataset()
+
+
+def get_dataset() -> Dataset:
+    """
+    Get previously seeded dataset.
+
+    :return: Seeded dataset.
+
+    :raises LookupError: If dataset wasn't seeded.
+    """
+    user = TRSUser.objects.select_related("company").filter(email=BENCH_EMAIL).first()
+    token = AuthToken.objects.filter(user=user, expires_at__gt=timezone.now()).first() if user else None
+    if user is None or token is None:
+        raise LookupError("Benchmark dataset is not seeded, run with `--seed`.")
+
+    companies = Company.objects.filter(vat_number__startswith=f"{PREFIX}-").order_by("id")
+    orders = Order.objects.filter(cargo_name=f"{PREFIX} cargo")
+    return Dataset(
+        user_id=user.id,
+        token=token.key,
+        company_id=user.company_id,
+        company_vat=user.company.vat_number,
+        shipper_vat=companies.filter(party_type=CompanyParty.SHIPPER.value).values_list("vat_number", flat=True).first(),
+        carrier_vat=companies.filter(party_type=CompanyParty.CARRIER.value).values_list("vat_number", flat=True).first(),
+        order_ids=list(orders.filter(forwarder_id=user.company_id).values_list("id", flat=True)),
+        companies=companies.count(),
+        ibans=Iban.objects.filter(bank__bank_name=BENCH_BANK_NAME).count(),
+        orders=orders.count(),
+        files=OrderFile.objects.filter(file__startswith=f"order_files/{PREFIX}-").count(),
+    )
+
+
+def delete_dataset() -> None:
+    """Delete benchmark rows, including users and companies created by benchmarked endpoints."""
+    OrderFile.objects.filter(order__cargo_name=f"{PREFIX} cargo").delete()
+    Order.objects.filter(cargo_name=f"{PREFIX} cargo").delete()
+    TRSUser.objects.filter(email__startswith=PREFIX).delete()
+    Company.objects.filter(vat_number__startswith=f"{PREFIX}-").delete()
@@ -0,0 +1,117 @@
+"""
+Compare per-request database connection overhead of connection management modes.
+
+Modes:
+ - `per-request` - connection opened and closed by every request (`DB_CONN_MAX_AGE=0`, Django default).
+ - `persistent` - connection kept open between requests and health checked (`DB_CONN_MAX_AGE=60`).
+ - `pool` - connections taken from and returned to an in-process pool (`DB_POOL_ENABLED=true`).
+
+For each mode a request cycle (`request_started` cleanup, `SELECT 1`, `request_finished` cleanup) is timed
+in process against the configured database, which isolates the connection overhead. With `--token`,
+gunicorn is also started in each mode and `get-user-info` is driven concurrently.
+
+Usage:
+    python -m benchmarks.db_connections --cycles 500 --token <auth token>
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.utils import generate_latency_report, print_report, run_http_load, start_server
+
+MODES = {
+    "per-request": {"DB_POOL_ENABLED": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL_ENABLED": "false", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL_ENABLED": "true"},
+}
+
+
+def run_cycles(mode: str, cycles: int) -> dict:
+    """
+    Time request cycles with a database connection configured for the mode.
+
+    :param mode: Connection management mode.
+    :param cycles: Count of request cycles.
+    :return: Latency report.
+    """
+    from django.db import connections
+    from django.db.utils import load_backend
+
+    settings_dict = {**connections.settings["default"]}
+    if mode == "pool":
+        settings_dict.update(ENGINE="base_idcu.db.backends.postgresql_pool", CONN_MAX_AGE=0)
+    else:
+        settings_dict.update(ENGINE="django.db.backends.postgresql", CONN_MAX_AGE=int(MODES[mode]["DB_CONN_MAX_AGE"]))
+
+    connection = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, alias=f"bench-{mode}")
+    latencies = []
+    started = time.perf_counter()
+    try:
+        for _ in range(cycles):
+            cycle_started = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.close_if_unusable_or_obsolete()
+            latencies.append(time.perf_counter() - cycle_started)
+    finally:
+        connection.close()
+        if mode == "pool":
+            connection.pool.close()
+
+    return generate_latency_report(latencies, time.perf_counter() - started)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES), help="Modes to compare.")
+    parser.add_argument("--cycles", type=int, default=500, help="In-process request cycles per mode.")
+    parser.add_argument("--token", help="Auth token, enables the HTTP phase.")
+    parser.add_argument("--server-mode", default="wsgi", choices=["wsgi", "asgi"], help="Server mode of HTTP phase.")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers.")
+    parser.add_argument("--requests", type=int, default=2000, help="HTTP requests per mode.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent HTTP clients.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "idcu.settings")
+    import django
+
+    django.setup()
+
+    report = {"cycles": {mode: run_cycles(mode, args.cycles) for mode in args.modes}}
+    baseline = report["cycles"].get("per-request")
+    if baseline:
+        report["overhead_saved_ms"] = {
+            mode: round(baseline["latency_ms"]["mean"] - cycles_report["latency_ms"]["mean"], 3)
+            for mode, cycles_report in report["cycles"].items()
+            if mode != "per-request"
+        }
+
+    if args.token:
+        report["http"] = {}
+        for mode in args.modes:
+            process = start_server(
+                port=args.port,
+                workers=args.workers,
+                extra_env={"SERVER_MODE": args.server_mode, **MODES[mode]},
+            )
+            try:
+                report["http"][mode] = run_http_load(
+                    method="GET",
+                    url=f"http://127.0.0.1:{args.port}/users/get-user-info",
+                    headers={"Authorization": f"Token {args.token}"},
+                    total_requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+            finally:
+                process.terminate()
+                process.wait()
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
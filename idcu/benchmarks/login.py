@@ -0,0 +1,72 @@
+"""
+Measure `login-user` throughput per worker for each password hasher.
+
+For every hasher gunicorn is started with a single worker and `PASSWORD_HASHER` set,
+one login upgrades the user's password hash, then logins are driven concurrently
+while `get-user-info` is called in parallel, to see how much logins slow other endpoints down.
+
+Usage:
+    python -m benchmarks.login --email user@example.com --password <password>
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.utils import print_report, run_http_load, start_server
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True, help="Email of an existing user.")
+    parser.add_argument("--password", required=True, help="Password of the user.")
+    parser.add_argument("--hashers", nargs="+", default=["pbkdf2", "scrypt", "argon2"], help="Hashers to compare.")
+    parser.add_argument("--mode", default="asgi", choices=["wsgi", "asgi"], help="Server mode.")
+    parser.add_argument("--requests", type=int, default=200, help="Login requests per hasher.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent login clients.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    credentials = {"email": args.email, "password": args.password}
+
+    report = {"mode": args.mode, "workers": 1, "concurrency": args.concurrency, "hashers": {}}
+    for hasher in args.hashers:
+        process = start_server(
+            port=args.port,
+            workers=1,
+            extra_env={"SERVER_MODE": args.mode, "PASSWORD_HASHER": hasher},
+        )
+        try:
+            # The first login rehashes the password with the benchmarked hasher.
+            token = requests.post(f"{base_url}/users/login-user", data=credentials).json()["token"]
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                logins = executor.submit(
+                    run_http_load,
+                    method="POST",
+                    url=f"{base_url}/users/login-user",
+                    data=credentials,
+                    total_requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+                reads = executor.submit(
+                    run_http_load,
+                    method="GET",
+                    url=f"{base_url}/users/get-user-info",
+                    headers={"Authorization": f"Token {token}"},
+                    total_requests=args.requests,
+                    concurrency=2,
+                )
+                report["hashers"][hasher] = {"login-user": logins.result(), "get-user-info": reads.result()}
+        finally:
+            process.terminate()
+            process.wait()
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare `wsgi` and `asgi` server modes (see `gunicorn.conf.py`) on read-heavy endpoints.
+
+Runs gunicorn in each mode with the same worker count against the configured database
+and drives `get-orders`, `get-order`, `get-companies` and `get-user-info` concurrently.
+
+Usage:
+    python -m benchmarks.server_modes --token <auth token> --order-id 1 --search-keyword a
+"""
+
+import argparse
+
+from benchmarks.utils import print_report, run_http_load, start_server
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token", required=True, help="Auth token of a user attached to a forwarder company.")
+    parser.add_argument("--order-id", type=int, required=True, help="Order id for `get-order`.")
+    parser.add_argument("--search-keyword", default="a", help="Keyword for `get-companies`.")
+    parser.add_argument("--company-type", default="CARRIER", help="Company type for `get-companies`.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients.")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers in both modes.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Token {args.token}"}
+    endpoints = {
+        "get-orders": ("/documents/get-orders", {}),
+        "get-order": ("/documents/get-order", {"order_id": args.order_id}),
+        "get-companies": ("/companies/get-companies", {"search_keyword": args.search_keyword, "company_type": args.company_type}),
+        "get-user-info": ("/users/get-user-info", {}),
+    }
+
+    report = {"workers": args.workers, "concurrency": args.concurrency, "modes": {}}
+    for mode in ("wsgi", "asgi"):
+        process = start_server(port=args.port, workers=args.workers, extra_env={"SERVER_MODE": mode})
+        try:
+            report["modes"][mode] = {
+                name: run_http_load(
+                    method="GET",
+                    url=f"http://127.0.0.1:{args.port}{path}",
+                    params=params,
+                    headers=headers,
+                    total_requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+                for name, (path, params) in endpoints.items()
+            }
+        finally:
+            process.terminate()
+            process.wait()
+
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
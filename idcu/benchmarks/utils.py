@@ -0,0 +1,150 @@
+"""Shared helpers for benchmarks."""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+__all__ = [
+    "generate_latency_report",
+    "run_http_load",
+    "print_report",
+    "start_server",
+]
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def generate_latency_report(latencies: list[float], elapsed: float, errors: int = 0) -> dict[str, Any]:
+    """
+    Generate report for measured latencies.
+
+    :param latencies: Latencies of successful calls, in seconds.
+    :param elapsed: Wall time of the whole run, in seconds.
+    :param errors: Count of failed calls.
+    :return: Report with throughput and latency percentiles in milliseconds.
+    """
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+
+    ordered = sorted(latencies)
+
+    def percentile(value: float) -> float:
+        index = min(len(ordered) - 1, int(round(value / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered) * 1000, 3),
+            "p50": percentile(50),
+            "p90": percentile(90),
+            "p99": percentile(99),
+            "max": round(ordered[-1] * 1000, 3),
+        },
+    }
+
+
+def run_http_load(
+    method: str,
+    url: str,
+    total_requests: int,
+    concurrency: int,
+    headers: dict[str, str] | None = None,
+    params: dict[str, Any] | None = None,
+    data: dict[str, Any] | None = None,
+    is_success: Callable[[requests.Response], bool] = lambda response: response.ok,
+) -> dict[str, Any]:
+    """
+    Drive an HTTP endpoint with concurrent clients.
+
+    Each client keeps its own session, so connections are reused like with real clients.
+
+    :param method: HTTP method.
+    :param url: Full URL to call.
+    :param total_requests: Count of requests to send.
+    :param concurrency: Count of concurrent clients.
+    :param headers: Request headers.
+    :param params: Query parameters.
+    :param data: Form data for POST requests.
+    :param is_success: Predicate deciding whether the response counts as successful.
+    :return: Latency report.
+    """
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    per_client = [total_requests // concurrency + (1 if i < total_requests % concurrency else 0) for i in range(concurrency)]
+
+    def client(count: int) -> None:
+        nonlocal errors
+        session = requests.Session()
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, headers=headers, params=params, data=data)
+                succeeded = is_success(response)
+            except requests.RequestException:
+                succeeded = False
+            duration = time.perf_counter() - started
+
+            with lock:
+                if succeeded:
+                    latencies.append(duration)
+                else:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, per_client))
+    elapsed = time.perf_counter() - started
+
+    return generate_latency_report(latencies, elapsed, errors)
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """
+    Print report as JSON to stdout.
+
+    :param report: The report to print.
+    """
+    json.dump(report, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+
+
+def start_server(port: int, workers: int, extra_env: dict[str, str] | None = None) -> subprocess.Popen:
+    """
+    Start gunicorn (see `gunicorn.conf.py`) and wait until it accepts connections.
+
+    :param port: Port to bind.
+    :param workers: Count of gunicorn workers.
+    :param extra_env: Environment variables to override, e.g. `SERVER_MODE`.
+    :return: Server process.
+    """
+    env = {
+        **os.environ,
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        "GUNICORN_WORKERS": str(workers),
+        **(extra_env or {}),
+    }
+    process = subprocess.Popen(["gunicorn", "--config", "gunicorn.conf.py"], cwd=PROJECT_DIR, env=env)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/users/ping-view", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Server didn't start.")
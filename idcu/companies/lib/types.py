@@ -1,5 +1,6 @@
 """Module representing data types for `companies` package."""
 
+from datetime import datetime
 from typing import TypedDict
 
 
@@ -10,6 +11,17 @@ class Iban(TypedDict):
     account_number: str
 
 
+class OrderCounters(TypedDict):
+    """Order counts of a company per its role in orders."""
+    forwarder_active_orders: int
+    forwarder_total_orders: int
+    shipper_active_orders: int
+    shipper_total_orders: int
+    carrier_active_orders: int
+    carrier_total_orders: int
+    last_order_date: datetime | None
+
+
 class Company(TypedDict):
     """Company details."""
     name: str
@@ -20,4 +32,6 @@ class Company(TypedDict):
     contact_number: str | None
     contact_email: str | None
     ibans: list[Iban]
+    active_orders: int | None
+    order_counters: OrderCounters | None
 
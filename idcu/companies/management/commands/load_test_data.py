@@ -1,26 +1,53 @@
 """Script to load test data"""
 
-from django.core.management import BaseCommand
+import time
+
+from django.core.management import BaseCommand, CommandError
 from companies.models import Bank
+from companies.services import CompanyServices
+from companies.test_data import TestDataGenerator
 from users.models import TRSUser
 
 
 class Command(BaseCommand):
-    """Creates Test Data."""
+    """
+    Creates Test Data.
+
+    Without arguments creates banks and superuser only, with `--companies`, `--orders` and `--files`
+    generates production-like data of given size, e.g. for benchmarks and migration rehearsals:
+
+        python manage.py load_test_data --companies 50000 --orders 5000000 --files 10000000 --seed 1
+    """
+
+    help = "Create banks and superuser, optionally generate synthetic companies, orders and order files."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--companies", type=int, default=0, help="Count of companies to generate.")
+        parser.add_argument("--orders", type=int, default=0, help="Count of orders to generate.")
+        parser.add_argument("--files", type=int, default=0, help="Count of order files to generate.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed, same seed generates same data.")
+        parser.add_argument("--months", type=int, default=12, help="Count of months orders are spread over.")
 
     def handle(self, *args, **options):
         """Load test data"""
 
+        if min(options["companies"], options["orders"], options["files"]) < 0 or options["months"] < 1:
+            raise CommandError("Counts can't be negative and at least one month is needed.")
+        if options["files"] and not options["orders"]:
+            raise CommandError("Files are attached to generated orders, `--orders` is required.")
+
         self.create_banks()
         self.create_superuser()
 
+        if options["companies"] or options["orders"]:
+            self.generate_data(options)
+
     def create_banks(self) -> None:
         """Create banks for test data."""
 
-        Bank.objects.all().delete()
-
-        Bank.objects.create(bank_name="BOG", bank_code="BG")
-        Bank.objects.create(bank_name="TBC", bank_code="TB")
+        Bank.objects.get_or_create(bank_name="BOG", defaults={"bank_code": "BG"})
+        Bank.objects.get_or_create(bank_name="TBC", defaults={"bank_code": "TB"})
 
         print("BANKS CREATED")
         print("---------------------------------------------")
@@ -29,6 +56,9 @@ class Command(BaseCommand):
         """Create superuser"""
 
         user_info = "testuser@gmail.com"
+        if TRSUser.objects.filter(username=user_info).exists():
+            return
+
         TRSUser.objects.create_superuser(
             username=user_info,
             email=user_info,
@@ -37,3 +67,24 @@ class Command(BaseCommand):
 
         print("SUPERUSER CREATED")
         print("---------------------------------------------")
+
+    def generate_data(self, options: dict) -> None:
+        """Generate synthetic data."""
+
+        started_at = time.perf_counter()
+        generator = TestDataGenerator(seed=options["seed"], months=options["months"])
+        try:
+            counts = generator.generate(
+                companies=options["companies"],
+                orders=options["orders"],
+                files=options["files"],
+            )
+        except ValueError as error:
+            raise CommandError(str(error)) from error
+
+        for table, count in counts.items():
+            self.stdout.write(f"{table}: {count} rows loaded.")
+        # Rows are loaded with `COPY`, without signals maintaining order counters.
+        corrected = CompanyServices().reconcile_order_counters()
+        self.stdout.write(f"Order counters of {corrected} companies recounted.")
+        self.stdout.write(f"Test data generated in {time.perf_counter() - started_at:.1f}s.")
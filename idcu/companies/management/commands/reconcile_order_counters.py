@@ -0,0 +1,27 @@
+"""Command to recount order counters of companies."""
+
+import time
+
+from django.core.management import BaseCommand
+
+from companies.services import CompanyServices
+
+
+class Command(BaseCommand):
+    """
+    Recounts `CompanyOrderCounters` of all companies from their orders and corrects the drifted ones.
+
+    Counters are maintained on order changes, orders written without model signals (e.g. `load_test_data`,
+    archived or restored order partitions) need a reconciliation, e.g. scheduled daily after
+    `manage_order_partitions`.
+    """
+
+    help = "Recount order counters of companies."
+
+    def handle(self, *args, **options):
+        """Reconcile order counters."""
+
+        started_at = time.perf_counter()
+        corrected = CompanyServices().reconcile_order_counters()
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(f"Order counters of {corrected} companies corrected in {elapsed:.1f}s.")
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-19 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyOrderCounters',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_counters', serialize=False, to='companies.company')),
+                ('forwarder_active_orders', models.IntegerField(default=0)),
+                ('forwarder_total_orders', models.IntegerField(default=0)),
+                ('shipper_active_orders', models.IntegerField(default=0)),
+                ('shipper_total_orders', models.IntegerField(default=0)),
+                ('carrier_active_orders', models.IntegerField(default=0)),
+                ('carrier_total_orders', models.IntegerField(default=0)),
+                ('last_order_date', models.DateTimeField(default=None, null=True)),
+            ],
+        ),
+    ]
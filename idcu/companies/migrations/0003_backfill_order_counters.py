@@ -0,0 +1,55 @@
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+ROLES = ("forwarder", "shipper", "carrier")
+FINISHED = "FINISHED"
+
+
+def backfill_order_counters(apps, schema_editor):
+    """
+    Count orders of existing companies, the same way `reconcile_order_counters` does.
+
+    Orders created later are counted by `documents.signals`.
+    """
+    Company = apps.get_model("companies", "Company")
+    CompanyOrderCounters = apps.get_model("companies", "CompanyOrderCounters")
+
+    counters = {}
+    for role in ROLES:
+        relation = f"{role}_orders"
+        rows = Company.objects.values("id").annotate(
+            total_orders=Count(relation),
+            active_orders=Count(relation, filter=~Q(**{f"{relation}__status": FINISHED})),
+            last_order_date=Max(f"{relation}__date_created"),
+        )
+        for row in rows.iterator():
+            company_counters = counters.setdefault(row["id"], CompanyOrderCounters(company_id=row["id"]))
+            setattr(company_counters, f"{role}_total_orders", row["total_orders"])
+            setattr(company_counters, f"{role}_active_orders", row["active_orders"])
+            if row["last_order_date"] is not None:
+                company_counters.last_order_date = max(
+                    filter(None, [company_counters.last_order_date, row["last_order_date"]])
+                )
+
+    CompanyOrderCounters.objects.bulk_create(
+        counters.values(),
+        update_conflicts=True,
+        unique_fields=["company"],
+        update_fields=[
+            *(f"{role}_{count}_orders" for role in ROLES for count in ("active", "total")),
+            "last_order_date",
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0002_company_order_counters'),
+        ('documents', '0003_partition_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_counters, migrations.RunPython.noop),
+    ]
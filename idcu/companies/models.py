@@ -50,6 +50,37 @@ class Company(TimestampMixin):
         return f"{self.name} | {self.party_type} | {self.address}"
 
 
+class CompanyOrderCounters(models.Model):
+    """
+    Order counts of a company per its role in orders, maintained on order changes (see `documents.signals`).
+
+    Orders are active until they're `FINISHED`. Counts orders in `documents_order`,
+    `reconcile_order_counters` command recounts them.
+    """
+
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="order_counters",
+    )
+    forwarder_active_orders = models.IntegerField(default=0)
+    forwarder_total_orders = models.IntegerField(default=0)
+    shipper_active_orders = models.IntegerField(default=0)
+    shipper_total_orders = models.IntegerField(default=0)
+    carrier_active_orders = models.IntegerField(default=0)
+    carrier_total_orders = models.IntegerField(default=0)
+    last_order_date = models.DateTimeField(null=True, default=None)
+
+    @property
+    def active_orders(self) -> int:
+        """Active orders of the company in any role."""
+        return self.forwarder_active_orders + self.shipper_active_orders + self.carrier_active_orders
+
+    def __str__(self):
+        return f"{self.company_id} | active: {self.active_orders}"
+
+
 class Iban(TimestampMixin):
     """Model defining iban data."""
 
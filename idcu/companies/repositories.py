@@ -1,7 +1,34 @@
 """Repositories module for `Company` model."""
 
+from datetime import datetime
+
+from base_idcu.lib.identity_map import add_identity, get_identity
+from base_idcu.lib.repository_cache import cached_lookup
 from companies import models, exceptions
-from django.db.models import Q, QuerySet
+from django.db.models import Count, DateTimeField, F, Max, Q, QuerySet, Value
+from django.db.models.functions import Greatest
+from documents.lib.enum import OrderStatus
+
+# Columns of `CompanyResponse` fields, so sparse fieldsets load only the columns and IBANs they need.
+COMPANY_FIELD_COLUMNS: dict[str, tuple[str, ...]] = {
+    "name": ("name",),
+    "party_type": ("party_type",),
+    "address": ("address",),
+    "vat_number": ("vat_number",),
+    "contact_name": ("contact_name",),
+    "contact_number": ("contact_number",),
+    "contact_email": ("contact_email",),
+    "ibans": (),
+    "active_orders": (),
+    "order_counters": (),
+}
+
+# Roles of a company in orders, with the `Company` relation to its orders.
+ORDER_COUNTER_ROLES: dict[str, str] = {
+    "forwarder": "forwarder_orders",
+    "shipper": "shipper_orders",
+    "carrier": "carrier_orders",
+}
 
 
 class CompanyRepository:
@@ -39,6 +66,8 @@ class CompanyRepository:
             contact_number=contact_number,
             contact_email=contact_email,
         )
+        # Created upfront, so serializing the new company doesn't query them.
+        models.CompanyOrderCounters.objects.create(company=company)
 
         return company
 
@@ -62,18 +91,66 @@ class CompanyRepository:
 
         return company
 
-    def get_companies_by_keyword(self, search_keyword: str, company_type: str) -> QuerySet[models.Company]:
+    def get_companies_by_keyword(
+        self,
+        search_keyword: str,
+        company_type: str,
+        fields: frozenset[str] | None = None,
+    ) -> QuerySet[models.Company]:
         """
-        Fetch forwarder company for given user.
+        Get companies by keyword, with IBANs loaded.
 
         :param search_keyword: The keyword to filter companies.
         :param company_type: Company party types to filter.
+        :param fields: `CompanyResponse` fields to load, with IBANs and order counters only if requested. All if None.
         :return: Queryset of `models.Company` instances.
         """
-        return models.Company.objects.filter(
+        companies = models.Company.objects.filter(
             Q(name__icontains=search_keyword) | Q(vat_number__icontains=search_keyword),
             party_type=company_type,
         )
+        if fields is None:
+            return companies.select_related("order_counters").prefetch_related("iban_set__bank")
+
+        # Primary key is always loaded.
+        companies = companies.only(*{column for field in fields for column in COMPANY_FIELD_COLUMNS[field]} or {"id"})
+        if "ibans" in fields:
+            companies = companies.prefetch_related("iban_set__bank")
+        if fields & {"active_orders", "order_counters"}:
+            companies = companies.select_related("order_counters")
+
+        return companies
+
+    async def aget_companies_by_keyword(
+        self,
+        search_keyword: str,
+        company_type: str,
+        fields: frozenset[str] | None = None,
+    ) -> list[models.Company]:
+        """
+        Get companies by keyword, with IBANs loaded.
+
+        :param search_keyword: The keyword to filter companies.
+        :param company_type: Company party types to filter.
+        :param fields: `CompanyResponse` fields to load, with IBANs only if requested. All if None.
+        :return: List of `models.Company` instances.
+        """
+        companies = self.get_companies_by_keyword(search_keyword=search_keyword, company_type=company_type, fields=fields)
+        return [company async for company in companies]
+
+    @cached_lookup(namespace="company-by-id", invalidated_by=[models.Company, models.Iban, models.Bank])
+    async def aget_company_by_id(self, company_id: int) -> models.Company | None:
+        """
+        Get company by id, with IBANs loaded, cached.
+        Order counters change with every order, so they aren't cached with the company (see `aget_order_counters`).
+
+        :param company_id: Company's identifier.
+        :return: `models.Company` instance if exists, else None.
+        """
+        try:
+            return await models.Company.objects.prefetch_related("iban_set__bank").aget(id=company_id)
+        except models.Company.DoesNotExist:
+            return None
 
     def get_company_by_name_or_vat(self, name: str | None = None, vat: str | None = None) -> models.Company | None:
         """
@@ -89,23 +166,29 @@ class CompanyRepository:
             raise exceptions.CompanyIdentifiersNotProvidedError()
 
         try:
-            return models.Company.objects.get(Q(name=name) | Q(vat_number=vat))
+            return models.Company.objects.select_related("order_counters").get(Q(name=name) | Q(vat_number=vat))
 
         except models.Company.DoesNotExist:
             return None
 
     def get_company_by_vat(self, vat_number: str) -> models.Company | None:
         """
-        Get company by vat code.
+        Get company by vat code, reusing the company already loaded by the request.
 
         :param vat_number: Company's VAT number.
         :return: `models.Company` instance if exists, else None.
         """
+        company = get_identity(models.Company, "vat_number", vat_number)
+        if company is not None:
+            return company
+
         try:
-            return models.Company.objects.get(vat_number=vat_number)
+            company = models.Company.objects.select_related("order_counters").get(vat_number=vat_number)
         except models.Company.DoesNotExist:
             return None
 
+        return add_identity(company, fields=("vat_number",))
+
     def create_ibans_for_company(
         self,
         bank: models.Bank,
@@ -142,15 +225,32 @@ class CompanyRepository:
 
     def get_bank_by_name(self, bank_name: str) -> models.Bank | None:
         """
-        Get bank by name.
+        Get bank by name, reusing the bank already loaded by the request.
 
         :param bank_name: Bank name.
         :return: `models.Bank` instance if exists or None.`
         """
+        bank = get_identity(models.Bank, "bank_name", bank_name)
+        if bank is not None:
+            return bank
+
+        bank = self._load_bank_by_name(bank_name=bank_name)
+        if bank is None:
+            return None
+
+        return add_identity(bank, fields=("bank_name",))
+
+    # Banks are only referenced by IBANs of write paths, never updated, so cached ones are used in transactions too.
+    @cached_lookup(namespace="bank-by-name", invalidated_by=[models.Bank], in_transactions=True)
+    def _load_bank_by_name(self, bank_name: str) -> models.Bank | None:
+        """
+        Load bank by name, cached.
 
+        :param bank_name: Bank name.
+        :return: `models.Bank` instance if exists or None.`
+        """
         try:
             return models.Bank.objects.get(bank_name=bank_name)
-
         except models.Bank.DoesNotExist:
             return None
 
@@ -168,3 +268,96 @@ class CompanyRepository:
         except models.Iban.DoesNotExist:
             return None
 
+    def get_order_counters(self, company_id: int) -> models.CompanyOrderCounters:
+        """
+        Get order counters of company.
+
+        :param company_id: Company's identifier.
+        :return: `models.CompanyOrderCounters` instance, with zero counts if company has none yet.
+        """
+        counters = models.CompanyOrderCounters.objects.filter(company_id=company_id).first()
+        return counters or models.CompanyOrderCounters(company_id=company_id)
+
+    async def aget_order_counters(self, company_id: int) -> models.CompanyOrderCounters:
+        """
+        Async version of `get_order_counters`.
+
+        :param company_id: Company's identifier.
+        :return: `models.CompanyOrderCounters` instance, with zero counts if company has none yet.
+        """
+        counters = await models.CompanyOrderCounters.objects.filter(company_id=company_id).afirst()
+        return counters or models.CompanyOrderCounters(company_id=company_id)
+
+    def update_order_counters(self, counts: dict[int, dict[str, int]], last_order_date: datetime | None = None) -> None:
+        """
+        Add order counts to the counters of companies, creating missing counters.
+
+        Counters are updated in order of company ids, so concurrent order changes don't deadlock.
+
+        :param counts: Counts to add (negative to subtract) by company identifier and counter name.
+        :param last_order_date: Creation date of the order, set as last order date of companies it's added to.
+        """
+        for company_id in sorted(counts):
+            values = {name: F(name) + count for name, count in counts[company_id].items() if count}
+            if last_order_date is not None and any(
+                count > 0 for name, count in counts[company_id].items() if name.endswith("_total_orders")
+            ):
+                # `GREATEST` ignores NULL, so it's set for the first order too.
+                values["last_order_date"] = Greatest(
+                    "last_order_date",
+                    Value(last_order_date, output_field=DateTimeField()),
+                )
+            if not values:
+                continue
+
+            counters = models.CompanyOrderCounters.objects.filter(company_id=company_id)
+            if not counters.update(**values):
+                models.CompanyOrderCounters.objects.bulk_create(
+                    [models.CompanyOrderCounters(company_id=company_id)],
+                    ignore_conflicts=True,
+                )
+                counters.update(**values)
+
+    def reconcile_order_counters(self) -> int:
+        """
+        Recount order counters of all companies from their orders, must run in a transaction.
+
+        Existing counters are locked first, so orders changed meanwhile update the counters after the recount.
+
+        :return: Count of companies, whose counters were corrected.
+        """
+        locked_counters = models.CompanyOrderCounters.objects.select_for_update()
+        current = {counters.company_id: counters for counters in locked_counters}
+
+        recounted: dict[int, models.CompanyOrderCounters] = {}
+        for role, relation in ORDER_COUNTER_ROLES.items():
+            rows = models.Company.objects.values("id").annotate(
+                total_orders=Count(relation),
+                active_orders=Count(relation, filter=~Q(**{f"{relation}__status": OrderStatus.FINISHED.name})),
+                last_order_date=Max(f"{relation}__date_created"),
+            )
+            for row in rows.iterator():
+                counters = recounted.setdefault(row["id"], models.CompanyOrderCounters(company_id=row["id"]))
+                setattr(counters, f"{role}_total_orders", row["total_orders"])
+                setattr(counters, f"{role}_active_orders", row["active_orders"])
+                if row["last_order_date"] is not None:
+                    counters.last_order_date = max(filter(None, [counters.last_order_date, row["last_order_date"]]))
+
+        counter_fields = [
+            field.name for field in models.CompanyOrderCounters._meta.concrete_fields if not field.primary_key
+        ]
+        corrected = [
+            counters
+            for company_id, counters in recounted.items()
+            if company_id not in current
+            or any(getattr(counters, name) != getattr(current[company_id], name) for name in counter_fields)
+        ]
+        models.CompanyOrderCounters.objects.bulk_create(
+            corrected,
+            update_conflicts=True,
+            unique_fields=["company"],
+            update_fields=counter_fields,
+            batch_size=1000,
+        )
+
+        return len(corrected)
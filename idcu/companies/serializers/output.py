@@ -11,6 +11,18 @@ class Iban(BasicSerializer):
     account_number = serializers.CharField()
 
 
+class OrderCounters(BasicSerializer):
+    """Serializer for order counts of a company per its role in orders."""
+
+    forwarder_active_orders = serializers.IntegerField()
+    forwarder_total_orders = serializers.IntegerField()
+    shipper_active_orders = serializers.IntegerField()
+    shipper_total_orders = serializers.IntegerField()
+    carrier_active_orders = serializers.IntegerField()
+    carrier_total_orders = serializers.IntegerField()
+    last_order_date = serializers.DateTimeField(allow_null=True)
+
+
 class CompanyResponse(BasicSerializer):
     """Serializer to output Company details."""
 
@@ -22,7 +34,8 @@ class CompanyResponse(BasicSerializer):
     contact_name = serializers.CharField(allow_null=True)
     contact_number = serializers.CharField(allow_null=True)
     contact_email = serializers.CharField(allow_null=True)
-    # active_orders = serializers.ListField(allow_null=True)
+    active_orders = serializers.IntegerField(allow_null=True)
+    order_counters = OrderCounters(allow_null=True)
 
 
 class CompaniesResponse(BasicSerializer):
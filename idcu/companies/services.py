@@ -1,6 +1,8 @@
 """Services module for `companies` package."""
 
-from django.db import transaction
+from typing import cast
+
+from django.db.models import prefetch_related_objects
 from django.core.exceptions import ValidationError
 
 from users.models import TRSUser
@@ -11,6 +13,7 @@ from companies.lib import types
 from companies.lib.utils import check_iban_validity
 from companies.lib.enum import CompanyParty
 from companies import models, exceptions
+from base_idcu.lib.transactions import read_only, read_write
 
 
 class CompanyServices:
@@ -20,11 +23,13 @@ class CompanyServices:
         self.company_repository = CompanyRepository()
         self.user_repository = UserRepository()
 
-    def fetch_forwarder_company_for_user(self, user: TRSUser) -> types.Company:
+    @read_only
+    def fetch_forwarder_company_for_user(self, user: TRSUser, fields: frozenset[str] | None = None) -> types.Company:
         """
         Fetch forwarder company for given user.
 
         :param user: `models.TRSUser` instance for fetch forwarder company.
+        :param fields: Sparse fieldset of company, all if None.
         :return: Serialized `models.Company` instance for given user.
 
         :raises CompanyNotFoundError: If user is not attached to any forwarder companies.
@@ -33,19 +38,89 @@ class CompanyServices:
         if not forwarder_company:
             raise exceptions.CompanyNotFoundError(f"{user.username} is not attached to any forwarder companies.")
 
-        return self._serialize_company(user.company)
+        if self._requests_order_counters(fields):
+            # User's company is cached with the user, its order counters aren't.
+            forwarder_company.order_counters = self.company_repository.get_order_counters(company_id=forwarder_company.id)
+
+        return self._serialize_company(forwarder_company, fields=fields)
+
+    @read_only
+    async def afetch_forwarder_company_for_user(
+        self,
+        user: TRSUser,
+        fields: frozenset[str] | None = None,
+    ) -> types.Company:
+        """
+        Async version of `fetch_forwarder_company_for_user`.
+
+        :param user: `models.TRSUser` instance for fetch forwarder company.
+        :param fields: Sparse fieldset of company, all if None.
+        :return: Serialized `models.Company` instance for given user.
 
-    def fetch_company_by_keyword(self, search_keyword: str, company_type: str) -> list[types.Company]:
+        :raises CompanyNotFoundError: If user is not attached to any forwarder companies.
+        """
+        forwarder_company = None
+        if TRSUser.company.is_cached(user):
+            forwarder_company = user.company
+        elif user.company_id is not None:
+            forwarder_company = await self.company_repository.aget_company_by_id(company_id=user.company_id)
+
+        if not forwarder_company:
+            raise exceptions.CompanyNotFoundError(f"{user.username} is not attached to any forwarder companies.")
+
+        if self._requests_order_counters(fields):
+            # User's company is cached with the user or by id, its order counters aren't.
+            forwarder_company.order_counters = await self.company_repository.aget_order_counters(
+                company_id=forwarder_company.id
+            )
+
+        return self._serialize_company(forwarder_company, fields=fields)
+
+    @read_only
+    def fetch_company_by_keyword(
+        self,
+        search_keyword: str,
+        company_type: str,
+        fields: frozenset[str] | None = None,
+    ) -> list[types.Company]:
         """
         Fetch companies by provided keyword.
 
         :param search_keyword: The keyword to filter companies.
         :param company_type: Company party types to filter.
+        :param fields: Sparse fieldset of companies, all if None.
         :return: Serialized list `models.Company` instances.
         """
-        companies = self.company_repository.get_companies_by_keyword(search_keyword=search_keyword, company_type=company_type)
-        return [self._serialize_company(company) for company in companies]
+        companies = self.company_repository.get_companies_by_keyword(
+            search_keyword=search_keyword,
+            company_type=company_type,
+            fields=fields,
+        )
+        return [self._serialize_company(company, fields=fields) for company in companies]
+
+    @read_only
+    async def afetch_company_by_keyword(
+        self,
+        search_keyword: str,
+        company_type: str,
+        fields: frozenset[str] | None = None,
+    ) -> list[types.Company]:
+        """
+        Async version of `fetch_company_by_keyword`.
 
+        :param search_keyword: The keyword to filter companies.
+        :param company_type: Company party types to filter.
+        :param fields: Sparse fieldset of companies, all if None.
+        :return: Serialized list `models.Company` instances.
+        """
+        companies = await self.company_repository.aget_companies_by_keyword(
+            search_keyword=search_keyword,
+            company_type=company_type,
+            fields=fields,
+        )
+        return [self._serialize_company(company, fields=fields) for company in companies]
+
+    @read_only
     def fetch_company_by_vat(self, vat: str) -> types.Company:
         """
         Fetch company by code.
@@ -55,13 +130,14 @@ class CompanyServices:
 
         :raises CompanyNotFoundError: If company doesn't exist by requested vat.
         """
-        company = self.company_repository.get_company_by_name_or_vat(vat=vat)
+        company = self.company_repository.get_company_by_vat(vat_number=vat)
 
         if company is None:
             raise exceptions.CompanyNotFoundError(f"Company not found by VAT `{vat}`")
 
         return self._serialize_company(company=company)
 
+    @read_only
     def fetch_company_by_name(self, name: str) -> types.Company:
         """
         Fetch company by name.
@@ -77,7 +153,7 @@ class CompanyServices:
 
         return self._serialize_company(company=company)
 
-    @transaction.atomic
+    @read_write
     def create_ibans_for_company(
         self,
         company: models.Company,
@@ -114,7 +190,7 @@ class CompanyServices:
         except ValidationError as e:
             raise exceptions.IbanAlreadyExistError(e.message)
 
-    @transaction.atomic
+    @read_write
     def update_ibans_for_company(
         self,
         company: models.Company,
@@ -142,7 +218,7 @@ class CompanyServices:
             account_number=account_number,
         )
 
-    @transaction.atomic
+    @read_write
     def delete_ibans_for_company(self, company: models.Company) -> None:
         """
         Delete IBAN instances for company.
@@ -152,7 +228,7 @@ class CompanyServices:
         """
         self.company_repository.delete_ibans_for_company(company=company)
 
-    @transaction.atomic
+    @read_write
     def create_company(
         self,
         name: str,
@@ -219,7 +295,7 @@ class CompanyServices:
                 phone_number=phone_number,
             )
 
-    @transaction.atomic
+    @read_write
     def update_company(
         self,
         name: str,
@@ -236,7 +312,7 @@ class CompanyServices:
         :param ibans: List of company's IBANs.
         :return: Serialized updated `models.Company` instance.
         """
-        company = self.company_repository.get_company_by_name_or_vat(vat=vat_number)
+        company = self.company_repository.get_company_by_vat(vat_number=vat_number)
         if company is None:
             raise exceptions.CompanyNotFoundError(
                 f"Company not found by provided VAT `{vat_number}`"
@@ -258,6 +334,15 @@ class CompanyServices:
 
         return self._serialize_company(company)
 
+    @read_write
+    def reconcile_order_counters(self) -> int:
+        """
+        Recount order counters of all companies, correcting drift (e.g. orders loaded or archived without signals).
+
+        :return: Count of companies, whose counters were corrected.
+        """
+        return self.company_repository.reconcile_order_counters()
+
     def _create_shipper_company(
         self,
         name: str,
@@ -378,14 +463,25 @@ class CompanyServices:
 
         return self._serialize_company(company=company)
 
-    def _serialize_company(self, company: models.Company) -> types.Company:
+    def _serialize_company(self, company: models.Company, fields: frozenset[str] | None = None) -> types.Company:
         """
         Serialize `models.Company` instance.
 
         :param company: `models.Company` instance to serialize.
+        :param fields: Sparse fieldset, only these fields are serialized (and IBANs loaded if requested). All if None.
         :return: Serialized `models.Company` instance.
         """
-        ibans = [self._serialize_iban(iban) for iban in company.ibans]
+        if fields is not None:
+            serializers = {
+                "ibans": self._serialize_company_ibans,
+                "active_orders": self._serialize_active_orders,
+                "order_counters": self._serialize_order_counters,
+            }
+            return cast(types.Company, {
+                name: serializers[name](company) if name in serializers else getattr(company, name)
+                for name in types.Company.__annotations__
+                if name in fields
+            })
 
         return types.Company(
             name=company.name,
@@ -395,10 +491,78 @@ class CompanyServices:
             contact_name=company.contact_name,
             contact_number=company.contact_number,
             contact_email=company.contact_email,
-            ibans=ibans,
-            # active_orders=None,
+            ibans=self._serialize_company_ibans(company),
+            active_orders=self._serialize_active_orders(company),
+            order_counters=self._serialize_order_counters(company),
+        )
+
+    def _serialize_company_ibans(self, company: models.Company) -> list[types.Iban]:
+        """
+        Serialize IBANs of `models.Company` instance.
+
+        :param company: `models.Company` instance.
+        :return: Serialized `models.Iban` instances.
+        """
+        # No queries if IBANs are already loaded, otherwise IBANs with banks are loaded in two queries, not 1 + N.
+        prefetch_related_objects([company], "iban_set__bank")
+        return [self._serialize_iban(iban) for iban in company.ibans]
+
+    def _serialize_active_orders(self, company: models.Company) -> int | None:
+        """
+        Serialize count of active orders of `models.Company` instance in any role.
+
+        :param company: `models.Company` instance.
+        :return: Count of active orders, None if order counters weren't loaded with the company.
+        """
+        counters = self._get_order_counters(company)
+        return counters.active_orders if counters is not None else None
+
+    def _serialize_order_counters(self, company: models.Company) -> types.OrderCounters | None:
+        """
+        Serialize order counters of `models.Company` instance.
+
+        :param company: `models.Company` instance.
+        :return: Serialized `models.CompanyOrderCounters` instance, None if they weren't loaded with the company.
+        """
+        counters = self._get_order_counters(company)
+        if counters is None:
+            return None
+
+        return types.OrderCounters(
+            forwarder_active_orders=counters.forwarder_active_orders,
+            forwarder_total_orders=counters.forwarder_total_orders,
+            shipper_active_orders=counters.shipper_active_orders,
+            shipper_total_orders=counters.shipper_total_orders,
+            carrier_active_orders=counters.carrier_active_orders,
+            carrier_total_orders=counters.carrier_total_orders,
+            last_order_date=counters.last_order_date,
         )
 
+    def _requests_order_counters(self, fields: frozenset[str] | None) -> bool:
+        """
+        Whether order counters are serialized for the sparse fieldset.
+
+        :param fields: Sparse fieldset of company, all if None.
+        :return: True if counters are requested.
+        """
+        return fields is None or bool(fields & {"active_orders", "order_counters"})
+
+    def _get_order_counters(self, company: models.Company) -> models.CompanyOrderCounters | None:
+        """
+        Get order counters of `models.Company` instance, loaded with the company by repositories, so it's query free.
+
+        :param company: `models.Company` instance.
+        :return: `models.CompanyOrderCounters` instance, with zero counts if company has none yet.
+            None if counters weren't loaded with the company.
+        """
+        if not models.Company.order_counters.is_cached(company):
+            return None
+
+        try:
+            return company.order_counters
+        except models.CompanyOrderCounters.DoesNotExist:
+            return models.CompanyOrderCounters()
+
     def _serialize_iban(self, iban: models.Iban) -> types.Iban:
         """
         Serialize `models.Iban` instance.
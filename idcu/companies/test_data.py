@@ -0,0 +1,464 @@
+"""
+Synthetic test data generator.
+
+Generates production-like companies, IBANs, orders and order files and loads them with `COPY`,
+so millions of rows are written in minutes. Distributions follow the production shape:
+ - most companies are shippers, a third are carriers and a tenth are forwarders,
+ - a few forwarders, shippers and carriers own most orders (Zipf distribution),
+ - lanes connect Georgian hubs with neighbouring and European cities, popular lanes dominate,
+ - containers, loading types and cargo categories match the transport type,
+ - order volume grows month over month, old orders are finished.
+
+The same sizes and seed produce the same rows (ids aside, which are taken from sequences).
+Model signals aren't sent and `auto_now` fields are set explicitly, rows are written to the database as is.
+"""
+
+import csv
+import io
+import itertools
+import random
+from array import array
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from django.db import connection, transaction
+from django.utils import timezone
+from schwifty import IBAN
+
+from companies.lib.enum import CompanyParty
+from companies.models import Bank, Company, Iban
+from documents.lib.enum import (
+    Cargo,
+    CargoCategory,
+    FlatBedContainer,
+    OrderStatus,
+    ReeferContainer,
+    TentContainer,
+    TentLoadingType,
+    Transport,
+)
+from documents.models import Order, OrderFile
+from documents.partitions import create_order_partition, get_month_start, get_next_month, get_previous_month
+
+__all__ = [
+    "TestDataGenerator",
+]
+
+# Rows written by a single `COPY` statement.
+CHUNK_SIZE = 100_000
+
+# City and its weight, i.e. how busy it is.
+CITIES = {
+    "TBILISI": 30,
+    "POTI": 20,
+    "BATUMI": 15,
+    "KUTAISI": 8,
+    "RUSTAVI": 5,
+    "BAKU": 10,
+    "YEREVAN": 8,
+    "ISTANBUL": 12,
+    "TRABZON": 5,
+    "CONSTANTA": 4,
+    "VARNA": 3,
+    "ODESA": 3,
+    "WARSAW": 3,
+    "BERLIN": 3,
+    "HAMBURG": 3,
+    "ROTTERDAM": 2,
+    "MILAN": 2,
+    "ALMATY": 2,
+    "TASHKENT": 2,
+    "AKTAU": 2,
+}
+
+# Share of companies per party type.
+PARTY_TYPES = {
+    CompanyParty.SHIPPER: 60,
+    CompanyParty.CARRIER: 30,
+    CompanyParty.FORWARDER: 10,
+}
+
+TRANSPORTS = {
+    Transport.TENT: 60,
+    Transport.REEFER: 25,
+    Transport.FLAT_BED: 15,
+}
+
+CONTAINERS = {
+    Transport.TENT: list(TentContainer),
+    Transport.REEFER: list(ReeferContainer),
+    Transport.FLAT_BED: list(FlatBedContainer),
+}
+
+# Cargo category weights per transport type, dangerous goods are rare.
+CARGO_CATEGORIES = {
+    Transport.TENT: {
+        CargoCategory.STANDARD: 85,
+        CargoCategory.DANGEROUS_CATEGORY_ADR3: 5,
+        CargoCategory.DANGEROUS_CATEGORY_ADR8: 3,
+        CargoCategory.DANGEROUS_CATEGORY_ADR9: 3,
+        CargoCategory.DANGEROUS_CATEGORY_ADR2: 2,
+        CargoCategory.DANGEROUS_CATEGORY_ADR6: 2,
+    },
+    Transport.REEFER: {
+        CargoCategory.NEEDS_A_REFRIGERATED_CONTAINER: 90,
+        CargoCategory.STANDARD: 10,
+    },
+    Transport.FLAT_BED: {
+        CargoCategory.OVERSIZE: 45,
+        CargoCategory.SPECIAL_EQUIPMENT_AND_CONSTRUCTIONS: 35,
+        CargoCategory.STANDARD: 20,
+    },
+}
+
+# Max weight per transport type, in kilograms.
+MAX_WEIGHTS = {
+    Transport.TENT: 24_000,
+    Transport.REEFER: 22_000,
+    Transport.FLAT_BED: 40_000,
+}
+
+CURRENCIES = {"USD": 50, "EUR": 35, "GEL": 15}
+BANKS = {"BG": 55, "TB": 45}
+
+COMPANY_NAME_WORDS = ("Caucasus", "Silk Road", "Black Sea", "Kartli", "Colchis", "Iberia", "Trans", "Euro", "Asia")
+COMPANY_NAME_SUFFIXES = {
+    CompanyParty.SHIPPER: ("Trading", "Distribution", "Import", "Export", "Foods", "Industries"),
+    CompanyParty.CARRIER: ("Trucking", "Transport", "Freight", "Haulage"),
+    CompanyParty.FORWARDER: ("Logistics", "Forwarding", "Cargo", "Shipping"),
+}
+FIRST_NAMES = ("Giorgi", "Nino", "Davit", "Mariam", "Luka", "Ana", "Levan", "Tamar", "Irakli", "Eka")
+LAST_NAMES = ("Beridze", "Kapanadze", "Gelashvili", "Maisuradze", "Giorgadze", "Lomidze", "Tsiklauri", "Bolkvadze")
+
+
+def zipf_weights(count: int, exponent: float = 1.1) -> list[float]:
+    """
+    Get cumulative Zipf weights, a few first items get most of the weight.
+
+    :param count: Count of items.
+    :param exponent: Distribution exponent, the higher the more skewed.
+    :return: Cumulative weights for `random.choices`.
+    """
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def reserve_ids(table: str, count: int) -> range:
+    """
+    Reserve ids from the table sequence, so rows can be loaded with ids known upfront.
+
+    :param table: Table name.
+    :param count: Count of ids.
+    :return: Reserved ids.
+    """
+    if count == 0:
+        return range(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+            [table, table, count],
+        )
+        last_id = cursor.fetchone()[0]
+
+    return range(last_id - count + 1, last_id + 1)
+
+
+def copy_rows(table: str, columns: list[str], rows: Iterable[tuple]) -> int:
+    """
+    Load rows into the table with `COPY`, in chunks of `CHUNK_SIZE` rows.
+
+    :param table: Table name.
+    :param columns: Column names.
+    :param rows: Rows, None values are loaded as NULL.
+    :return: Count of loaded rows.
+    """
+    statement = f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+    rows = iter(rows)
+    total = 0
+    with connection.cursor() as cursor:
+        while chunk := list(itertools.islice(rows, CHUNK_SIZE)):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            total += len(chunk)
+
+    return total
+
+
+class TestDataGenerator:
+    """Generates synthetic companies, IBANs, orders and order files."""
+
+    def __init__(self, seed: int = 0, months: int = 12) -> None:
+        """
+        :param seed: Random seed.
+        :param months: Count of months, including the current one, orders are spread over.
+        """
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+
+        month = get_month_start(self.now)
+        self.months = [month]
+        for _ in range(months - 1):
+            month = get_previous_month(month)
+            self.months.insert(0, month)
+
+        self.company_ids: dict[CompanyParty, list[int]] = {party_type: [] for party_type in CompanyParty}
+
+    @transaction.atomic
+    def generate(self, companies: int, orders: int, files: int) -> dict[str, int]:
+        """
+        Generate and load test data.
+
+        :param companies: Count of companies.
+        :param orders: Count of orders.
+        :param files: Count of order files, spread over generated orders.
+        :return: Counts of loaded rows per table.
+        """
+        counts = {
+            Company._meta.db_table: self.generate_companies(companies),
+            Iban._meta.db_table: self.generate_ibans(),
+        }
+        counts[Order._meta.db_table], counts[OrderFile._meta.db_table] = self.generate_orders(orders, files)
+
+        with connection.cursor() as cursor:
+            for table in counts:
+                cursor.execute(f'ANALYZE "{table}"')
+
+        return counts
+
+    def generate_companies(self, count: int) -> int:
+        """
+        Generate companies, remembering their ids per party type.
+
+        :param count: Count of companies.
+        :return: Count of loaded rows.
+        """
+        ids = reserve_ids(Company._meta.db_table, count)
+        party_types = self.rng.choices(list(PARTY_TYPES), weights=list(PARTY_TYPES.values()), k=count)
+        cities = self.rng.choices(list(CITIES), weights=list(CITIES.values()), k=count)
+        for company_id, party_type in zip(ids, party_types):
+            self.company_ids[party_type].append(company_id)
+
+        def rows() -> Iterator[tuple]:
+            for company_id, party_type, city in zip(ids, party_types, cities):
+                created = self.random_datetime(self.rng.choice(self.months))
+                yield (
+                    company_id,
+                    (
+                        f"{self.rng.choice(COMPANY_NAME_WORDS)} {self.rng.choice(COMPANY_NAME_SUFFIXES[party_type])} "
+                        f"{company_id}"
+                    ),
+                    party_type.name,
+                    f"{city.title()}, {self.rng.randrange(1, 200)} {self.rng.choice(LAST_NAMES)} St.",
+                    f"{400_000_000 + company_id % 600_000_000}",
+                    f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                    f"+9955{self.rng.randrange(10 ** 8):08d}",
+                    f"contact-{company_id}@example.com",
+                    created,
+                    created,
+                )
+
+        return copy_rows(
+            Company._meta.db_table,
+            [
+                "id",
+                "name",
+                "party_type",
+                "address",
+                "vat_number",
+                "contact_name",
+                "contact_number",
+                "contact_email",
+                "date_created",
+                "date_updated",
+            ],
+            rows(),
+        )
+
+    def generate_ibans(self) -> int:
+        """
+        Generate IBANs of generated companies, forwarders and carriers have one to three, shippers up to one.
+
+        :return: Count of loaded rows.
+        """
+        bank_ids = dict(Bank.objects.filter(bank_code__in=BANKS).values_list("bank_code", "id"))
+        bank_codes = list(bank_ids)
+        bank_weights = [BANKS[bank_code] for bank_code in bank_codes]
+        if not bank_codes:
+            return 0
+
+        def rows() -> Iterator[tuple]:
+            for party_type, company_ids in self.company_ids.items():
+                min_count = 0 if party_type == CompanyParty.SHIPPER else 1
+                for company_id in company_ids:
+                    for i in range(self.rng.randint(min_count, min_count + 2)):
+                        bank_code = self.rng.choices(bank_codes, weights=bank_weights)[0]
+                        created = self.random_datetime(self.rng.choice(self.months))
+                        yield (
+                            bank_ids[bank_code],
+                            company_id,
+                            self.rng.choices(list(CURRENCIES), weights=list(CURRENCIES.values()))[0],
+                            IBAN.generate("GE", bank_code=bank_code, account_code=f"{company_id:014d}{i:02d}").compact,
+                            created,
+                            created,
+                        )
+
+        return copy_rows(
+            Iban._meta.db_table,
+            ["bank_id", "company_id", "currency", "account_number", "date_created", "date_updated"],
+            rows(),
+        )
+
+    def generate_orders(self, count: int, files: int) -> tuple[int, int]:
+        """
+        Generate orders and their files, creating monthly partitions for them.
+
+        :param count: Count of orders.
+        :param files: Count of order files, spread evenly over orders.
+        :return: Count of loaded order and order file rows.
+        """
+        if count == 0:
+            return 0, 0
+
+        forwarders = self.get_company_ids(CompanyParty.FORWARDER)
+        if not forwarders:
+            raise ValueError("Orders need forwarder companies, generate companies first.")
+
+        for month in self.months:
+            create_order_partition(month)
+
+        shippers = self.get_company_ids(CompanyParty.SHIPPER) or forwarders
+        carriers = self.get_company_ids(CompanyParty.CARRIER) or forwarders
+        lanes = [(start, end) for start, end in itertools.permutations(CITIES, 2)]
+        cargos = list(Cargo)
+        self.rng.shuffle(cargos)
+
+        # Order volume grows by 5% month over month.
+        months = self.rng.choices(
+            self.months, cum_weights=list(itertools.accumulate(1.05 ** i for i in range(len(self.months)))), k=count
+        )
+        months.sort()
+        order_ids = reserve_ids(Order._meta.db_table, count)
+        # Creation timestamps of orders, given to their files.
+        order_dates = array("d")
+
+        choose = self.rng.choices
+        forwarder_weights = zipf_weights(len(forwarders))
+        shipper_weights = zipf_weights(len(shippers))
+        carrier_weights = zipf_weights(len(carriers))
+        lane_weights = list(itertools.accumulate(CITIES[start] * CITIES[end] for start, end in lanes))
+        cargo_weights = zipf_weights(len(cargos), exponent=0.8)
+        transports = list(TRANSPORTS)
+        transport_weights = list(TRANSPORTS.values())
+        currencies = list(CURRENCIES)
+        currency_weights = list(CURRENCIES.values())
+        current_month = self.months[-1]
+
+        def order_rows() -> Iterator[tuple]:
+            for order_id, month in zip(order_ids, months):
+                transport = choose(transports, weights=transport_weights)[0]
+                cargo_categories = CARGO_CATEGORIES[transport]
+                cargo_category = choose(list(cargo_categories), weights=list(cargo_categories.values()))[0]
+                cargo = choose(cargos, cum_weights=cargo_weights)[0]
+                start, end = choose(lanes, cum_weights=lane_weights)[0]
+                weight = round(Decimal(self.rng.triangular(500, MAX_WEIGHTS[transport], MAX_WEIGHTS[transport] * 0.7)))
+                created = self.random_datetime(month)
+                order_dates.append(created.timestamp())
+                finished = month < current_month and self.rng.random() < 0.95
+                yield (
+                    order_id,
+                    choose(forwarders, cum_weights=forwarder_weights)[0],
+                    choose(shippers, cum_weights=shipper_weights)[0],
+                    choose(carriers, cum_weights=carrier_weights)[0] if finished or self.rng.random() < 0.8 else None,
+                    start,
+                    end,
+                    transport.name,
+                    self.rng.choice(CONTAINERS[transport]).name,
+                    self.rng.choice(list(TentLoadingType)).name if transport == Transport.TENT else None,
+                    cargo.name,
+                    cargo_category.name,
+                    cargo.value.capitalize()[:55],
+                    weight,
+                    round(weight * Decimal(self.rng.uniform(0.08, 0.25)) + 300, 2),
+                    choose(currencies, weights=currency_weights)[0],
+                    (
+                        f"{self.rng.randint(300, 1600)}, {self.rng.randint(200, 400)}, {self.rng.randint(200, 450)}"
+                        if cargo_category == CargoCategory.OVERSIZE
+                        else None
+                    ),
+                    self.rng.random() < 0.3,
+                    "Loading from the warehouse gate" if self.rng.random() < 0.1 else None,
+                    (OrderStatus.FINISHED if finished else OrderStatus.IN_PROGRESS).name,
+                    created,
+                    created + timedelta(hours=self.rng.randint(0, 240)) if finished else created,
+                )
+
+        orders_count = copy_rows(
+            Order._meta.db_table,
+            [
+                "id",
+                "forwarder_id",
+                "shipper_id",
+                "carrier_id",
+                "start_location",
+                "end_location",
+                "transportation_type",
+                "container_type",
+                "loading_type",
+                "cargo_type",
+                "cargo_category",
+                "cargo_name",
+                "weight",
+                "price",
+                "currency",
+                "dimension",
+                "insurance",
+                "comments",
+                "status",
+                "date_created",
+                "date_updated",
+            ],
+            order_rows(),
+        )
+
+        def file_rows() -> Iterator[tuple]:
+            remaining = files
+            for i, (order_id, timestamp) in enumerate(zip(order_ids, order_dates)):
+                # Spread remaining files over remaining orders, so exactly `files` rows are generated.
+                rate = remaining / (count - i)
+                order_files = int(rate) + (self.rng.random() < rate - int(rate))
+                remaining -= order_files
+                created = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+                for j in range(order_files):
+                    yield f"order_files/test-data-{order_id}-{j}.pdf", order_id, created, created
+
+        files_count = copy_rows(
+            OrderFile._meta.db_table, ["file", "order_id", "date_created", "date_updated"], file_rows()
+        )
+
+        return orders_count, files_count
+
+    def get_company_ids(self, party_type: CompanyParty) -> list[int]:
+        """
+        Get ids of generated companies of the party type, or of existing ones if no companies were generated.
+
+        :param party_type: Company party type.
+        :return: Company ids.
+        """
+        if any(self.company_ids.values()):
+            return self.company_ids[party_type]
+
+        return list(Company.objects.filter(party_type=party_type.name).values_list("id", flat=True))
+
+    def random_datetime(self, month: date) -> datetime:
+        """
+        Get random datetime within the month, not later than now.
+
+        :param month: First day of the month.
+        :return: Datetime.
+        """
+        start = datetime(month.year, month.month, month.day, tzinfo=dt_timezone.utc)
+        end = min(datetime.combine(get_next_month(month), datetime.min.time(), tzinfo=dt_timezone.utc), self.now)
+        return start + timedelta(seconds=self.rng.uniform(0, (end - start).total_seconds()))
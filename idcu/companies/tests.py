@@ -0,0 +1,57 @@
+"""Query count tests of `companies` endpoints."""
+
+from pathlib import Path
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from base_idcu.base_authentication import token_cache
+from base_idcu.base_testing import QueryCountSnapshotMixin
+from companies.lib.enum import CompanyParty, Currency
+from companies.models import Bank, Company, Iban
+from users.models import AuthToken, TRSUser
+
+
+class CompanyEndpointsTest(QueryCountSnapshotMixin, TestCase):
+    """Query counts of company endpoints, with cold caches."""
+
+    query_snapshot_path = Path(__file__).with_name("query_counts.json")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        bank = Bank.objects.create(bank_name="BOG", bank_code="BG")
+        forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        for company_number in range(3):
+            carrier = Company.objects.create(
+                name=f"CA{company_number}", party_type=CompanyParty.CARRIER.name, vat_number=f"33{company_number}"
+            )
+            Iban.objects.create(
+                bank=bank,
+                company=carrier,
+                currency=Currency.GEL.name,
+                account_number=f"GE29BG000000010101010{company_number}",
+            )
+
+        user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=forwarder)
+        cls.auth_headers = {"Authorization": f"Token {AuthToken.objects.create(user=user).key}"}
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+
+    def test_get_user_company(self):
+        with self.assertQueryCountSnapshot("get-user-company"):
+            response = self.client.get("/companies/get-user-company", headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_companies(self):
+        with self.assertQueryCountSnapshot("get-companies"):
+            response = self.client.get(
+                "/companies/get-companies",
+                {"search_keyword": "CA", "company_type": CompanyParty.CARRIER.name},
+                headers=self.auth_headers,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 3)
@@ -1,10 +1,12 @@
 """Base views for `company` view."""
 
 from rest_framework.views import APIView
+
+from base_idcu.lib.container import RequestScoped
 from companies.services import CompanyServices
 
 
 class BaseCompanyView(APIView):
     """Base company view."""
 
-    service_class = CompanyServices()
+    service_class = RequestScoped(CompanyServices)
@@ -2,91 +2,109 @@
 
 from typing import Any
 
+from base_idcu.base_authentication import AUTHENTICATION_CLASSES, READ_AUTHENTICATION_CLASSES
+from base_idcu.lib.queries import query_budget
 from base_idcu.views.base import IDCUView
 from companies.views.base import BaseCompanyView
 from companies.serializers.output import CompanyResponse
 from companies.serializers.input import CompanyToCreateRequest, CompanyToUpdateRequest, CompanyToFetchRequest
 
 from rest_framework.decorators import authentication_classes, permission_classes
-from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(5)
 class ForwarderCompanyView(BaseCompanyView, IDCUView):
     """Handles request to the `company/<str:get-user-company>/` endpoint."""
 
     http_method_names = ['get']
+    read_only = True
+    sparse_fields = True
+    out_serializer_cls = CompanyResponse
 
-    def process_request(self, request_params: Any) -> CompanyResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `company/get-company/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
-        response_data = self.service_class.fetch_forwarder_company_for_user(user=self.request.user)
-        return CompanyResponse(response_data).data
+        response_data = self.service_class.fetch_forwarder_company_for_user(
+            user=self.request.user,
+            fields=self.requested_fields,
+        )
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(6)
 class CompaniesFilterView(BaseCompanyView, IDCUView):
     """Handles request to the `company/<str:get-companies>/` endpoint."""
 
     http_method_names = ['get']
+    read_only = True
+    sparse_fields = True
     in_serializer_cls = CompanyToFetchRequest
+    out_serializer_cls = CompanyResponse
+    out_serializer_kwargs = {"many": True}
 
-    def process_request(self, request_params: Any) -> CompanyResponse:
+    async def process_request(self, request_params: Any) -> list[dict]:
         """
         Process request for `company/get-companies/` endpoint.
 
         Filters companies for requested params.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
-        response_data = self.service_class.fetch_company_by_keyword(**request_params)
-        return CompanyResponse(response_data, many=True).data
+        response_data = await self.service_class.afetch_company_by_keyword(
+            **request_params,
+            fields=self.requested_fields,
+        )
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
 class CompanyCreateView(BaseCompanyView, IDCUView):
     """Handles request to the `company/<str:create-company>/` endpoint."""
 
     http_method_names = ['post']
     in_serializer_cls = CompanyToCreateRequest
+    out_serializer_cls = CompanyResponse
 
-    def process_request(self, request_params: Any) -> CompanyResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `company/create-company/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
         user = self.request.user
         response_data = self.service_class.create_company(**request_params, user=user)
 
-        return CompanyResponse(response_data).data
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
 class CompanyUpdateView(BaseCompanyView, IDCUView):
     """Handles request to the `company/<str:update-company>/` endpoint."""
 
     http_method_names = ['post']
     in_serializer_cls = CompanyToUpdateRequest
+    out_serializer_cls = CompanyResponse
 
-    def process_request(self, request_params: Any) -> CompanyResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `company/update-company/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
         response_data = self.service_class.update_company(**request_params)
 
-        return CompanyResponse(response_data).data
+        return response_data
@@ -13,6 +13,7 @@ __all__ = [
     "CargoCategory",
     "TentLoadingType",
     "OrderStatus",
+    "OrderEvent",
 ]
 
 
@@ -227,3 +228,10 @@ class OrderStatus(ModelChoice):
 
     IN_PROGRESS = "IN PROGRESS"
     FINISHED = "FINISHED"
+
+
+class OrderEvent(ModelChoice):
+    """Order events pushed to subscribers."""
+
+    ORDER_CREATED = "order_created"
+    ORDER_STATUS_CHANGED = "order_status_changed"
@@ -0,0 +1,68 @@
+"""Command to maintain monthly partitions of `Order` table."""
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from documents.partitions import (
+    archive_order_partition,
+    create_order_partition,
+    get_default_partition_months,
+    get_month_start,
+    get_next_month,
+    get_order_partitions,
+    get_partition_month,
+    get_previous_month,
+)
+
+
+class Command(BaseCommand):
+    """
+    Creates upcoming `Order` partitions and archives old ones.
+
+    Meant to be run periodically (e.g. daily), it's idempotent.
+    """
+
+    help = "Create upcoming monthly `Order` partitions and archive partitions older than retention period."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--months-ahead", type=int, default=3, help="Count of upcoming months to create partitions for.")
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=0,
+            help="Archive partitions older than this count of months, 0 disables archiving.",
+        )
+
+    def handle(self, *args, **options):
+        """Create and archive partitions."""
+        months = get_default_partition_months()
+        month = get_month_start(timezone.now())
+        for _ in range(options["months_ahead"] + 1):
+            months.append(month)
+            month = get_next_month(month)
+
+        for month in months:
+            if create_order_partition(month):
+                self.stdout.write(f"Partition created for {month:%Y-%m}.")
+
+        if options["retain_months"] > 0:
+            self.archive_partitions(retain_months=options["retain_months"])
+
+    def archive_partitions(self, retain_months: int) -> None:
+        """
+        Archive partitions older than retention period.
+
+        :param retain_months: Count of months to keep attached, including the current one.
+        """
+        oldest_month = get_month_start(timezone.now())
+        for _ in range(retain_months - 1):
+            oldest_month = get_previous_month(oldest_month)
+
+        for partition_name in get_order_partitions():
+            month = get_partition_month(partition_name)
+            if month is None or month >= oldest_month:
+                continue
+
+            archive = archive_order_partition(partition_name)
+            self.stdout.write(f"Partition {partition_name} archived to {archive.file.name} ({archive.rows_count} orders).")
@@ -0,0 +1,122 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:54
+
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+ORDER_TABLE = "documents_order"
+LEGACY_TABLE = "documents_order_legacy"
+PARTITIONS_AHEAD = 3
+
+
+def get_next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_order_table(apps, schema_editor):
+    """
+    Convert `documents_order` to a table range partitioned by `date_created`.
+
+    Creates monthly partitions for existing rows and a few upcoming months, plus a default partition.
+    Primary key becomes (`id`, `date_created`), `id` keeps being generated from a sequence.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname != %s",
+            [ORDER_TABLE, f"{ORDER_TABLE}_pkey"],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [ORDER_TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT coalesce(max(id), 0), min(date_created) FROM {ORDER_TABLE}")
+        max_id, min_date_created = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {ORDER_TABLE} RENAME TO {LEGACY_TABLE}")
+        cursor.execute(f"ALTER INDEX {ORDER_TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey")
+        for index_name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy")
+        for constraint_name, _ in foreign_keys:
+            cursor.execute(f"ALTER TABLE {LEGACY_TABLE} DROP CONSTRAINT {constraint_name}")
+        cursor.execute(f"ALTER TABLE {LEGACY_TABLE} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"ALTER TABLE {LEGACY_TABLE} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"DROP SEQUENCE IF EXISTS {ORDER_TABLE}_id_seq")
+
+        cursor.execute(
+            f"CREATE TABLE {ORDER_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (date_created)"
+        )
+        cursor.execute(f"CREATE SEQUENCE {ORDER_TABLE}_id_seq START WITH {max_id + 1} OWNED BY {ORDER_TABLE}.id")
+        cursor.execute(f"ALTER TABLE {ORDER_TABLE} ALTER COLUMN id SET DEFAULT nextval('{ORDER_TABLE}_id_seq')")
+        cursor.execute(f"ALTER TABLE {ORDER_TABLE} ADD CONSTRAINT {ORDER_TABLE}_pkey PRIMARY KEY (id, date_created)")
+        for _, index_definition in indexes:
+            cursor.execute(index_definition)
+        for constraint_name, constraint_definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {ORDER_TABLE} ADD CONSTRAINT {constraint_name} {constraint_definition}")
+
+        current_month = timezone.now().date().replace(day=1)
+        month = min_date_created.date().replace(day=1) if min_date_created else current_month
+        last_month = current_month
+        for _ in range(PARTITIONS_AHEAD):
+            last_month = get_next_month(last_month)
+
+        while month <= last_month:
+            cursor.execute(
+                f"CREATE TABLE {ORDER_TABLE}_p{month:%Y_%m} PARTITION OF {ORDER_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{get_next_month(month).isoformat()} 00:00:00+00')"
+            )
+            month = get_next_month(month)
+        cursor.execute(f"CREATE TABLE {ORDER_TABLE}_default PARTITION OF {ORDER_TABLE} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {ORDER_TABLE} SELECT * FROM {LEGACY_TABLE}")
+        # Run deferred foreign key checks now, pending trigger events block later schema changes.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(f"DROP TABLE {LEGACY_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+        ('documents', '0002_alter_order_dimension'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderPartitionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated', models.DateTimeField(auto_now=True, db_index=True)),
+                ('partition_name', models.CharField(max_length=63, unique=True)),
+                ('range_start', models.DateField()),
+                ('range_end', models.DateField()),
+                ('min_order_id', models.BigIntegerField(null=True)),
+                ('max_order_id', models.BigIntegerField(null=True)),
+                ('rows_count', models.IntegerField(default=0)),
+                ('file', models.FileField(upload_to='order_archives/')),
+                ('date_restored', models.DateTimeField(default=None, help_text='Set when attached back to `Order` table.', null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='orderfile',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, help_text='Not a database constraint, as orders are partitioned and can be archived.', on_delete=django.db.models.deletion.CASCADE, to='documents.order'),
+        ),
+        migrations.RunPython(partition_order_table),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['forwarder', '-date_created'], name='documents_o_forward_881494_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderpartitionarchive',
+            index=models.Index(fields=['min_order_id', 'max_order_id'], name='documents_o_min_ord_a429a4_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.4 on 2026-10-19 16:22
+
+import csv
+import gzip
+import io
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def backfill_forwarder_ids(apps, schema_editor):
+    """Read forwarders of not restored archives from their files, restored ones are in `Order` table again."""
+    OrderPartitionArchive = apps.get_model("documents", "OrderPartitionArchive")
+
+    for archive in OrderPartitionArchive.objects.filter(date_restored__isnull=True).iterator():
+        with archive.file.open("rb") as archive_file, gzip.GzipFile(fileobj=archive_file, mode="rb") as gzip_file:
+            rows = csv.DictReader(io.TextIOWrapper(gzip_file, encoding="utf-8"))
+            archive.forwarder_ids = sorted({int(row["forwarder_id"]) for row in rows if row["forwarder_id"]})
+        archive.save(update_fields=["forwarder_ids"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_partition_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderpartitionarchive',
+            name='forwarder_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, help_text='Forwarder companies of archived orders, only their users restore the partition.', size=None),
+        ),
+        migrations.RunPython(backfill_forwarder_ids, migrations.RunPython.noop),
+    ]
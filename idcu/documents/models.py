@@ -1,6 +1,7 @@
 """Models for `documents` package."""
 from functools import cached_property
 
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.db.models import QuerySet
 
@@ -15,6 +16,8 @@ from documents.lib.enum import (
 from companies.lib.enum import Currency
 from companies.models import Company
 
+# `Order` fields counted by `CompanyOrderCounters` (see `documents.signals`).
+COUNTED_FIELDS = ("forwarder_id", "shipper_id", "carrier_id", "status")
 
 
 class TimestampMixin(models.Model):
@@ -68,6 +71,24 @@ class Order(TimestampMixin):
     comments = models.CharField(max_length=255, null=True)
     status = models.CharField(max_length=25, choices=OrderStatus.choices())
 
+    class Meta:
+        # The table is range partitioned by `date_created` (see `documents.partitions`),
+        # so primary key in database is (`id`, `date_created`).
+        indexes = [
+            models.Index(fields=["forwarder", "-date_created"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded status and companies, so their changes can be detected on save."""
+        instance = super().from_db(db, field_names, values)
+        if "status" in field_names:
+            instance._loaded_status = values[field_names.index("status")]
+        if set(COUNTED_FIELDS) <= set(field_names):
+            instance._counted_values = tuple(values[field_names.index(name)] for name in COUNTED_FIELDS)
+
+        return instance
+
     @cached_property
     def files(self) -> QuerySet:
         return self.orderfile_set.all()
@@ -79,7 +100,38 @@ class Order(TimestampMixin):
 class OrderFile(TimestampMixin):
     """Order files."""
     file = models.FileField(upload_to="order_files/")
-    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        help_text="Not a database constraint, as orders are partitioned and can be archived.",
+    )
 
     def __repr__(self):
         return f"{self.file.name} | {self.order}"
+
+
+class OrderPartitionArchive(TimestampMixin):
+    """Monthly partition of `Order` table, detached and exported to compressed file."""
+
+    partition_name = models.CharField(max_length=63, unique=True)
+    range_start = models.DateField()
+    range_end = models.DateField()
+    min_order_id = models.BigIntegerField(null=True)
+    max_order_id = models.BigIntegerField(null=True)
+    rows_count = models.IntegerField(default=0)
+    forwarder_ids = ArrayField(
+        models.BigIntegerField(),
+        default=list,
+        help_text="Forwarder companies of archived orders, only their users restore the partition.",
+    )
+    file = models.FileField(upload_to="order_archives/")
+    date_restored = models.DateTimeField(null=True, default=None, help_text="Set when attached back to `Order` table.")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["min_order_id", "max_order_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.partition_name} | {self.range_start} - {self.range_end}"
@@ -0,0 +1,233 @@
+"""
+Monthly range partitioning of `Order` table by `date_created`.
+
+`documents_order` is a partitioned table with one partition per month (`documents_order_pYYYY_MM`)
+and a default partition catching rows, which fall outside created partitions.
+Old partitions are detached, exported to gzip compressed CSV files (`OrderPartitionArchive`) and dropped,
+archived partitions can be restored (attached back) on demand.
+"""
+
+import gzip
+import re
+import tempfile
+from datetime import date, datetime
+
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+
+from documents.models import Order, OrderPartitionArchive
+
+ORDER_TABLE = Order._meta.db_table
+DEFAULT_PARTITION = f"{ORDER_TABLE}_default"
+PARTITION_NAME_RE = re.compile(rf"^{ORDER_TABLE}_p(?P<year>\d{{4}})_(?P<month>\d{{2}})$")
+
+
+def get_month_start(value: date | datetime) -> date:
+    """
+    Get first day of the month for given date.
+
+    :param value: Date or datetime.
+    :return: First day of the month.
+    """
+    return date(value.year, value.month, 1)
+
+
+def get_next_month(month: date) -> date:
+    """
+    Get first day of the next month.
+
+    :param month: First day of the month.
+    :return: First day of the next month.
+    """
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def get_previous_month(month: date) -> date:
+    """
+    Get first day of the previous month.
+
+    :param month: First day of the month.
+    :return: First day of the previous month.
+    """
+    return date(month.year - (month.month == 1), (month.month - 2) % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    """
+    Get partition table name for the month.
+
+    :param month: First day of the month.
+    :return: Partition table name.
+    """
+    return f"{ORDER_TABLE}_p{month:%Y_%m}"
+
+
+def get_partition_month(partition_name: str) -> date | None:
+    """
+    Get the month stored in the partition.
+
+    :param partition_name: Partition table name.
+    :return: First day of the month, None for not monthly partitions.
+    """
+    match = PARTITION_NAME_RE.match(partition_name)
+    if match is None:
+        return None
+
+    return date(int(match["year"]), int(match["month"]), 1)
+
+
+def get_order_partitions() -> list[str]:
+    """
+    Get names of partitions attached to `Order` table.
+
+    :return: Partition table names.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+            """,
+            [ORDER_TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def get_default_partition_months() -> list[date]:
+    """
+    Get months of rows stored in the default partition.
+
+    :return: First days of the months.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT DISTINCT date_trunc('month', date_created AT TIME ZONE 'UTC')::date
+            FROM "{DEFAULT_PARTITION}"
+            ORDER BY 1
+            """
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _get_bounds(month: date) -> tuple[str, str]:
+    """Get partition bounds for the month, as UTC timestamps."""
+    return f"{month.isoformat()} 00:00:00+00", f"{get_next_month(month).isoformat()} 00:00:00+00"
+
+
+@transaction.atomic
+def create_order_partition(month: date) -> bool:
+    """
+    Create partition for the month, moving its rows out of the default partition.
+
+    :param month: First day of the month.
+    :return: True if partition was created, False if it already exists.
+    """
+    partition_name = get_partition_name(month)
+    if partition_name in get_order_partitions():
+        return False
+
+    range_start, range_end = _get_bounds(month)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{partition_name}" (LIKE "{ORDER_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM "{DEFAULT_PARTITION}" WHERE date_created >= %s AND date_created < %s RETURNING *
+            )
+            INSERT INTO "{partition_name}" SELECT * FROM moved
+            """,
+            [range_start, range_end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{ORDER_TABLE}" ATTACH PARTITION "{partition_name}" FOR VALUES FROM (%s) TO (%s)',
+            [range_start, range_end],
+        )
+
+    return True
+
+
+@transaction.atomic
+def archive_order_partition(partition_name: str) -> OrderPartitionArchive:
+    """
+    Detach the partition, export it to compressed file and drop it.
+
+    :param partition_name: Monthly partition table name.
+    :return: Created or updated `OrderPartitionArchive` instance.
+    """
+    month = get_partition_month(partition_name)
+    if month is None:
+        raise ValueError(f"`{partition_name}` is not a monthly partition of `{ORDER_TABLE}`.")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{ORDER_TABLE}" DETACH PARTITION "{partition_name}"')
+        cursor.execute(
+            f"""
+            SELECT min(id), max(id), count(*), array_agg(DISTINCT forwarder_id) FILTER (WHERE forwarder_id IS NOT NULL)
+            FROM "{partition_name}"
+            """
+        )
+        min_order_id, max_order_id, rows_count, forwarder_ids = cursor.fetchone()
+
+        with tempfile.TemporaryFile() as archive_file:
+            with gzip.GzipFile(fileobj=archive_file, mode="wb") as gzip_file:
+                cursor.copy_expert(f'COPY "{partition_name}" TO STDOUT WITH (FORMAT csv, HEADER)', gzip_file)
+
+            archive, _ = OrderPartitionArchive.objects.update_or_create(
+                partition_name=partition_name,
+                defaults={
+                    "range_start": month,
+                    "range_end": get_next_month(month),
+                    "min_order_id": min_order_id,
+                    "max_order_id": max_order_id,
+                    "rows_count": rows_count,
+                    "forwarder_ids": forwarder_ids or [],
+                    "date_restored": None,
+                },
+            )
+            if archive.file:
+                archive.file.delete(save=False)
+            archive_file.seek(0)
+            archive.file.save(f"{partition_name}.csv.gz", File(archive_file), save=True)
+
+        cursor.execute(f'DROP TABLE "{partition_name}"')
+
+    return archive
+
+
+@transaction.atomic
+def restore_order_partition(archive: OrderPartitionArchive) -> None:
+    """
+    Load archived partition back and attach it to `Order` table.
+
+    Concurrent restores of the same archive are serialized, only the first one loads the data.
+
+    :param archive: `OrderPartitionArchive` instance to restore.
+    """
+    archive = OrderPartitionArchive.objects.select_for_update().get(id=archive.id)
+    if archive.date_restored is not None:
+        return
+
+    partition_name = archive.partition_name
+    range_start, range_end = _get_bounds(archive.range_start)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{partition_name}" (LIKE "{ORDER_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        with archive.file.open("rb") as archive_file, gzip.GzipFile(fileobj=archive_file, mode="rb") as gzip_file:
+            cursor.copy_expert(f'COPY "{partition_name}" FROM STDIN WITH (FORMAT csv, HEADER)', gzip_file)
+
+        cursor.execute(
+            f'ALTER TABLE "{ORDER_TABLE}" ATTACH PARTITION "{partition_name}" FOR VALUES FROM (%s) TO (%s)',
+            [range_start, range_end],
+        )
+
+    archive.date_restored = timezone.now()
+    archive.save(update_fields=["date_restored", "date_updated"])
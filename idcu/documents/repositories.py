@@ -5,20 +5,45 @@ from decimal import Decimal
 from django.db.models import QuerySet
 
 from companies.models import Company
-from documents.models import Order, OrderFile
+from documents.models import Order, OrderFile, OrderPartitionArchive
+
+# Columns of `OrderResponse` fields, so sparse fieldsets load only the columns and relations they need.
+ORDER_FIELD_COLUMNS: dict[str, tuple[str, ...]] = {
+    "order_id": ("id",),
+    "start_location": ("start_location",),
+    "end_location": ("end_location",),
+    "transportation_type": ("transportation_type",),
+    "container_type": ("container_type",),
+    "loading_type": ("loading_type",),
+    "cargo_type": ("cargo_type",),
+    "cargo_category": ("cargo_category",),
+    "cargo_name": ("cargo_name",),
+    "weight": ("weight",),
+    "price": ("price",),
+    "currency": ("currency",),
+    "dimension": ("dimension",),
+    "insurance": ("insurance",),
+    "comments": ("comments",),
+    "created_datetime": ("date_created",),
+    "shipper_company_name": ("shipper", "shipper__name"),
+    "shipper_company_vat": ("shipper", "shipper__vat_number"),
+    "carrier_company_name": ("carrier", "carrier__name"),
+    "carrier_company_vat": ("carrier", "carrier__vat_number"),
+    "files": (),
+}
 
 
 class DocumentRepository:
     """Repository class for `documents` related models."""
 
-    def create_order_file(self, file, order: Order) -> OrderFile:
+    def create_order_file(self, file, order_id: int) -> OrderFile:
         """
         Create a file attached to order.
 
         :param file: File to create.
-        :param order: The order file to be attached.
+        :param order_id: Identifier of the order file to be attached.
         """
-        return OrderFile.objects.create(file=file, order=order)
+        return OrderFile.objects.create(file=file, order_id=order_id)
 
 
     def create_order(
@@ -85,23 +110,81 @@ class DocumentRepository:
             comments=comments,
         )
 
-    def get_order_by_id(self, order_id: int):
+    async def aget_order_by_id(self, order_id: int, fields: frozenset[str] | None = None) -> Order | None:
         """
-        Get order for requested order_id:
+        Get order for requested order_id, with companies and files loaded.
 
         :param order_id: Unique order identifier.
-        :return: `models.Order` instance.
+        :param fields: `OrderResponse` fields to load, with companies and files only if requested. All if None.
+        :return: `models.Order` instance if exists, else None.
         """
         try:
-            return Order.objects.get(id=order_id)
+            return await self._get_order_details_queryset(fields=fields).aget(id=order_id)
         except Order.DoesNotExist:
             return None
 
-    def get_orders_for_company(self, company: Company) -> QuerySet:
+    def get_archive_for_order(self, order_id: int, forwarder_id: int) -> OrderPartitionArchive | None:
+        """
+        Get not restored archive, which may contain requested order of the forwarder company.
+
+        :param order_id: Unique order identifier.
+        :param forwarder_id: `models.Company` identifier, archive must contain orders of this forwarder.
+        :return: `models.OrderPartitionArchive` instance if exists, else None.
+        """
+        return OrderPartitionArchive.objects.filter(
+            min_order_id__lte=order_id,
+            max_order_id__gte=order_id,
+            forwarder_ids__contains=[forwarder_id],
+            date_restored__isnull=True,
+        ).first()
+
+    async def aget_orders_for_company(self, company_id: int | None, fields: frozenset[str] | None = None) -> list[Order]:
         """
         Get orders for company.
 
-        :param company: `models.Company` instance to fetch orders.
+        :param company_id: `models.Company` identifier to fetch orders.
+        :param fields: `OrderResponse` fields to load, all if None.
         :return: `models.Order` instances.
         """
-        return Order.objects.filter(forwarder=company).order_by("-date_created")
+        orders = Order.objects.filter(forwarder_id=company_id).order_by("-date_created")
+        return [order async for order in self._only_fields(orders, fields=fields)]
+
+    def _get_order_details_queryset(self, fields: frozenset[str] | None) -> QuerySet:
+        """
+        Get queryset of orders with full details, loading companies and files only if requested.
+
+        :param fields: `OrderResponse` fields to load, all if None.
+        :return: Queryset of `models.Order` instances.
+        """
+        orders = self._only_fields(Order.objects.all(), fields=fields, with_relations=True)
+        if fields is None:
+            return orders.select_related("shipper", "carrier").prefetch_related("orderfile_set")
+
+        relations = {column.split("__")[0] for field in fields for column in ORDER_FIELD_COLUMNS[field] if "__" in column}
+        if relations:
+            orders = orders.select_related(*sorted(relations))
+        if "files" in fields:
+            orders = orders.prefetch_related("orderfile_set")
+
+        return orders
+
+    def _only_fields(self, orders: QuerySet, fields: frozenset[str] | None, with_relations: bool = False) -> QuerySet:
+        """
+        Load only columns of requested fields.
+
+        :param orders: Queryset of `models.Order` instances.
+        :param fields: `OrderResponse` fields, all columns are loaded if None.
+        :param with_relations: Whether columns of related companies are loaded too (with `select_related`).
+        :return: Projected queryset.
+        """
+        if fields is None:
+            return orders
+
+        columns = {
+            column
+            for field in fields
+            for column in ORDER_FIELD_COLUMNS[field]
+            if with_relations or "__" not in column
+        }
+        # Primary key is always loaded.
+        return orders.only(*columns or {"id"})
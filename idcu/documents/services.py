@@ -1,18 +1,39 @@
 """Services module for `documents` package."""
 
 from decimal import Decimal
-from django.db import transaction
+from operator import attrgetter
+from typing import Any, Callable, cast
+
+from asgiref.sync import sync_to_async
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
 from documents.lib import types
 from documents.lib.utils import get_full_url_for_media_files
 from documents.models import Order
+from documents.partitions import restore_order_partition
 from documents.repositories import DocumentRepository
+from documents.tasks import store_order_file
 from documents import exceptions
 
 from companies.repositories import CompanyRepository
 from companies import exceptions as company_exceptions
 from companies.models import Company
+from base_idcu.lib.transactions import read_only, read_write
+
+ORDER_FIELDS = tuple(types.Order.__annotations__)
+FULL_ORDER_FIELDS = tuple(types.FullOrderDetails.__annotations__)
+
+# Values of serialized order fields, only values of requested fields are read, so deferred columns aren't loaded.
+ORDER_FIELD_VALUES: dict[str, Callable[[Order], Any]] = {
+    **{name: attrgetter(name) for name in FULL_ORDER_FIELDS},
+    "order_id": attrgetter("id"),
+    "created_datetime": attrgetter("date_created"),
+    "shipper_company_name": attrgetter("shipper.name"),
+    "shipper_company_vat": attrgetter("shipper.vat_number"),
+    "carrier_company_name": attrgetter("carrier.name"),
+    "carrier_company_vat": attrgetter("carrier.vat_number"),
+    "files": lambda order: [get_full_url_for_media_files(file) for file in order.files],
+}
 
 
 class DocumentsService:
@@ -22,7 +43,7 @@ class DocumentsService:
         self.company_repository = CompanyRepository()
         self.document_repository = DocumentRepository()
 
-    @transaction.atomic
+    @read_write
     def create_order(
         self,
         forwarder_company: Company,
@@ -63,7 +84,7 @@ class DocumentsService:
         :param currency: The currency.
         :param dimension: Order dimensions (X, Y, Z).
         :param insurance: If order is insured or not.
-        :param files: Files to attach to the order.
+        :param files: Files to attach to the order, stored in the background once the order is committed.
         :param comments: Additional comments for the order.
 
         :raises CompanyNotFoundError: If company not found for requested shipper and carrier VAT codes.
@@ -97,79 +118,95 @@ class DocumentsService:
         )
 
         for file in files:
-            self.document_repository.create_order_file(file=file, order=order)
+            store_order_file.enqueue(order_id=order.id, file_name=file.name, data=file.read())
 
         return self._serialize_order(order=order, fetch_full_details=True)
 
-    def fetch_order_by_id(self, order_id: int):
+    async def afetch_order_by_id(
+        self,
+        order_id: int,
+        company_id: int | None,
+        fields: frozenset[str] | None = None,
+    ) -> types.FullOrderDetails:
         """
         Fetch specific order details by order id.
 
+        Not `read_only`, as an archived partition holding the order is restored,
+        if it holds orders of the requesting company.
+
         :param order_id: Unique order identifier ID.
+        :param company_id: `models.Company` identifier of the request user.
+        :param fields: Sparse fieldset of order details, all if None.
         :return: Full order details for requested ID.
 
         :raises OrderNotFound: if no order found by requested code.
         """
-        order = self.document_repository.get_order_by_id(order_id=order_id)
+        order = await self.document_repository.aget_order_by_id(order_id=order_id, fields=fields)
+        restored = order is None and await sync_to_async(self._restore_archived_order)(
+            order_id=order_id, company_id=company_id
+        )
+        if restored:
+            order = await self.document_repository.aget_order_by_id(order_id=order_id, fields=fields)
+
         if order is None:
             raise exceptions.OrderNotFound(f"Order not found by requested id '{order_id}'")
 
-        return self._serialize_order(order=order, fetch_full_details=True)
+        return self._serialize_order(order=order, fetch_full_details=True, fields=fields)
 
-    def fetch_orders_for_company(self, company: Company) -> list[types.Order]:
+    @read_only
+    async def afetch_orders_for_company(
+        self,
+        company_id: int | None,
+        fields: frozenset[str] | None = None,
+    ) -> list[types.Order]:
         """
         Fetch orders for company.
 
-        :param company: `models.Company` instance to fetch orders.
+        :param company_id: `models.Company` identifier to fetch orders.
+        :param fields: Sparse fieldset of orders, all if None.
         :return: Serialized `models.Order` instances.
         """
-        orders = self.document_repository.get_orders_for_company(company=company)
-        return [self._serialize_order(order=order, fetch_full_details=False) for order in orders]
+        orders = await self.document_repository.aget_orders_for_company(company_id=company_id, fields=fields)
+        return [self._serialize_order(order=order, fetch_full_details=False, fields=fields) for order in orders]
+
+    @read_write
+    def _restore_archived_order(self, order_id: int, company_id: int | None) -> bool:
+        """
+        Restore archived `Order` partition, which may contain requested order.
+
+        Only archives holding orders of the company as forwarder are restored, so users can't restore
+        partitions of other companies by guessing order ids.
+
+        :param order_id: Unique order identifier.
+        :param company_id: `models.Company` identifier of the request user.
+        :return: True if a partition was restored.
+        """
+        if company_id is None:
+            return False
+
+        archive = self.document_repository.get_archive_for_order(order_id=order_id, forwarder_id=company_id)
+        if archive is None:
+            return False
 
-    def _serialize_order(self, order: Order, fetch_full_details: bool = True) -> types.Order:
+        restore_order_partition(archive)
+        return True
+
+    def _serialize_order(
+        self,
+        order: Order,
+        fetch_full_details: bool = True,
+        fields: frozenset[str] | None = None,
+    ) -> types.Order:
         """
         Serialize order.
 
         :param order: `models.Order` instance to serialized.
+        :param fetch_full_details: Whether to serialize `types.FullOrderDetails` or `types.Order` fields.
+        :param fields: Sparse fieldset, only these fields are serialized (and loaded). All if None.
         :return: Serialized `models.Order` instance.
         """
-        if fetch_full_details:
-            order_files = [get_full_url_for_media_files(file) for file in order.files]
-            shipper_company = order.shipper
-            carrier_company = order.carrier
-            return types.FullOrderDetails(
-                order_id=order.id,
-                shipper_company_name=shipper_company.name,
-                carrier_company_name=carrier_company.name,
-                shipper_company_vat=shipper_company.vat_number,
-                carrier_company_vat=carrier_company.vat_number,
-                start_location=order.start_location,
-                end_location=order.end_location,
-                transportation_type=order.transportation_type,
-                container_type=order.container_type,
-                loading_type=order.loading_type,
-                cargo_type=order.cargo_type,
-                cargo_category=order.cargo_category,
-                cargo_name=order.cargo_name,
-                weight=order.weight,
-                price=order.price,
-                currency=order.currency,
-                dimension=order.dimension,
-                insurance=order.insurance,
-                comments=order.comments,
-                files=order_files,
-                created_datetime=order.date_created,
-            )
-
-        return types.Order(
-            order_id=order.id,
-            start_location=order.start_location,
-            end_location=order.end_location,
-            transportation_type=order.transportation_type,
-            cargo_type=order.cargo_type,
-            cargo_category=order.cargo_category,
-            cargo_name=order.cargo_name,
-            weight=order.weight,
-            dimension=order.dimension,
-            created_datetime=order.date_created,
-        )
+        field_names = FULL_ORDER_FIELDS if fetch_full_details else ORDER_FIELDS
+        if fields is not None:
+            field_names = [name for name in field_names if name in fields]
+
+        return cast(types.Order, {name: ORDER_FIELD_VALUES[name](order) for name in field_names})
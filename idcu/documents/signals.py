@@ -0,0 +1,109 @@
+"""Signal handlers for `documents` models."""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from base_idcu.lib.broker import get_broker
+from companies.repositories import ORDER_COUNTER_ROLES, CompanyRepository
+from documents.lib.enum import OrderEvent, OrderStatus
+from documents.models import COUNTED_FIELDS, Order
+
+
+def get_order_events_topic(forwarder_id: int) -> str:
+    """
+    Get events topic for forwarder company.
+
+    :param forwarder_id: Forwarder company identifier.
+    :return: Topic name.
+    """
+    return f"orders:forwarder:{forwarder_id}"
+
+
+@receiver(post_save, sender=Order)
+def publish_order_event(sender, instance: Order, created: bool, **kwargs) -> None:
+    """Publish order create and status change events once transaction is committed."""
+    if created:
+        event_type = OrderEvent.ORDER_CREATED
+    elif instance.status != getattr(instance, "_loaded_status", instance.status):
+        event_type = OrderEvent.ORDER_STATUS_CHANGED
+    else:
+        return
+
+    instance._loaded_status = instance.status
+    event = {
+        "event": event_type.value,
+        "data": {
+            "order_id": instance.id,
+            "status": instance.status,
+            "shipper_id": instance.shipper_id,
+            "carrier_id": instance.carrier_id,
+        },
+    }
+    transaction.on_commit(partial(get_broker().publish, get_order_events_topic(instance.forwarder_id), event))
+
+
+@receiver(post_save, sender=Order)
+def update_order_counters(sender, instance: Order, created: bool, raw: bool = False, **kwargs) -> None:
+    """
+    Update order counters of the order's companies in the order's transaction.
+
+    Orders loaded without counted fields (e.g. with `.only()`) aren't counted on update,
+    `reconcile_order_counters` command corrects them.
+    """
+    if raw:
+        return
+
+    counted_values = tuple(getattr(instance, name) for name in COUNTED_FIELDS)
+    loaded_values = None if created else getattr(instance, "_counted_values", counted_values)
+    if counted_values == loaded_values:
+        return
+
+    instance._counted_values = counted_values
+    counts = get_order_counts(*counted_values)
+    for company_id, company_counts in get_order_counts(*loaded_values).items() if loaded_values else ():
+        for name, count in company_counts.items():
+            counts.setdefault(company_id, {}).setdefault(name, 0)
+            counts[company_id][name] -= count
+
+    CompanyRepository().update_order_counters(counts, last_order_date=instance.date_created)
+
+
+@receiver(post_delete, sender=Order)
+def subtract_deleted_order_counters(sender, instance: Order, **kwargs) -> None:
+    """Subtract deleted order from order counters of its companies."""
+    counted_values = getattr(instance, "_counted_values", tuple(getattr(instance, name) for name in COUNTED_FIELDS))
+    counts = {
+        company_id: {name: -count for name, count in company_counts.items()}
+        for company_id, company_counts in get_order_counts(*counted_values).items()
+    }
+    CompanyRepository().update_order_counters(counts)
+
+
+def get_order_counts(
+    forwarder_id: int | None,
+    shipper_id: int | None,
+    carrier_id: int | None,
+    status: str,
+) -> dict[int, dict[str, int]]:
+    """
+    Get counts of an order in `CompanyOrderCounters` of its companies.
+
+    :param forwarder_id: Forwarder company identifier.
+    :param shipper_id: Shipper company identifier.
+    :param carrier_id: Carrier company identifier.
+    :param status: Order status.
+    :return: Counts by company identifier and counter name.
+    """
+    counts: dict[int, dict[str, int]] = {}
+    for role, company_id in zip(ORDER_COUNTER_ROLES, (forwarder_id, shipper_id, carrier_id)):
+        if company_id is None:
+            continue
+
+        company_counts = counts.setdefault(company_id, {})
+        company_counts[f"{role}_total_orders"] = 1
+        company_counts[f"{role}_active_orders"] = int(status != OrderStatus.FINISHED.name)
+
+    return counts
@@ -0,0 +1,18 @@
+"""Background tasks of `documents` package."""
+
+from django.core.files.base import ContentFile
+
+from documents.repositories import DocumentRepository
+from task_queue.lib.registry import task
+
+
+@task(max_attempts=5)
+def store_order_file(order_id: int, file_name: str, data: bytes) -> None:
+    """
+    Store file uploaded with an order and attach it to the order.
+
+    :param order_id: Order identifier.
+    :param file_name: Name of uploaded file.
+    :param data: File content.
+    """
+    DocumentRepository().create_order_file(file=ContentFile(data, name=file_name), order_id=order_id)
@@ -0,0 +1,304 @@
+"""Tests of `documents` endpoints and signals."""
+
+import shutil
+import tempfile
+from datetime import date, datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from base_idcu.base_authentication import token_cache
+from base_idcu.lib.idempotency import IDEMPOTENCY_HEADER, REPLAYED_HEADER
+from base_idcu.base_testing import QueryCountSnapshotMixin
+from companies.lib.enum import CompanyParty
+from companies.models import Company, CompanyOrderCounters
+from companies.services import CompanyServices
+from documents.lib.enum import Cargo, CargoCategory, OrderStatus, TentContainer, TentLoadingType, Transport
+from documents.models import Order, OrderPartitionArchive
+from documents.partitions import archive_order_partition, create_order_partition, get_order_partitions
+from users.models import AuthToken, TRSUser
+
+
+def create_order(forwarder: Company, shipper: Company, carrier: Company) -> Order:
+    """Create an order in progress between the companies."""
+    return Order.objects.create(
+        forwarder=forwarder,
+        shipper=shipper,
+        carrier=carrier,
+        start_location="TBILISI",
+        end_location="POTI",
+        transportation_type=Transport.TENT.name,
+        container_type=TentContainer.MEGA.name,
+        cargo_type=Cargo.TEA.name,
+        cargo_category=CargoCategory.STANDARD.name,
+        cargo_name="Tea",
+        weight=1,
+        price=2,
+        currency="GEL",
+        status=OrderStatus.IN_PROGRESS.name,
+    )
+
+
+class OrderEndpointsTest(QueryCountSnapshotMixin, TestCase):
+    """Query counts of order endpoints, with cold caches."""
+
+    query_snapshot_path = Path(__file__).with_name("query_counts.json")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        shipper = Company.objects.create(name="SH", party_type=CompanyParty.SHIPPER.name, vat_number="222")
+        carrier = Company.objects.create(name="CA", party_type=CompanyParty.CARRIER.name, vat_number="333")
+        user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=forwarder)
+        cls.auth_headers = {"Authorization": f"Token {AuthToken.objects.create(user=user).key}"}
+        cls.orders = [create_order(forwarder=forwarder, shipper=shipper, carrier=carrier) for _ in range(3)]
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+
+    def test_get_orders(self):
+        with self.assertQueryCountSnapshot("get-orders"):
+            response = self.client.get("/documents/get-orders", headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_order(self):
+        with self.assertQueryCountSnapshot("get-order"):
+            response = self.client.get(
+                "/documents/get-order", {"order_id": self.orders[0].id}, headers=self.auth_headers
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+
+# Restoring a partition runs over the `get-order` budget, which is set for orders in attached partitions.
+@override_settings(QUERY_BUDGET_MODE="off")
+class OrderPartitionArchiveTest(TestCase):
+    """Archived order partitions are restored by `get-order` for their forwarders."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        shipper = Company.objects.create(name="SH", party_type=CompanyParty.SHIPPER.name, vat_number="222")
+        carrier = Company.objects.create(name="CA", party_type=CompanyParty.CARRIER.name, vat_number="333")
+        other_forwarder = Company.objects.create(name="FW2", party_type=CompanyParty.FORWARDER.name, vat_number="444")
+        cls.forwarder = forwarder
+        cls.auth_headers = cls.create_auth_headers(email="a@a.com", company=forwarder, phone_number="1")
+        cls.other_auth_headers = cls.create_auth_headers(email="b@b.com", company=other_forwarder, phone_number="2")
+        cls.orders = [create_order(forwarder=forwarder, shipper=shipper, carrier=carrier) for _ in range(2)]
+        Order.objects.filter(id__in=[order.id for order in cls.orders]).update(
+            date_created=datetime(2020, 1, 15, tzinfo=dt_timezone.utc),
+        )
+
+    @staticmethod
+    def create_auth_headers(email: str, company: Company, phone_number: str) -> dict[str, str]:
+        user = TRSUser.objects.create_user(
+            username=email, email=email, password="pw", company=company, phone_number=phone_number
+        )
+        return {"Authorization": f"Token {AuthToken.objects.create(user=user).key}"}
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_settings = self.settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        create_order_partition(date(2020, 1, 1))
+        self.archive = archive_order_partition("documents_order_p2020_01")
+
+    def get_order(self, order_id: int, auth_headers: dict[str, str]):
+        return self.client.get("/documents/get-order", {"order_id": order_id}, headers=auth_headers)
+
+    def test_archive_records_orders(self):
+        self.assertNotIn("documents_order_p2020_01", get_order_partitions())
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(
+            (self.archive.min_order_id, self.archive.max_order_id, self.archive.rows_count, self.archive.forwarder_ids),
+            (self.orders[0].id, self.orders[1].id, 2, [self.forwarder.id]),
+        )
+
+    def test_forwarder_restores_archive(self):
+        response = self.get_order(self.orders[1].id, self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["cargo_name"], "Tea")
+        self.assertIn("documents_order_p2020_01", get_order_partitions())
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertIsNotNone(OrderPartitionArchive.objects.get().date_restored)
+        self.assertEqual(self.get_order(self.orders[0].id, self.auth_headers).status_code, 200)
+
+    def test_other_company_doesnt_restore_archive(self):
+        response = self.get_order(self.orders[0].id, self.other_auth_headers)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("documents_order_p2020_01", get_order_partitions())
+        self.assertIsNone(OrderPartitionArchive.objects.get().date_restored)
+
+    def test_archive_is_restored_again(self):
+        self.get_order(self.orders[0].id, self.auth_headers)
+
+        archive = archive_order_partition("documents_order_p2020_01")
+
+        self.assertEqual(OrderPartitionArchive.objects.get().id, archive.id)
+        self.assertIsNone(archive.date_restored)
+        self.assertEqual(self.get_order(self.orders[0].id, self.auth_headers).status_code, 200)
+
+
+class OrderIdempotencyTest(TransactionTestCase):
+    """
+    Orders created with an `Idempotency-Key` header.
+
+    Not a `TestCase`, failed service transactions roll back the outer transaction they join.
+    """
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+        forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        Company.objects.create(name="SH", party_type=CompanyParty.SHIPPER.name, vat_number="222")
+        Company.objects.create(name="CA", party_type=CompanyParty.CARRIER.name, vat_number="333")
+        user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=forwarder)
+        self.auth_headers = {"Authorization": f"Token {AuthToken.objects.create(user=user).key}"}
+        self.order_data = {
+            "shipper_company_vat": "222",
+            "carrier_company_vat": "333",
+            "start_location": "TBILISI",
+            "end_location": "POTI",
+            "transportation_type": Transport.TENT.name,
+            "container_type": TentContainer.MEGA.name,
+            "loading_type": TentLoadingType.REAR_LOAD.name,
+            "cargo_type": Cargo.TEA.name,
+            "cargo_category": CargoCategory.STANDARD.name,
+            "cargo_name": "Tea",
+            "weight": "1.00",
+            "price": "2.00",
+            "currency": "GEL",
+            "insurance": True,
+            "files": [],
+        }
+
+    def create_order(self, key: str, **data):
+        return self.client.post(
+            "/documents/create-order",
+            {**self.order_data, **data},
+            content_type="application/json",
+            headers={**self.auth_headers, IDEMPOTENCY_HEADER: key},
+        )
+
+    def test_retry_replays_stored_response(self):
+        response = self.create_order(key="order-1")
+        retry = self.create_order(key="order-1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(REPLAYED_HEADER, response.headers)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.headers[REPLAYED_HEADER], "true")
+        self.assertEqual(retry.json(), response.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_reused_key_with_different_payload_is_rejected(self):
+        self.assertEqual(self.create_order(key="order-1").status_code, 200)
+
+        response = self.create_order(key="order-1", cargo_name="Coffee")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_releases_key(self):
+        response = self.create_order(key="order-1", carrier_company_vat="444")
+        self.assertEqual(response.status_code, 400)
+        Company.objects.create(name="CA2", party_type=CompanyParty.CARRIER.name, vat_number="444")
+
+        retry = self.create_order(key="order-1", carrier_company_vat="444")
+
+        self.assertEqual(retry.status_code, 200)
+        self.assertNotIn(REPLAYED_HEADER, retry.headers)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_anonymous_request_ignores_key(self):
+        login = {"email": "a@a.com", "password": "pw"}
+
+        responses = [
+            self.client.post(
+                "/users/login-user", login, content_type="application/json", headers={IDEMPOTENCY_HEADER: "login-1"}
+            )
+            for _ in range(2)
+        ]
+
+        self.assertEqual([response.status_code for response in responses], [200, 200])
+        self.assertNotIn(REPLAYED_HEADER, responses[1].headers)
+        self.assertNotEqual(responses[0].json(), responses[1].json())
+
+
+class OrderCountersTest(TestCase):
+    """Order signals keep `CompanyOrderCounters` of order's companies."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        cls.shipper = Company.objects.create(name="SH", party_type=CompanyParty.SHIPPER.name, vat_number="222")
+        cls.carrier = Company.objects.create(name="CA", party_type=CompanyParty.CARRIER.name, vat_number="333")
+        cls.other_carrier = Company.objects.create(name="CA2", party_type=CompanyParty.CARRIER.name, vat_number="444")
+
+    def assertCounters(self, company: Company, role: str, active: int, total: int) -> None:
+        counters = CompanyOrderCounters.objects.get(company=company)
+        self.assertEqual(
+            (getattr(counters, f"{role}_active_orders"), getattr(counters, f"{role}_total_orders")),
+            (active, total),
+        )
+
+    def test_created_order_is_counted(self):
+        order = create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier)
+
+        self.assertCounters(self.forwarder, "forwarder", active=1, total=1)
+        self.assertCounters(self.shipper, "shipper", active=1, total=1)
+        self.assertCounters(self.carrier, "carrier", active=1, total=1)
+        self.assertCounters(self.carrier, "forwarder", active=0, total=0)
+        self.assertEqual(CompanyOrderCounters.objects.get(company=self.forwarder).last_order_date, order.date_created)
+
+    def test_finished_order_isnt_active(self):
+        order = Order.objects.get(id=create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier).id)
+
+        order.status = OrderStatus.FINISHED.name
+        order.save()
+        # Saving the finished order again doesn't subtract it twice.
+        order.save()
+
+        self.assertCounters(self.forwarder, "forwarder", active=0, total=1)
+        self.assertCounters(self.carrier, "carrier", active=0, total=1)
+
+    def test_changed_party_moves_counts(self):
+        order = Order.objects.get(id=create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier).id)
+
+        order.carrier = self.other_carrier
+        order.save()
+
+        self.assertCounters(self.carrier, "carrier", active=0, total=0)
+        self.assertCounters(self.other_carrier, "carrier", active=1, total=1)
+        self.assertCounters(self.forwarder, "forwarder", active=1, total=1)
+
+    def test_deleted_order_is_subtracted(self):
+        create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier)
+        order = create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier)
+
+        Order.objects.get(id=order.id).delete()
+
+        self.assertCounters(self.forwarder, "forwarder", active=1, total=1)
+        self.assertCounters(self.shipper, "shipper", active=1, total=1)
+        self.assertCounters(self.carrier, "carrier", active=1, total=1)
+
+    def test_reconcile_corrects_orders_written_without_signals(self):
+        order = create_order(forwarder=self.forwarder, shipper=self.shipper, carrier=self.carrier)
+        Order.objects.filter(id=order.id).update(status=OrderStatus.FINISHED.name, carrier=self.other_carrier)
+
+        # Counters of all three parties change, `CA2` gets its first counters.
+        self.assertEqual(CompanyServices().reconcile_order_counters(), 4)
+
+        self.assertCounters(self.forwarder, "forwarder", active=0, total=1)
+        self.assertCounters(self.carrier, "carrier", active=0, total=0)
+        self.assertCounters(self.other_carrier, "carrier", active=0, total=1)
@@ -4,11 +4,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
 from documents.views.documents import OrderCreateView, OrdersView, OrderView
+from documents.views.events import OrderEventsView
 
 urlpatterns = [
     path('create-order', OrderCreateView.as_view(), name='create-order'),
     path('get-orders', OrdersView.as_view(), name='get-orders'),
     path('get-order', OrderView.as_view(), name='get-order'),
+    path('order-events', OrderEventsView.as_view(), name='order-events'),
 ]
 
 if settings.DEBUG:
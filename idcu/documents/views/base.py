@@ -1,10 +1,12 @@
 """Base views for `company` view."""
 
 from rest_framework.views import APIView
+
+from base_idcu.lib.container import RequestScoped
 from documents.services import DocumentsService
 
 
 class BaseDocumentView(APIView):
     """Base document view."""
 
-    service_class = DocumentsService()
+    service_class = RequestScoped(DocumentsService)
@@ -1,76 +1,94 @@
 from typing import Any
 
+from base_idcu.base_authentication import AUTHENTICATION_CLASSES, READ_AUTHENTICATION_CLASSES
+from base_idcu.lib.queries import query_budget
 from base_idcu.views.base import IDCUView
 from documents.views.base import BaseDocumentView
 from documents.serializers.output import OrderResponse
 from documents.serializers.input import OrderToCreate, OrdersToFetch, OrderToFetch
 
 from rest_framework.decorators import authentication_classes, permission_classes
-from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
 class OrderCreateView(BaseDocumentView, IDCUView):
     """Handles request to the `company/<str:create-order>/` endpoint."""
 
     http_method_names = ['post']
     in_serializer_cls = OrderToCreate
+    out_serializer_cls = OrderResponse
 
-    def process_request(self, request_params: Any) -> OrderResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `company/create-order/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
         user = self.request.user
         response_data = self.service_class.create_order(**request_params, forwarder_company=user.company)
 
-        return OrderResponse(response_data).data
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(4)
 class OrdersView(BaseDocumentView, IDCUView):
     """Handles request to the `company/<str:get-orders>/` endpoint."""
 
     http_method_names = ['get']
+    read_only = True
+    sparse_fields = True
     in_serializer_cls = OrdersToFetch
+    out_serializer_cls = OrderResponse
+    out_serializer_kwargs = {"many": True}
 
-    def process_request(self, request_params: Any) -> OrderResponse:
+    async def process_request(self, request_params: Any) -> list[dict]:
         """
         process request for `company/get-orders/` endpoint.
 
         Fetches all orders for request user company.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
         user = self.request.user
-        response_data = self.service_class.fetch_orders_for_company(company=user.company)
+        response_data = await self.service_class.afetch_orders_for_company(
+            company_id=user.company_id,
+            fields=self.requested_fields,
+        )
 
-        return OrderResponse(response_data, many=True).data
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(6)
 class OrderView(BaseDocumentView, IDCUView):
     """Handles request to the `company/<str:get-order>/` endpoint."""
 
     http_method_names = ['get']
+    read_only = True
+    sparse_fields = True
     in_serializer_cls = OrderToFetch
+    out_serializer_cls = OrderResponse
 
-    def process_request(self, request_params: Any) -> OrderResponse:
+    async def process_request(self, request_params: Any) -> dict:
         """
         process request for `company/get-order/` endpoint.
 
         Fetches specific order for requested order id.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
-        response_data = self.service_class.fetch_order_by_id(order_id=request_params["order_id"])
+        response_data = await self.service_class.afetch_order_by_id(
+            order_id=request_params["order_id"],
+            company_id=self.request.user.company_id,
+            fields=self.requested_fields,
+        )
 
-        return OrderResponse(response_data).data
+        return response_data
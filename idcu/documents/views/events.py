@@ -0,0 +1,84 @@
+"""Module for Server-Sent Events views for `documents` package."""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.views import View
+
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from base_idcu.base_authentication import READ_AUTHENTICATION_CLASSES
+from base_idcu.lib.broker import get_broker
+from documents.signals import get_order_events_topic
+
+
+class OrderEventsView(View):
+    """
+    Handles request to the `documents/order-events` endpoint.
+
+    Streams order create and status change events of the user's forwarder company.
+    Meant to be served under ASGI, where each connection is a single async task.
+    """
+
+    http_method_names = ['get']
+    authentication_classes = READ_AUTHENTICATION_CLASSES
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """
+        Open the event stream.
+
+        :param request: The HTTP request.
+        :return: Streaming `text/event-stream` response.
+        """
+        user = await sync_to_async(self._authenticate)(request)
+        if user is None or not user.is_authenticated:
+            return HttpResponse(status=401)
+
+        if user.company_id is None:
+            return HttpResponse(status=404)
+
+        response = StreamingHttpResponse(
+            self._stream(get_order_events_topic(user.company_id)),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+
+        return response
+
+    def _authenticate(self, request: HttpRequest):
+        """
+        Authenticate the request with DRF authentication classes.
+
+        :param request: The HTTP request.
+        :return: Authenticated user or None.
+        """
+        drf_request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            return drf_request.user
+        except APIException:
+            return None
+
+    async def _stream(self, topic: str) -> AsyncIterator[str]:
+        """
+        Yield events for the topic as SSE messages, with periodic heartbeats.
+
+        :param topic: The topic to subscribe to.
+        :return: SSE formatted messages.
+        """
+        async with get_broker().subscribe(topic) as queue:
+            yield "retry: 3000\n\n"
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
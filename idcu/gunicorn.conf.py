@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for `idcu` project.
+
+`SERVER_MODE` selects how the project is served:
+ - `wsgi` (default) - sync workers running `idcu.wsgi`, `gthread` workers with `GUNICORN_THREADS` over 1.
+ - `asgi` - uvicorn workers running `idcu.asgi`, async views share a single event loop per worker.
+"""
+
+import os
+
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "idcu.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "idcu.wsgi:application"
+    worker_class = "gthread" if threads > 1 else "sync"
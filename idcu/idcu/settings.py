@@ -14,6 +14,7 @@ import os
 import socket
 from pathlib import Path
 import environ
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,6 +40,8 @@ ALLOWED_HOSTS = [
 CORS_ALLOWED_ORIGINS = [
     env.str('ALLOWED_ORIGINS', default='http://localhost:5173'),
 ]
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 
 # Application definition
@@ -52,16 +55,18 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'corsheaders',
     'rest_framework',
-    'rest_framework.authtoken',
     # our apps
     'companies.apps.CompaniesConfig',
     'users.apps.UsersConfig',
     'documents.apps.DocumentsConfig',
+    'task_queue.apps.TaskQueueConfig',
     # extra
 ] + ['storages']
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'base_idcu.middleware.CompressionMiddleware',
+    'base_idcu.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'base_idcu.middleware.IdentityMapMiddleware',
 ]
 
 ROOT_URLCONF = 'idcu.urls'
@@ -94,17 +100,106 @@ WSGI_APPLICATION = 'idcu.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# Connections are kept open between requests for `DB_CONN_MAX_AGE` seconds and checked before reuse.
+# With `DB_POOL_ENABLED` threads of a worker share a pool of `DB_POOL_MAX_SIZE` connections instead,
+# connections are returned to the pool at the end of every request.
+# With `SERVER_MODE=asgi` (see `gunicorn.conf.py`) sync work of requests runs in new threads, so persistent
+# connections (per thread) would leak, connections aren't kept by default, enable the pool instead.
+
+DB_POOL_ENABLED = env.bool('DB_POOL_ENABLED', default=False)
+SERVER_MODE = env.str('SERVER_MODE', default='wsgi')
+DB_CONN_MAX_AGE = env.int('DB_CONN_MAX_AGE', default=0 if SERVER_MODE == 'asgi' else 60)
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'base_idcu.db.backends.postgresql_pool' if DB_POOL_ENABLED else 'django.db.backends.postgresql',
         'NAME': env.str('RDS_DB_NAME', 'postgres'),
         'USER': env.str('RDS_DB_USER', 'postgres'),
         'PASSWORD': env.str('RDS_DB_PASSWORD', 'postgres'),
         'HOST': env.str('RDS_DB_HOST', 'localhost'),
         'PORT': env.str('RDS_DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL_ENABLED else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
+        'POOL': {
+            'MAX_SIZE': env.int('DB_POOL_MAX_SIZE', default=10),
+            'TIMEOUT': env.int('DB_POOL_TIMEOUT', default=10),
+            'MAX_LIFETIME': env.int('DB_POOL_MAX_LIFETIME', default=60 * 60),
+            'CHECK_AFTER': env.int('DB_POOL_CHECK_AFTER', default=30),
+        },
+    }
+}
+
+# Read-only views read from the replica at `DB_REPLICA_HOST` (see `base_idcu.lib.replicas`),
+# users' reads stay on the primary for `REPLICA_STICKY_SECONDS` after their writes,
+# all reads go to the primary while the replica lags more than `REPLICA_MAX_LAG` seconds.
+DB_REPLICA_HOST = env.str('DB_REPLICA_HOST', default='')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': env.str('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['base_idcu.db.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=5)
+REPLICA_MAX_LAG = env.float('REPLICA_MAX_LAG', default=2.0)
+REPLICA_LAG_CHECK_INTERVAL = env.int('REPLICA_LAG_CHECK_INTERVAL', default=5)
+
+# Run `@read_only` service methods in `READ ONLY` transactions, so writes in read paths fail (see `base_idcu.lib.transactions`).
+READ_ONLY_TRANSACTIONS = env.bool('READ_ONLY_TRANSACTIONS', default=False)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# e.g. `CACHE_URL=redis://host:6379/0` to share cache between workers.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Brotli/gzip compression of `IDCUView` responses (see `base_idcu.middleware.CompressionMiddleware`),
+# responses smaller than `COMPRESSION_MIN_SIZE` bytes aren't compressed.
+COMPRESSION_ENABLED = env.bool('COMPRESSION_ENABLED', default=True)
+COMPRESSION_MIN_SIZE = env.int('COMPRESSION_MIN_SIZE', default=1024)
+COMPRESSION_BROTLI_QUALITY = env.int('COMPRESSION_BROTLI_QUALITY', default=4)
+COMPRESSION_GZIP_LEVEL = env.int('COMPRESSION_GZIP_LEVEL', default=6)
+
+# Idempotency keys of POST requests (see `base_idcu.lib.idempotency`): seconds to keep responses,
+# seconds a key is held by a request in progress and seconds retries wait for it.
+IDEMPOTENCY_TTL = env.int('IDEMPOTENCY_TTL', default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int('IDEMPOTENCY_LOCK_TIMEOUT', default=60)
+IDEMPOTENCY_WAIT_TIMEOUT = env.float('IDEMPOTENCY_WAIT_TIMEOUT', default=10.0)
+
+# Max count of requests per `batch` request (see `base_idcu.views.batch`).
+BATCH_MAX_REQUESTS = env.int('BATCH_MAX_REQUESTS', default=20)
+
+# Repository lookups decorated with `@cached_lookup` (see `base_idcu.lib.repository_cache`).
+REPOSITORY_CACHE_ENABLED = env.bool('REPOSITORY_CACHE_ENABLED', default=True)
+REPOSITORY_CACHE_TTL = env.int('REPOSITORY_CACHE_TTL', default=300)
+REPOSITORY_CACHE_LOCAL_TTL = env.int('REPOSITORY_CACHE_LOCAL_TTL', default=5)
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# `PASSWORD_HASHER` selects the hasher for new hashes (`pbkdf2`, `scrypt` or `argon2`),
+# hashes made with other hashers are still accepted and upgraded on login.
+
+PASSWORD_HASHER = env.str('PASSWORD_HASHER', default='pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
 }
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+]
+
+# Logins verify passwords in a bounded thread pool (`users.lib.passwords`),
+# logins over `PASSWORD_HASHING_MAX_PENDING` are rejected right away.
+PASSWORD_HASHING_WORKERS = env.int('PASSWORD_HASHING_WORKERS', default=2)
+PASSWORD_HASHING_MAX_PENDING = env.int('PASSWORD_HASHING_MAX_PENDING', default=16)
 
 
 # Password validation
@@ -154,3 +249,96 @@ STATIC_URL = env.str('STATIC_URL', default='/static/')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.TRSUser'
+
+# Lifetime of auth tokens (`users.AuthToken`) in seconds, expired tokens are removed with `purge_expired_tokens`.
+AUTH_TOKEN_TTL = env.int('AUTH_TOKEN_TTL', default=30 * 24 * 60 * 60)
+# Tokens kept per user (one per client), the oldest ones are deleted when a new one is issued.
+AUTH_TOKENS_PER_USER = env.int('AUTH_TOKENS_PER_USER', default=5)
+
+# `CachedTokenAuthentication` cache, local (per process) entries can't be invalidated so keep them short.
+AUTH_TOKEN_CACHE_TTL = env.int('AUTH_TOKEN_CACHE_TTL', default=60)
+AUTH_TOKEN_LOCAL_CACHE_TTL = env.int('AUTH_TOKEN_LOCAL_CACHE_TTL', default=5)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = env.int('AUTH_TOKEN_LOCAL_CACHE_SIZE', default=1024)
+# Shared cache of revoked access tokens (`users.lib.access_tokens`), revocations reach workers within its TTL.
+ACCESS_TOKEN_REVOCATION_SHARED_CACHE_TTL = env.int('ACCESS_TOKEN_REVOCATION_SHARED_CACHE_TTL', default=60)
+
+# Signed access tokens (`users.lib.access_tokens`), issued by `login-user` and accepted by read-only endpoints.
+# Keys are `<key id>:<secret>`, the first one signs new tokens. To rotate keys, prepend a new key
+# and remove the old one after `ACCESS_TOKEN_TTL` seconds.
+ACCESS_TOKENS_ENABLED = env.bool('ACCESS_TOKENS_ENABLED', default=False)
+ACCESS_TOKEN_KEYS = env.list('ACCESS_TOKEN_KEYS', default=[f'default:{SECRET_KEY}'])
+ACCESS_TOKEN_TTL = env.int('ACCESS_TOKEN_TTL', default=15 * 60)
+ACCESS_TOKEN_REVOCATION_CACHE_TTL = env.int('ACCESS_TOKEN_REVOCATION_CACHE_TTL', default=5)
+
+# User invites (`users/invite-users`), invited users set their password following `USER_INVITE_URL`.
+USER_INVITE_URL = env.str('USER_INVITE_URL', default='http://localhost:3000/accept-invite?key={key}')
+USER_INVITE_TTL = env.int('USER_INVITE_TTL', default=7 * 24 * 60 * 60)
+USER_INVITE_MAX_USERS = env.int('USER_INVITE_MAX_USERS', default=500)
+
+
+# Throttling of `login-user`, `create-user` and `accept-invite` (`base_idcu.base_throttling`), rates are `<count>/<s|min|h|d>`.
+# `local` limits every worker process separately, `redis` shares limits between workers.
+
+THROTTLE_BACKEND = env.str('THROTTLE_BACKEND', default='local')
+THROTTLE_REDIS_URL = env.str('THROTTLE_REDIS_URL', default='redis://localhost:6379/0')
+THROTTLE_RATES = {
+    'login_ip': env.str('THROTTLE_LOGIN_IP_RATE', default='30/min'),
+    'login_email': env.str('THROTTLE_LOGIN_EMAIL_RATE', default='5/min'),
+    'create_user_ip': env.str('THROTTLE_CREATE_USER_IP_RATE', default='10/h'),
+    'create_user_email': env.str('THROTTLE_CREATE_USER_EMAIL_RATE', default='3/h'),
+    'accept_invite_ip': env.str('THROTTLE_ACCEPT_INVITE_IP_RATE', default='10/min'),
+}
+
+REST_FRAMEWORK = {
+    # Count of proxies in front of the app, so client IP is taken from `X-Forwarded-For` reliably.
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=None),
+}
+
+
+# Events pushed over Server-Sent Events (`documents/order-events`).
+# `inprocess` works only within a single process, use `postgres` (LISTEN/NOTIFY) for deployments.
+
+EVENT_BROKER_BACKEND = env.str('EVENT_BROKER_BACKEND', default='inprocess')
+EVENT_BROKER_CHANNEL = env.str('EVENT_BROKER_CHANNEL', default='idcu_events')
+SSE_HEARTBEAT_SECONDS = env.int('SSE_HEARTBEAT_SECONDS', default=15)
+
+
+# Per-stage timing of `IDCUView` requests (`Server-Timing` header, `base_idcu.timing` log, `metrics/` histograms).
+
+REQUEST_TIMING_ENABLED = env.bool('REQUEST_TIMING_ENABLED', default=False)
+
+# Query budgets and N+1 detection (`base_idcu.lib.queries`): `off`, `log` or `raise`.
+
+QUERY_BUDGET_MODE = env.str('QUERY_BUDGET_MODE', default='log' if DEBUG else 'off')
+QUERY_REPEAT_THRESHOLD = env.int('QUERY_REPEAT_THRESHOLD', default=3)
+
+# Background tasks (`task_queue`), run by `manage.py run_workers`.
+# `TASKS_EAGER` runs tasks inline on commit instead, e.g. in development without workers.
+
+TASKS_EAGER = env.bool('TASKS_EAGER', default=False)
+TASK_WORKERS = env.int('TASK_WORKERS', default=2)
+TASK_POLL_INTERVAL = env.float('TASK_POLL_INTERVAL', default=1.0)
+TASK_MAX_ATTEMPTS = env.int('TASK_MAX_ATTEMPTS', default=5)
+TASK_RETRY_BACKOFF = env.float('TASK_RETRY_BACKOFF', default=10.0)
+TASK_RETRY_BACKOFF_MAX = env.float('TASK_RETRY_BACKOFF_MAX', default=3600.0)
+TASK_LOCK_TIMEOUT = env.int('TASK_LOCK_TIMEOUT', default=600)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'base_idcu': {
+            'handlers': ['console'],
+            'level': env.str('LOG_LEVEL', default='INFO'),
+        },
+        'task_queue': {
+            'handlers': ['console'],
+            'level': env.str('LOG_LEVEL', default='INFO'),
+        },
+    },
+}
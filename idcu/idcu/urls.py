@@ -3,14 +3,27 @@ from django.urls import path, include
 from django.http import HttpResponse
 from django.conf import settings
 
+from base_idcu.lib.timing import render_metrics
+from base_idcu.views.batch import BatchView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('companies/', include('companies.urls')),
     path('users/', include('users.urls')),
-    path('documents/', include('documents.urls'))
+    path('documents/', include('documents.urls')),
+    path('batch', BatchView.as_view(), name='batch'),
 ]
 
 if settings.DEBUG is False:
     urlpatterns += [
         path("health/", lambda r: HttpResponse("OK"), name="health"),
     ]
+
+if settings.REQUEST_TIMING_ENABLED:
+    urlpatterns += [
+        path(
+            "metrics/",
+            lambda r: HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4"),
+            name="metrics",
+        ),
+    ]
@@ -0,0 +1,7 @@
+"""Admin site for `task_queue` models."""
+
+from django.contrib import admin
+
+from task_queue.models import Task
+
+admin.site.register(Task)
@@ -0,0 +1,15 @@
+"""Enums for `task_queue` package."""
+
+from base_idcu.lib.enum import ModelChoice
+
+__all__ = [
+    "TaskStatus",
+]
+
+
+class TaskStatus(ModelChoice):
+    """Task statuses enum, succeeded tasks are deleted."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    FAILED = "FAILED"
@@ -0,0 +1,141 @@
+"""
+Registry of background tasks.
+
+Tasks are functions decorated with `@task` in `tasks` modules of installed apps, taking JSON serializable keyword
+arguments and optionally a binary `data` payload:
+
+    @task(max_attempts=5)
+    def store_order_file(order_id: int, file_name: str, data: bytes) -> None:
+        ...
+
+    store_order_file.enqueue(order_id=order.id, file_name=file.name, data=file.read())
+
+Enqueued tasks are stored once the current transaction commits (right away outside of transactions),
+so workers never see tasks of rolled back requests and requests don't wait for them.
+With `TASKS_EAGER` enabled (e.g. in development without workers) tasks run inline on commit instead.
+"""
+
+import random
+from functools import partial
+from typing import Callable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from task_queue.repositories import TaskRepository
+
+__all__ = [
+    "TaskDefinition",
+    "get_task",
+    "task",
+]
+
+_tasks: dict[str, "TaskDefinition"] = {}
+
+
+class TaskDefinition:
+    """Registered task."""
+
+    def __init__(self, func: Callable, name: str, max_attempts: int | None, retry_backoff: float | None) -> None:
+        """
+        :param func: Task function.
+        :param name: Unique task name.
+        :param max_attempts: Count of attempts before task fails, `TASK_MAX_ATTEMPTS` by default.
+        :param retry_backoff: Seconds before the first retry, doubled by every retry, `TASK_RETRY_BACKOFF` by default.
+        """
+        self.func = func
+        self.name = name
+        self._max_attempts = max_attempts
+        self._retry_backoff = retry_backoff
+
+    @property
+    def max_attempts(self) -> int:
+        """Count of attempts before task fails."""
+        return self._max_attempts or settings.TASK_MAX_ATTEMPTS
+
+    def __call__(self, *args, **kwargs):
+        """Run task function inline."""
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, data: bytes | None = None, **kwargs) -> None:
+        """
+        Enqueue task once the current transaction commits.
+
+        :param data: Binary payload, passed as `data` argument.
+        :param kwargs: JSON serializable task arguments.
+        """
+        if settings.TASKS_EAGER:
+            transaction.on_commit(partial(self.run, kwargs=kwargs, data=data), using=DEFAULT_DB_ALIAS)
+            return
+
+        transaction.on_commit(
+            partial(
+                TaskRepository().create_task,
+                name=self.name,
+                kwargs=kwargs,
+                data=data,
+                max_attempts=self.max_attempts,
+            ),
+            using=DEFAULT_DB_ALIAS,
+        )
+
+    def run(self, kwargs: dict, data: bytes | None) -> None:
+        """
+        Run task with stored arguments.
+
+        :param kwargs: Task arguments.
+        :param data: Binary payload.
+        """
+        if data is not None:
+            kwargs = {**kwargs, "data": data}
+
+        self.func(**kwargs)
+
+    def get_retry_delay(self, attempts: int) -> float:
+        """
+        Get seconds before the next attempt, exponential with jitter, capped at `TASK_RETRY_BACKOFF_MAX`.
+
+        :param attempts: Count of failed attempts.
+        :return: Delay in seconds.
+        """
+        backoff = self._retry_backoff or settings.TASK_RETRY_BACKOFF
+        delay = min(backoff * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1)
+
+
+def task(
+    name: str | None = None,
+    max_attempts: int | None = None,
+    retry_backoff: float | None = None,
+) -> Callable[[Callable], TaskDefinition]:
+    """
+    Register background task.
+
+    :param name: Unique task name, `<module>.<function>` by default.
+    :param max_attempts: Count of attempts before task fails, `TASK_MAX_ATTEMPTS` by default.
+    :param retry_backoff: Seconds before the first retry, `TASK_RETRY_BACKOFF` by default.
+    :return: Decorator of task function.
+    """
+    def decorator(func: Callable) -> TaskDefinition:
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        definition = _tasks[task_name] = TaskDefinition(
+            func=func,
+            name=task_name,
+            max_attempts=max_attempts,
+            retry_backoff=retry_backoff,
+        )
+        return definition
+
+    return decorator
+
+
+def get_task(name: str) -> TaskDefinition:
+    """
+    Get registered task.
+
+    :param name: Task name.
+    :return: Task definition.
+
+    :raises KeyError: If task isn't registered, e.g. by a worker running older code.
+    """
+    return _tasks[name]
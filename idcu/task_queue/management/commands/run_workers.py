@@ -0,0 +1,81 @@
+"""Command to run background task workers."""
+
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import close_old_connections, connections
+
+from task_queue.services import TaskService
+
+
+class Command(BaseCommand):
+    """
+    Runs worker threads, each claiming due tasks with `SELECT ... FOR UPDATE SKIP LOCKED`, so any count of
+    workers (threads and processes on any hosts) can run side by side.
+
+    Stops on SIGINT/SIGTERM once running tasks finish.
+    """
+
+    help = "Run background task workers."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--workers", type=int, default=settings.TASK_WORKERS, help="Count of worker threads.")
+        parser.add_argument("--batch-size", type=int, default=1, help="Count of tasks claimed at once per worker.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.TASK_POLL_INTERVAL,
+            help="Seconds to wait when no task is due.",
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once no task is due.")
+
+    def handle(self, *args, **options):
+        """Run workers until stopped."""
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        threads = [
+            threading.Thread(
+                target=self.run_worker,
+                kwargs={
+                    "stopping": stopping,
+                    "batch_size": options["batch_size"],
+                    "poll_interval": options["poll_interval"],
+                    "burst": options["burst"],
+                },
+                name=f"task-worker-{index}",
+            )
+            for index in range(options["workers"])
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(f"{len(threads)} task workers started.")
+        # Join with timeouts, so the main thread keeps handling signals.
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+
+        self.stdout.write("Task workers stopped.")
+
+    def run_worker(self, stopping: threading.Event, batch_size: int, poll_interval: float, burst: bool) -> None:
+        """Run tasks until stopped, treating every batch like a request with regard to database connections."""
+        task_service = TaskService()
+        try:
+            while not stopping.is_set():
+                close_old_connections()
+                try:
+                    tasks_run = task_service.run_due_tasks(batch_size=batch_size)
+                finally:
+                    close_old_connections()
+
+                if not tasks_run:
+                    if burst:
+                        return
+                    stopping.wait(poll_interval)
+        finally:
+            connections.close_all()
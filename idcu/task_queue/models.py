@@ -0,0 +1,36 @@
+"""Models for `task_queue` package."""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from task_queue.lib.enum import TaskStatus
+
+
+class Task(models.Model):
+    """Background task, claimed by `run_workers` with `SELECT ... FOR UPDATE SKIP LOCKED`."""
+
+    name = models.CharField(max_length=255, help_text="Registered task name, see `task_queue.lib.registry`.")
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    data = models.BinaryField(null=True, help_text="Binary payload passed as `data` argument, e.g. file content.")
+    status = models.CharField(max_length=10, choices=TaskStatus.choices(), default=TaskStatus.PENDING.name)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    run_at = models.DateTimeField(default=timezone.now, help_text="Task isn't run before, set on retries.")
+    locked_at = models.DateTimeField(null=True, help_text="Set when worker claims task.")
+    last_error = models.TextField(default="", blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Only due tasks are scanned by workers, failed ones stay out of the index.
+            models.Index(
+                fields=["run_at"],
+                condition=Q(status__in=[TaskStatus.PENDING.name, TaskStatus.RUNNING.name]),
+                name="task_queue_task_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} | {self.status}"
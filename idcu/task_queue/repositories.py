@@ -0,0 +1,102 @@
+"""Repository module for `task_queue`."""
+
+from datetime import datetime, timedelta
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from task_queue.lib.enum import TaskStatus
+from task_queue.models import Task
+
+
+class TaskRepository:
+    """Repository class for `task_queue`."""
+
+    def create_task(self, name: str, kwargs: dict, data: bytes | None, max_attempts: int) -> Task:
+        """
+        Create pending task.
+
+        :param name: Registered task name.
+        :param kwargs: JSON serializable task arguments.
+        :param data: Binary payload of task.
+        :param max_attempts: Count of attempts before task fails.
+        :return: `Task` instance.
+        """
+        return Task.objects.create(name=name, kwargs=kwargs, data=data, max_attempts=max_attempts)
+
+    def claim_tasks(self, batch_size: int, lock_timeout: float) -> list[Task]:
+        """
+        Claim due tasks, skipping tasks claimed by other workers.
+
+        Tasks of workers which died (running for more than `lock_timeout` seconds) are claimed again.
+
+        :param batch_size: Max count of claimed tasks.
+        :param lock_timeout: Seconds after which running task is considered abandoned.
+        :return: Claimed `Task` instances, ordered by due time.
+        """
+        now = timezone.now()
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            tasks = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=TaskStatus.PENDING.name)
+                    | Q(status=TaskStatus.RUNNING.name, locked_at__lt=now - timedelta(seconds=lock_timeout)),
+                    run_at__lte=now,
+                )
+                .order_by("run_at")[:batch_size]
+            )
+            if tasks:
+                Task.objects.filter(id__in=[task.id for task in tasks]).update(
+                    status=TaskStatus.RUNNING.name,
+                    attempts=F("attempts") + 1,
+                    locked_at=now,
+                )
+
+        for task in tasks:
+            task.status = TaskStatus.RUNNING.name
+            task.attempts += 1
+            task.locked_at = now
+
+        return tasks
+
+    def delete_task(self, task: Task) -> bool:
+        """
+        Delete succeeded task, unless it was claimed again (by another worker, after `TASK_LOCK_TIMEOUT`).
+
+        :param task: Claimed `Task` instance.
+        :return: True if task was deleted.
+        """
+        deleted, _ = Task.objects.filter(id=task.id, locked_at=task.locked_at).delete()
+        return bool(deleted)
+
+    def retry_task(self, task: Task, run_at: datetime, error: str) -> bool:
+        """
+        Schedule next attempt of failed task, unless it was claimed again.
+
+        :param task: Claimed `Task` instance.
+        :param run_at: Time of next attempt.
+        :param error: Error of the failed attempt.
+        :return: True if retry was scheduled.
+        """
+        return bool(Task.objects.filter(id=task.id, locked_at=task.locked_at).update(
+            status=TaskStatus.PENDING.name,
+            run_at=run_at,
+            locked_at=None,
+            last_error=error,
+        ))
+
+    def fail_task(self, task: Task, error: str) -> bool:
+        """
+        Mark task as failed after its last attempt, keeping it for inspection, unless it was claimed again.
+
+        :param task: Claimed `Task` instance.
+        :param error: Error of the last attempt.
+        :return: True if task was marked as failed.
+        """
+        failed = Task.objects.filter(id=task.id, locked_at=task.locked_at).update(
+            status=TaskStatus.FAILED.name,
+            locked_at=None,
+            last_error=error,
+        )
+        return bool(failed)
@@ -0,0 +1,77 @@
+"""Services module for `task_queue` package."""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from task_queue.lib.registry import get_task
+from task_queue.models import Task
+from task_queue.repositories import TaskRepository
+
+logger = logging.getLogger("task_queue")
+
+
+class TaskService:
+    """Service class for `task_queue` package."""
+
+    def __init__(self):
+        self.task_repository = TaskRepository()
+
+    def run_due_tasks(self, batch_size: int = 1) -> int:
+        """
+        Claim due tasks and run them.
+
+        :param batch_size: Max count of tasks claimed at once, claimed tasks must finish within `TASK_LOCK_TIMEOUT`.
+        :return: Count of tasks run.
+        """
+        tasks = self.task_repository.claim_tasks(batch_size=batch_size, lock_timeout=settings.TASK_LOCK_TIMEOUT)
+        for task in tasks:
+            self.run_task(task=task)
+
+        return len(tasks)
+
+    def run_task(self, task: Task) -> bool:
+        """
+        Run claimed task, deleting it if it succeeds or scheduling a retry if it fails.
+        Tasks claimed again by another worker in the meantime (see `TASK_LOCK_TIMEOUT`) are left to that worker.
+
+        Task runs in a transaction with its deletion, so its database writes are committed once, even if it fails
+        after them or its worker dies, and aren't committed if another worker claimed the task in the meantime.
+
+        :param task: Claimed `Task` instance.
+        :return: True if task succeeded.
+        """
+        try:
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                definition = get_task(task.name)
+                definition.run(kwargs=task.kwargs, data=bytes(task.data) if task.data is not None else None)
+                if not self.task_repository.delete_task(task=task):
+                    logger.warning("Task %s was claimed again by another worker, rolling back.", task)
+                    transaction.set_rollback(True, using=DEFAULT_DB_ALIAS)
+                    return False
+        except Exception:
+            error = traceback.format_exc()
+            if task.attempts >= task.max_attempts:
+                if self.task_repository.fail_task(task=task, error=error):
+                    logger.exception("Task %s failed after %d attempts.", task, task.attempts)
+                else:
+                    logger.warning("Task %s failed, it was claimed again by another worker.", task, exc_info=True)
+                return False
+
+            try:
+                delay = get_task(task.name).get_retry_delay(attempts=task.attempts)
+            except KeyError:
+                delay = settings.TASK_RETRY_BACKOFF_MAX
+
+            run_at = timezone.now() + timedelta(seconds=delay)
+            if self.task_repository.retry_task(task=task, run_at=run_at, error=error):
+                logger.warning("Task %s failed, retrying in %.0fs.", task, delay, exc_info=True)
+            else:
+                logger.warning("Task %s failed, it was claimed again by another worker.", task, exc_info=True)
+            return False
+
+        return True
@@ -0,0 +1,161 @@
+"""Tests of background tasks."""
+
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from companies.lib.enum import CompanyParty
+from companies.models import Bank, Company
+from documents.lib.enum import Cargo, CargoCategory, OrderStatus, TentContainer, Transport
+from documents.models import Order, OrderFile
+from documents.tasks import store_order_file
+from task_queue.lib.enum import TaskStatus
+from task_queue.lib.registry import task
+from task_queue.models import Task
+from task_queue.repositories import TaskRepository
+from task_queue.services import TaskService
+
+
+@task(name="task_queue.tests.create_bank", retry_backoff=10)
+def create_bank(bank_code: str, fail: bool = False) -> None:
+    """Create a bank, failing after it if requested."""
+    Bank.objects.create(bank_name=bank_code, bank_code=bank_code)
+    if fail:
+        raise ValueError(bank_code)
+
+
+class TaskServiceTest(TestCase):
+    """Claiming and running tasks."""
+
+    def setUp(self) -> None:
+        self.task_repository = TaskRepository()
+        self.task_service = TaskService()
+
+    def create_task(self, max_attempts: int = 3, **kwargs) -> Task:
+        return self.task_repository.create_task(name=create_bank.name, kwargs=kwargs, data=None, max_attempts=max_attempts)
+
+    def claim_task(self) -> Task:
+        tasks = self.task_repository.claim_tasks(batch_size=10, lock_timeout=60)
+        self.assertEqual(len(tasks), 1)
+        return tasks[0]
+
+    def test_claim_tasks(self):
+        due = self.create_task(bank_code="DUE")
+        Task.objects.filter(id=self.create_task(bank_code="LATER").id).update(run_at=timezone.now() + timedelta(hours=1))
+
+        claimed = self.claim_task()
+
+        self.assertEqual(claimed.id, due.id)
+        due.refresh_from_db()
+        self.assertEqual((due.status, due.attempts), (TaskStatus.RUNNING.name, 1))
+        self.assertEqual(self.task_repository.claim_tasks(batch_size=10, lock_timeout=60), [])
+
+    def test_claim_abandoned_task(self):
+        abandoned = self.create_task(bank_code="ABANDONED")
+        Task.objects.filter(id=abandoned.id).update(
+            status=TaskStatus.RUNNING.name,
+            locked_at=timezone.now() - timedelta(seconds=61),
+        )
+
+        self.assertEqual(self.claim_task().id, abandoned.id)
+
+    def test_succeeded_task_is_deleted(self):
+        self.create_task(bank_code="OK")
+
+        self.assertTrue(self.task_service.run_task(self.claim_task()))
+
+        self.assertTrue(Bank.objects.filter(bank_code="OK").exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_with_backoff(self):
+        self.create_task(bank_code="RETRY", fail=True)
+        started_at = timezone.now()
+
+        self.assertFalse(self.task_service.run_task(self.claim_task()))
+
+        retried = Task.objects.get()
+        self.assertEqual(retried.status, TaskStatus.PENDING.name)
+        self.assertIsNone(retried.locked_at)
+        self.assertIn("ValueError: RETRY", retried.last_error)
+        # `retry_backoff=10` with jitter, for the first retry.
+        self.assertGreaterEqual(retried.run_at, started_at + timedelta(seconds=5))
+        self.assertLessEqual(retried.run_at, timezone.now() + timedelta(seconds=10))
+        # Writes of the failed attempt are rolled back, so retries don't duplicate them.
+        self.assertFalse(Bank.objects.filter(bank_code="RETRY").exists())
+
+    def test_task_fails_after_last_attempt(self):
+        self.create_task(max_attempts=1, bank_code="FAIL", fail=True)
+
+        self.assertFalse(self.task_service.run_task(self.claim_task()))
+
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (TaskStatus.FAILED.name, 1))
+        self.assertIn("ValueError: FAIL", failed.last_error)
+        self.assertEqual(self.task_repository.claim_tasks(batch_size=10, lock_timeout=0), [])
+
+    def test_task_claimed_again_is_rolled_back(self):
+        self.create_task(bank_code="RECLAIMED")
+        stale = self.claim_task()
+        other_locked_at = stale.locked_at + timedelta(seconds=1)
+        Task.objects.filter(id=stale.id).update(locked_at=other_locked_at)
+
+        self.assertFalse(self.task_service.run_task(stale))
+
+        self.assertFalse(Bank.objects.filter(bank_code="RECLAIMED").exists())
+        self.assertEqual(Task.objects.get().locked_at, other_locked_at)
+
+    def test_failed_task_claimed_again_isnt_retried(self):
+        self.create_task(bank_code="RECLAIMED", fail=True)
+        stale = self.claim_task()
+        other_locked_at = stale.locked_at + timedelta(seconds=1)
+        Task.objects.filter(id=stale.id).update(locked_at=other_locked_at)
+
+        self.assertFalse(self.task_service.run_task(stale))
+
+        running = Task.objects.get()
+        self.assertEqual((running.status, running.locked_at), (TaskStatus.RUNNING.name, other_locked_at))
+
+
+@override_settings(TASKS_EAGER=False)
+class RunWorkersTest(TransactionTestCase):
+    """Workers run tasks enqueued by committed transactions."""
+
+    def setUp(self) -> None:
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        forwarder = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        self.order = Order.objects.create(
+            forwarder=forwarder,
+            shipper=forwarder,
+            carrier=forwarder,
+            start_location="TBILISI",
+            end_location="POTI",
+            transportation_type=Transport.TENT.name,
+            container_type=TentContainer.MEGA.name,
+            cargo_type=Cargo.TEA.name,
+            cargo_category=CargoCategory.STANDARD.name,
+            cargo_name="Tea",
+            weight=1,
+            price=2,
+            currency="GEL",
+            status=OrderStatus.IN_PROGRESS.name,
+        )
+
+    def test_run_workers_burst(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            store_order_file.enqueue(order_id=self.order.id, file_name="a.txt", data=b"a")
+            store_order_file.enqueue(order_id=self.order.id, file_name="b.txt", data=b"b")
+            self.assertEqual(Task.objects.count(), 2)
+
+            call_command("run_workers", "--burst", "--workers", "2", stdout=io.StringIO())
+
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(
+            sorted(order_file.file.name.split("/")[-1][0] for order_file in OrderFile.objects.filter(order=self.order)),
+            ["a", "b"],
+        )
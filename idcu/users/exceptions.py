@@ -18,3 +18,34 @@ class UserDoesntExistError(WebHttpException):
     default_detail = "User doesn't exist."
     default_code = "user_doesnt_exist"
 
+
+class PasswordCheckUnavailableError(WebHttpException):
+    """Raised when password hashing pool is full."""
+
+    status_code = 503
+    default_detail = "Too many concurrent logins, retry later."
+    default_code = "password_check_unavailable"
+
+
+class AccessTokenError(WebHttpException):
+    """Raised when signed access token is invalid, expired or revoked."""
+
+    status_code = 401
+    default_detail = "Invalid access token."
+    default_code = "invalid_access_token"
+
+
+class UserInviteError(WebHttpException):
+    """Raised when users can't be invited."""
+
+    status_code = 400
+    default_detail = "Users can't be invited."
+    default_code = "user_invite_failed"
+
+
+class InviteNotFoundError(WebHttpException):
+    """Raised when invite doesn't exist or is expired."""
+
+    status_code = 404
+    default_detail = "Invite doesn't exist or is expired."
+    default_code = "invite_not_found"
@@ -0,0 +1,206 @@
+"""
+Stateless signed access tokens.
+
+Access token is `<key id>.<payload>.<signature>`, where payload is base64 encoded JSON with
+user id, company id, expiry and token id, signed with HMAC-SHA256 by the first key of `ACCESS_TOKEN_KEYS`.
+Other keys are still accepted, so keys can be rotated without logging users out.
+
+Tokens are verified in memory. Token id is derived from the `AuthToken` the access token is issued for,
+revoking it rejects access tokens of the `AuthToken` issued before the revocation. Revoked token ids are kept
+until the access tokens expire, and are read from a small cached mapping.
+"""
+
+import base64
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from base_idcu.lib.cache import MISSING, TwoTierCache
+from users import exceptions
+from users.models import AuthToken, RevokedAccessToken, TRSUser
+
+__all__ = [
+    "AccessToken",
+    "generate_access_token",
+    "parse_access_token",
+    "revoke_access_tokens",
+]
+
+SALT = "users.access_token"
+REVOKED_TOKENS_KEY = "all"
+
+revoked_tokens_cache = TwoTierCache(
+    namespace="revoked-access-tokens",
+    local_ttl=settings.ACCESS_TOKEN_REVOCATION_CACHE_TTL,
+    shared_ttl=settings.ACCESS_TOKEN_REVOCATION_SHARED_CACHE_TTL,
+)
+
+
+@dataclass(frozen=True)
+class AccessToken:
+    """Verified access token."""
+
+    key: str
+    token_id: str
+    user_id: int
+    company_id: int | None
+    expires_at: datetime
+
+    def get_user(self) -> TRSUser:
+        """
+        Get the token user, built in memory from the token claims.
+
+        Only `id` and `company_id` are set, so the user must not be saved.
+
+        :return: `TRSUser` instance.
+        """
+        user = TRSUser(id=self.user_id, company_id=self.company_id, is_active=True)
+        user._state.adding = False
+        user._state.db = "default"
+        return user
+
+
+def get_signing_keys() -> dict[str, str]:
+    """
+    Get signing keys by key id, the first one signs new tokens.
+
+    :return: Secrets by key ids.
+    """
+    return dict(key.split(":", 1) for key in settings.ACCESS_TOKEN_KEYS)
+
+
+def get_token_id(auth_token: AuthToken) -> str:
+    """
+    Get id of access tokens issued for the `AuthToken`.
+
+    :param auth_token: `AuthToken` instance.
+    :return: Token id.
+    """
+    return hashlib.sha256(auth_token.key.encode()).hexdigest()[:32]
+
+
+def _b64encode(value: bytes) -> str:
+    return base64.urlsafe_b64encode(value).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _sign(key_id: str, secret: str, payload: str) -> str:
+    return _b64encode(salted_hmac(SALT, f"{key_id}.{payload}", secret=secret, algorithm="sha256").digest())
+
+
+def generate_access_token(auth_token: AuthToken) -> str:
+    """
+    Generate access token for the `AuthToken` user.
+
+    Access token expires in `ACCESS_TOKEN_TTL`, but not later than the `AuthToken`.
+
+    :param auth_token: `AuthToken` instance with loaded user.
+    :return: Signed access token.
+    """
+    expires_at = min(auth_token.expires_at, timezone.now() + timedelta(seconds=settings.ACCESS_TOKEN_TTL))
+    claims = {
+        "jti": get_token_id(auth_token),
+        "uid": auth_token.user.id,
+        "cid": auth_token.user.company_id,
+        "iat": time.time(),
+        "exp": int(expires_at.timestamp()),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    key_id, secret = next(iter(get_signing_keys().items()))
+
+    return f"{key_id}.{payload}.{_sign(key_id, secret, payload)}"
+
+
+def parse_access_token(value: str) -> AccessToken:
+    """
+    Verify access token without DB lookups.
+
+    :param value: Signed access token.
+    :return: Verified `AccessToken`.
+
+    :raises AccessTokenError: If token is malformed, signed with unknown key, tampered, expired or revoked.
+    """
+    try:
+        key_id, payload, signature = value.split(".")
+    except ValueError:
+        raise exceptions.AccessTokenError("Malformed access token.")
+
+    secret = get_signing_keys().get(key_id)
+    if secret is None or not constant_time_compare(signature, _sign(key_id, secret, payload)):
+        raise exceptions.AccessTokenError("Invalid access token signature.")
+
+    claims = json.loads(_b64decode(payload))
+    if claims["exp"] <= time.time():
+        raise exceptions.AccessTokenError("Access token expired.")
+
+    revoked_at = get_revoked_tokens().get(claims["jti"])
+    if revoked_at is not None and claims["iat"] <= revoked_at:
+        raise exceptions.AccessTokenError("Access token revoked.")
+
+    return AccessToken(
+        key=value,
+        token_id=claims["jti"],
+        user_id=claims["uid"],
+        company_id=claims["cid"],
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=dt_timezone.utc),
+    )
+
+
+def get_revoked_tokens() -> dict[str, float]:
+    """
+    Get revoked, not yet expired access tokens.
+
+    :return: Revocation timestamps by token ids.
+    """
+    revoked_tokens = revoked_tokens_cache.get(REVOKED_TOKENS_KEY)
+    if revoked_tokens is MISSING:
+        revoked_tokens = {
+            token_id: date_revoked.timestamp()
+            for token_id, date_revoked in RevokedAccessToken.objects.filter(
+                expires_at__gt=timezone.now(),
+            ).values_list("token_id", "date_revoked")
+        }
+        revoked_tokens_cache.set(REVOKED_TOKENS_KEY, revoked_tokens)
+
+    return revoked_tokens
+
+
+def revoke_access_tokens(auth_tokens: list[AuthToken]) -> None:
+    """
+    Revoke access tokens issued for the `AuthToken`s so far.
+
+    Other processes see the revocation within `ACCESS_TOKEN_REVOCATION_CACHE_TTL`.
+
+    :param auth_tokens: `AuthToken` instances.
+    """
+    now = timezone.now()
+    max_expires_at = now + timedelta(seconds=settings.ACCESS_TOKEN_TTL)
+    revoked_tokens = [
+        RevokedAccessToken(
+            token_id=get_token_id(auth_token),
+            date_revoked=now,
+            expires_at=min(auth_token.expires_at, max_expires_at),
+        )
+        for auth_token in auth_tokens
+        if not auth_token.is_expired
+    ]
+    if not revoked_tokens:
+        return
+
+    RevokedAccessToken.objects.bulk_create(
+        revoked_tokens,
+        update_conflicts=True,
+        unique_fields=["token_id"],
+        update_fields=["date_revoked", "expires_at"],
+    )
+    transaction.on_commit(lambda: revoked_tokens_cache.delete(REVOKED_TOKENS_KEY))
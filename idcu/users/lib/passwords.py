@@ -0,0 +1,90 @@
+"""
+Password verification offloaded to a bounded thread pool.
+
+Password hashers (PBKDF2, scrypt, argon2) release the GIL while hashing, so a small pool
+runs verifications in parallel without blocking request workers or the event loop.
+Pool is bounded: when `PASSWORD_HASHING_MAX_PENDING` verifications are already running or queued,
+new ones are rejected right away, so login storms can't starve other endpoints.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from users import exceptions
+
+__all__ = [
+    "hash_password",
+    "averify_password",
+]
+
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS, thread_name_prefix="password-hashing")
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_MAX_PENDING)
+
+
+def _check_password(password: str, encoded: str | None) -> tuple[bool, str | None]:
+    """
+    Check password against the hash, rehashing it with the preferred hasher if needed.
+
+    :param password: Raw password.
+    :param encoded: Password hash, None if user doesn't exist.
+    :return: Whether password is valid and the new hash, if stored one must be updated.
+    """
+    if encoded is None:
+        # Hash anyway, so response time doesn't reveal whether the user exists.
+        make_password(password)
+        return False, None
+
+    new_encoded = None
+
+    def setter(raw_password: str) -> None:
+        nonlocal new_encoded
+        new_encoded = make_password(raw_password)
+
+    return check_password(password, encoded, setter=setter), new_encoded
+
+
+def _acquire_slot() -> None:
+    """
+    Reserve a place in the pool.
+
+    :raises PasswordCheckUnavailableError: If the pool is full.
+    """
+    if not _slots.acquire(blocking=False):
+        raise exceptions.PasswordCheckUnavailableError()
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash password with the preferred hasher in the hashing pool.
+
+    :param password: Raw password.
+    :return: Password hash.
+
+    :raises PasswordCheckUnavailableError: If the pool is full.
+    """
+    _acquire_slot()
+    try:
+        return _executor.submit(make_password, password).result()
+    finally:
+        _slots.release()
+
+
+async def averify_password(password: str, encoded: str | None) -> tuple[bool, str | None]:
+    """
+    Verify password in the hashing pool, without blocking the event loop.
+
+    :param password: Raw password.
+    :param encoded: Password hash, None if user doesn't exist.
+    :return: Whether password is valid and the new hash, if stored one must be updated.
+
+    :raises PasswordCheckUnavailableError: If the pool is full.
+    """
+    _acquire_slot()
+    try:
+        return await asyncio.wrap_future(_executor.submit(_check_password, password, encoded))
+    finally:
+        _slots.release()
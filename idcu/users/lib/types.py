@@ -1,5 +1,6 @@
 """Module defining types related to `users` package."""
 
+from datetime import datetime
 from typing import TypedDict, NotRequired
 from companies.lib.types import Company
 
@@ -11,5 +12,29 @@ class User(TypedDict):
     last_name: str
     email: str
     phone_number: str
-    token: str
+    token: str | None
     attached_company: NotRequired[Company]
+    access_token: NotRequired[str]
+
+
+class AccessTokenResponse(TypedDict):
+    """Signed access token."""
+
+    access_token: str
+
+
+class UserToInvite(TypedDict):
+    """Details of a user to invite."""
+
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: str
+
+
+class UserInvite(TypedDict):
+    """Invite of a user."""
+
+    email: str
+    invite_url: str
+    expires_at: datetime
@@ -0,0 +1,47 @@
+"""Command to invite users of a forwarder company from CSV file."""
+
+import csv
+
+from django.core.management import BaseCommand, CommandError
+
+from companies.repositories import CompanyRepository
+from users.exceptions import UserInviteError
+from users.serializers.input import UsersToInvite
+from users.services import UserService
+
+
+class Command(BaseCommand):
+    """
+    Creates users from CSV file with `first_name`, `last_name`, `email` and `phone_number` columns,
+    attached to the company, and writes their invite links as CSV to stdout.
+
+    All users are created in one transaction, if any of them is invalid or already exists, none are created.
+    """
+
+    help = "Invite users of a forwarder company from CSV file."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("csv_path", help="Path to CSV file with users to invite.")
+        parser.add_argument("--company-vat", required=True, help="VAT number of the company to attach users to.")
+
+    def handle(self, *args, **options):
+        """Validate users, invite them and output invite links."""
+        company = CompanyRepository().get_company_by_vat(vat_number=options["company_vat"])
+        if company is None:
+            raise CommandError(f"Company with VAT number {options['company_vat']} doesn't exist.")
+
+        with open(options["csv_path"], newline="") as csv_file:
+            serializer = UsersToInvite(data={"users": list(csv.DictReader(csv_file))})
+
+        if not serializer.is_valid():
+            raise CommandError(f"Invalid users: {serializer.errors}")
+
+        try:
+            invites = UserService().invite_users(company_id=company.id, users=serializer.validated_data["users"])
+        except UserInviteError as exc:
+            raise CommandError(exc.detail)
+
+        writer = csv.DictWriter(self.stdout, fieldnames=["email", "invite_url", "expires_at"])
+        writer.writeheader()
+        writer.writerows(invites)
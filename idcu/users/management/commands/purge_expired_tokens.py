@@ -0,0 +1,34 @@
+"""Command to delete expired auth tokens and access token revocations."""
+
+from django.core.management import BaseCommand
+
+from users.repositories import UserRepository
+
+
+class Command(BaseCommand):
+    """
+    Deletes expired `AuthToken` and `RevokedAccessToken` rows in batches, keeping transactions and locks short.
+
+    Meant to be run periodically (e.g. daily).
+    """
+
+    help = "Delete expired auth tokens and access token revocations."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--batch-size", type=int, default=1000, help="Count of tokens deleted per batch.")
+
+    def handle(self, *args, **options):
+        """Delete expired tokens batch by batch."""
+        user_repository = UserRepository()
+        total_deleted = 0
+        while deleted := user_repository.delete_expired_tokens(batch_size=options["batch_size"]):
+            total_deleted += deleted
+
+        self.stdout.write(f"{total_deleted} expired tokens deleted.")
+
+        total_deleted = 0
+        while deleted := user_repository.delete_expired_revoked_access_tokens(batch_size=options["batch_size"]):
+            total_deleted += deleted
+
+        self.stdout.write(f"{total_deleted} expired access token revocations deleted.")
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:58
+
+from datetime import timedelta
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_legacy_tokens(apps, schema_editor):
+    """
+    Move tokens issued by `rest_framework.authtoken` (no longer installed), keeping them valid for one token lifetime.
+
+    Legacy table is dropped, as its foreign key would block users deletion.
+    """
+    connection = schema_editor.connection
+    if "authtoken_token" not in connection.introspection.table_names():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO users_authtoken (key, user_id, date_created, expires_at)
+            SELECT key, user_id, created, %s FROM authtoken_token
+            """,
+            [django.utils.timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL)],
+        )
+        cursor.execute("DROP TABLE authtoken_token")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_legacy_tokens, migrations.RunPython.noop),
+    ]
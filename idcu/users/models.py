@@ -1,8 +1,13 @@
 """Models module for `users` package."""
+import binascii
+import os
+from datetime import timedelta
 from functools import cached_property
 
 from companies.models import Company
 
+from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import AbstractUser
 from django.db import models
@@ -15,7 +20,84 @@ class TRSUser(AbstractUser):
     email = models.EmailField(_("email address"), blank=True, unique=True)
     company = models.ForeignKey(Company, on_delete=models.SET_NULL, null=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded access token claims, so their changes can be detected on save."""
+        instance = super().from_db(db, field_names, values)
+        if "company_id" in field_names and "is_active" in field_names:
+            instance._loaded_access_claims = (
+                values[field_names.index("company_id")],
+                values[field_names.index("is_active")],
+            )
+
+        return instance
+
     @cached_property
     def get_phone_number(self) -> str:
         """Get user phone number."""
         return self.phone_number
+
+
+class AuthToken(models.Model):
+    """
+    Expiring auth token.
+
+    Token is issued on user creation and every login, a user may have several tokens (one per client).
+    """
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(TRSUser, related_name="auth_tokens", on_delete=models.CASCADE)
+    date_created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def save(self, *args, **kwargs):
+        """Generate key and expiry date for new tokens."""
+        if not self.key:
+            self.key = self.generate_key()
+        if not self.expires_at:
+            self.expires_at = timezone.now() + timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+        return super().save(*args, **kwargs)
+
+    @classmethod
+    def generate_key(cls) -> str:
+        """Generate random token key."""
+        return binascii.hexlify(os.urandom(20)).decode()
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether token is expired."""
+        return self.expires_at <= timezone.now()
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class RevokedAccessToken(models.Model):
+    """
+    Revoked signed access tokens (see `users.lib.access_tokens`).
+
+    Access tokens with the id issued before `date_revoked` are rejected, row is kept until they expire.
+    """
+
+    token_id = models.CharField(max_length=32, primary_key=True)
+    date_revoked = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+
+class UserInvite(models.Model):
+    """
+    Invite of a user created without password.
+
+    The user sets the password with the invite key (`users/accept-invite`), invite is deleted then.
+    """
+
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.OneToOneField(TRSUser, related_name="invite", on_delete=models.CASCADE)
+    date_created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether invite is expired."""
+        return self.expires_at <= timezone.now()
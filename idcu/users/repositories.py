@@ -1,16 +1,23 @@
 """Repository module for `users`."""
 
-from companies.models import Company
-from users.models import TRSUser
+from datetime import timedelta
 
-from django.db import transaction
-from rest_framework.authtoken.models import Token
+from base_idcu.lib.repository_cache import cached_lookup
+from companies.models import Bank, Company, Iban
+from users.lib import types
+from users.models import AuthToken, RevokedAccessToken, TRSUser, UserInvite
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
 
 
 class UserRepository:
     """Repository class for `users`."""
 
-    @transaction.atomic
     def create_trs_user(
         self,
         first_name: str,
@@ -40,6 +47,60 @@ class UserRepository:
             password=password,
         )
 
+    def create_invited_users(self, company_id: int, users: list[types.UserToInvite]) -> list[TRSUser]:
+        """
+        Create users without usable password, attached to the company, in a single statement.
+
+        :param company_id: Identifier of the company to attach users to.
+        :param users: Details of users to create.
+        :return: Created `TRSUser` instances.
+
+        :raises IntegrityError: If the users creation fails with db constraints.
+        """
+        return TRSUser.objects.bulk_create(
+            [
+                TRSUser(
+                    username=user["email"],
+                    email=user["email"],
+                    first_name=user["first_name"],
+                    last_name=user["last_name"],
+                    phone_number=user["phone_number"],
+                    password=make_password(None),
+                    company_id=company_id,
+                )
+                for user in users
+            ]
+        )
+
+    def create_user_invites(self, users: list[TRSUser]) -> list[UserInvite]:
+        """
+        Create invites for users in a single statement.
+
+        :param users: `TRSUser` instances to invite.
+        :return: Created `UserInvite` instances.
+        """
+        expires_at = timezone.now() + timedelta(seconds=settings.USER_INVITE_TTL)
+        return UserInvite.objects.bulk_create(
+            [UserInvite(key=AuthToken.generate_key(), user=user, expires_at=expires_at) for user in users]
+        )
+
+    def get_invite_by_key(self, key: str) -> UserInvite | None:
+        """
+        Get invite with its user, locking it until the end of transaction.
+
+        :param key: Invite key.
+        :return: `UserInvite` instance or None if invite doesn't exist.
+        """
+        return UserInvite.objects.select_for_update().select_related("user").filter(key=key).first()
+
+    def delete_invite(self, invite: UserInvite) -> None:
+        """
+        Delete invite.
+
+        :param invite: `UserInvite` instance.
+        """
+        invite.delete()
+
     def add_company_to_user(self, user: TRSUser, company: Company) -> None:
         """
         Add company to user.
@@ -50,28 +111,113 @@ class UserRepository:
         user.company = company
         user.save()
 
-    def get_or_create_token(self, user: TRSUser) -> Token:
+    def create_token(self, user: TRSUser) -> AuthToken:
         """
-        Get or create auth token.
+        Create a new auth token, deleting the oldest tokens of the user over `AUTH_TOKENS_PER_USER`.
+
+        Tokens are deleted in the transaction creating the new one, with signals, so they're dropped from
+        the authentication cache once it's committed (see `users.signals`).
 
         :param user: `models.TRSUser` instance.
-        :return: `Token` instance.
+        :return: Created `AuthToken` instance.
         """
-        token, _ = Token.objects.get_or_create(user=user)
+        with transaction.atomic(using=DEFAULT_DB_ALIAS, savepoint=False):
+            token = AuthToken.objects.create(user=user)
+            old_keys = list(
+                AuthToken.objects.filter(user=user)
+                .order_by("-date_created", "-key")
+                .values_list("key", flat=True)[settings.AUTH_TOKENS_PER_USER:]
+            )
+            if old_keys:
+                AuthToken.objects.filter(key__in=old_keys).delete()
+
         return token
 
-    def get_user_by_credentials(self, email: str, password: str) -> TRSUser | None:
+    async def acreate_token(self, user: TRSUser) -> AuthToken:
+        """
+        Async version of `create_token`.
+
+        :param user: `models.TRSUser` instance.
+        :return: Created `AuthToken` instance.
+        """
+        return await sync_to_async(self.create_token)(user=user)
+
+    def get_users_by_emails_or_phone_numbers(self, emails: list[str], phone_numbers: list[str]) -> list[TRSUser]:
         """
-        Get user by credentials.
+        Get users having any of emails or phone numbers.
+
+        :param emails: Emails to look for.
+        :param phone_numbers: Phone numbers to look for.
+        :return: `TRSUser` instances.
+        """
+        return list(TRSUser.objects.filter(Q(email__in=emails) | Q(phone_number__in=phone_numbers)))
+
+    async def aget_user_by_email(self, email: str) -> TRSUser | None:
+        """
+        Get user by email.
 
         :param email: User's email.
-        :param password: User's password.
         :return: `models.TRSUser` instance or None if user doesn't exist.
         """
-        try:
-            user = TRSUser.objects.get(email=email)
-            if user.check_password(password):
-                return user
+        return await TRSUser.objects.filter(email=email).afirst()
+
+    @cached_lookup(namespace="user-with-company-by-id", invalidated_by=[TRSUser, Company, Iban, Bank])
+    async def aget_user_with_company_by_id(self, user_id: int) -> TRSUser | None:
+        """
+        Get user by id, with company and its IBANs loaded, cached.
+        Password hash and company's order counters aren't loaded, so they aren't cached.
+
+        :param user_id: User's identifier.
+        :return: `models.TRSUser` instance or None if user doesn't exist.
+        """
+        return await (
+            TRSUser.objects.select_related("company")
+            .prefetch_related("company__iban_set__bank")
+            .defer("password")
+            .filter(id=user_id)
+            .afirst()
+        )
 
-        except TRSUser.DoesNotExist:
-            return None
+    def update_user_password_hash(self, user: TRSUser, encoded: str) -> None:
+        """
+        Update user's password hash (e.g. rehashed with another hasher).
+
+        :param user: `models.TRSUser` instance.
+        :param encoded: New password hash.
+        """
+        user.password = encoded
+        user.save(update_fields=["password"])
+
+    async def aupdate_user_password_hash(self, user: TRSUser, encoded: str) -> None:
+        """
+        Async version of `update_user_password_hash`.
+
+        :param user: `models.TRSUser` instance.
+        :param encoded: New password hash.
+        """
+        user.password = encoded
+        await user.asave(update_fields=["password"])
+
+    def delete_expired_tokens(self, batch_size: int) -> int:
+        """
+        Delete a batch of expired auth tokens.
+
+        :param batch_size: Max count of tokens to delete.
+        :return: Count of deleted tokens.
+        """
+        keys = AuthToken.objects.filter(expires_at__lte=timezone.now()).values_list("key", flat=True)[:batch_size]
+        deleted, _ = AuthToken.objects.filter(key__in=list(keys)).delete()
+        return deleted
+
+    def delete_expired_revoked_access_tokens(self, batch_size: int) -> int:
+        """
+        Delete a batch of expired access token revocations.
+
+        :param batch_size: Max count of revocations to delete.
+        :return: Count of deleted revocations.
+        """
+        token_ids = RevokedAccessToken.objects.filter(expires_at__lte=timezone.now()).values_list(
+            "token_id", flat=True
+        )[:batch_size]
+        deleted, _ = RevokedAccessToken.objects.filter(token_id__in=list(token_ids)).delete()
+        return deleted
@@ -1,5 +1,6 @@
 """Module with input serializers for `users/*` endpoints."""
 
+from django.conf import settings
 from rest_framework import serializers
 from base_idcu.serializers.base import BasicSerializer
 
@@ -21,11 +22,42 @@ class UserToLogin(BasicSerializer):
     password = serializers.CharField(write_only=True, allow_null=False, required=True)
 
 
+class UserToInvite(BasicSerializer):
+    """Serializer to input `User` details to invite."""
+
+    first_name = serializers.CharField(max_length=55, allow_null=False, required=True)
+    last_name = serializers.CharField(max_length=55, allow_null=False, required=True)
+    email = serializers.EmailField(allow_null=False, required=True)
+    phone_number = serializers.CharField(max_length=15, allow_null=False, required=True)
+
+
+class UsersToInvite(BasicSerializer):
+    """Serializer to input users to invite."""
+
+    users = serializers.ListField(
+        child=UserToInvite(),
+        allow_empty=False,
+        max_length=settings.USER_INVITE_MAX_USERS,
+    )
+
+
+class InviteToAccept(BasicSerializer):
+    """Serializer to input invite acceptance details."""
+
+    key = serializers.CharField(allow_null=False, required=True)
+    password = serializers.CharField(write_only=True, allow_null=False, required=True)
+
+
 class UserToFetch(BasicSerializer):
     """Serializer to input `User` details to be fetched."""
     pass
 
 
+class AccessTokenToFetch(BasicSerializer):
+    """Serializer to input signed access token request."""
+    pass
+
+
 class Ping(BasicSerializer):
     """Serializer to input for ping view."""
 
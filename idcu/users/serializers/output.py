@@ -17,8 +17,23 @@ class UserResponse(BasicSerializer):
     last_name = serializers.CharField()
     email = serializers.EmailField()
     phone_number = serializers.CharField()
-    token = serializers.CharField()
+    token = serializers.CharField(allow_null=True)
     attached_company = UserCompanyEntry(required=False, allow_null=True)
+    access_token = serializers.CharField(required=False)
+
+
+class UserInviteResponse(BasicSerializer):
+    """Serializer to output user invite."""
+
+    email = serializers.EmailField()
+    invite_url = serializers.CharField()
+    expires_at = serializers.DateTimeField()
+
+
+class AccessTokenResponse(BasicSerializer):
+    """Serializer to output signed access token."""
+
+    access_token = serializers.CharField()
 
 
 class PongResponse(BasicSerializer):
@@ -1,11 +1,17 @@
 """Service module for `users`."""
 
-from django.db import IntegrityError, transaction
-from rest_framework.authtoken.models import Token
+from django.conf import settings
+from django.db import IntegrityError
 
 from users import exceptions, models, repositories
 from companies.services import CompanyServices
-from users.lib import types
+from users.lib import passwords, types
+from users.lib.access_tokens import AccessToken, generate_access_token
+from companies.lib.types import Company
+from base_idcu.lib.transactions import read_only, read_write
+
+# Fields of the company attached to user responses (see `serializers.output.UserCompanyEntry`).
+ATTACHED_COMPANY_FIELDS = frozenset({"name"})
 
 
 class UserService:
@@ -15,7 +21,7 @@ class UserService:
         self.company_service = CompanyServices()
         self.user_repository = repositories.UserRepository()
 
-    @transaction.atomic
+    @read_write
     def create_user(
         self,
         first_name: str,
@@ -47,57 +53,177 @@ class UserService:
         except IntegrityError as exc:
             raise exceptions.UserCreationError(f"User with `{email}` or `{phone_number}` already exists!") from exc
 
-        return self._serialize_user(user)
+        token = self.user_repository.create_token(user=user)
+        return self._serialize_user(user=user, token=token)
+
+    @read_write
+    def invite_users(self, company_id: int | None, users: list[types.UserToInvite]) -> list[types.UserInvite]:
+        """
+        Create users attached to the company and invite them to set their password.
+
+        Users are created in bulk without password (and without token), so no hashing is done here.
+
+        :param company_id: Identifier of the company to attach users to.
+        :param users: Details of users to invite.
+        :return: Invites of created users.
+
+        :raises UserInviteError: If company is not provided or users already exist.
+        """
+        if company_id is None:
+            raise exceptions.UserInviteError("Users can be invited only to forwarder companies.")
+
+        emails = [user["email"] for user in users]
+        phone_numbers = [user["phone_number"] for user in users]
+        if len(set(emails)) != len(emails) or len(set(phone_numbers)) != len(phone_numbers):
+            raise exceptions.UserInviteError("Emails and phone numbers of invited users must be unique.")
+
+        existing_users = self.user_repository.get_users_by_emails_or_phone_numbers(
+            emails=emails,
+            phone_numbers=phone_numbers,
+        )
+        if existing_users:
+            raise exceptions.UserInviteError(
+                f"Users already exist: {', '.join(user.email for user in existing_users)}."
+            )
+
+        try:
+            created_users = self.user_repository.create_invited_users(company_id=company_id, users=users)
+        except IntegrityError as exc:
+            raise exceptions.UserInviteError("Invited users already exist.") from exc
+
+        invites = self.user_repository.create_user_invites(users=created_users)
+        return [self._serialize_invite(invite) for invite in invites]
 
-    @transaction.atomic
-    def fetch_user_with_company(self, user: models.TRSUser) -> types.User:
+    @read_write
+    def accept_invite(self, key: str, password: str) -> types.User:
         """
-        Fetch user.
+        Set password of invited user and issue a token.
 
+        :param key: Invite key.
+        :param password: <PASSWORD>.
+        :return: Serialized user.
+
+        :raises InviteNotFoundError: If invite doesn't exist or is expired.
+        :raises PasswordCheckUnavailableError: If password hashing pool is full.
+        """
+        invite = self.user_repository.get_invite_by_key(key=key)
+        if invite is None or invite.is_expired:
+            raise exceptions.InviteNotFoundError()
+
+        user = invite.user
+        self.user_repository.update_user_password_hash(user=user, encoded=passwords.hash_password(password))
+        self.user_repository.delete_invite(invite=invite)
+
+        token = self.user_repository.create_token(user=user)
+        return self._serialize_user(user=user, token=token, with_access_token=True)
+
+    @read_only
+    async def afetch_user_with_company(
+        self,
+        user: models.TRSUser,
+        token: models.AuthToken | AccessToken | None,
+    ) -> types.User:
+        """
+        Fetch user with the attached company.
+
+        :param user: `models.TRSUser` instance.
+        :param token: Token the request is authenticated with, None for session authentication.
         :return: Serialized `models.TRSUser` instance.
+
+        :raises UserDoesntExistError: If user of the access token doesn't exist.
         """
-        return self._serialize_user(user=user, fetch_company_details=True)
+        if isinstance(token, AccessToken):
+            # Users authenticated with access tokens are built from token claims only.
+            user = await self.user_repository.aget_user_with_company_by_id(user_id=user.id)
+            if user is None:
+                raise exceptions.UserDoesntExistError()
 
-    def login_user(self, email: str, password: str):
+        company = await self.company_service.afetch_forwarder_company_for_user(
+            user=user,
+            fields=ATTACHED_COMPANY_FIELDS,
+        )
+
+        return self._serialize_user(user=user, token=token, company=company)
+
+    async def alogin_user(self, email: str, password: str) -> types.User:
         """
-        Fetch user by email.
+        Fetch user by credentials and issue a new token.
+
+        Password hash is upgraded, if it's not made with the preferred hasher.
 
         :param email: User's email.
         :param password: User's password.
         :return: Serialized user.
 
-        :raises UserDoesntExistError: If user doesn't exist.
+        :raises UserDoesntExistError: If user doesn't exist or password is invalid.
+        :raises PasswordCheckUnavailableError: If password hashing pool is full.
         """
-        user = self.user_repository.get_user_by_credentials(email=email, password=password)
-        if user is None:
+        user = await self.user_repository.aget_user_by_email(email=email)
+        is_valid, new_encoded = await passwords.averify_password(password, user.password if user else None)
+        if not is_valid:
             raise exceptions.UserDoesntExistError("Invalid credentials provided.")
 
-        return self._serialize_user(user=user)
+        if new_encoded is not None:
+            await self.user_repository.aupdate_user_password_hash(user=user, encoded=new_encoded)
 
-    def _serialize_user(self, user: models.TRSUser, fetch_company_details: bool = False) -> types.User:
+        token = await self.user_repository.acreate_token(user=user)
+        return self._serialize_user(user=user, token=token, with_access_token=True)
+
+    def fetch_access_token(self, token: models.AuthToken) -> types.AccessTokenResponse:
         """
-        Serialize `models.User` instance.
+        Issue a new signed access token.
 
-        :param user: `models.User` instance.
-        :return: Serialized `models.User` instance.
+        :param token: Auth token the request is authenticated with.
+        :return: Signed access token.
+
+        :raises AccessTokenError: If signed access tokens are disabled.
         """
-        token = self.user_repository.get_or_create_token(user=user)
+        if not settings.ACCESS_TOKENS_ENABLED:
+            raise exceptions.AccessTokenError("Signed access tokens are disabled.")
+
+        return {"access_token": generate_access_token(token)}
 
-        if fetch_company_details:
-            company = self.company_service.fetch_forwarder_company_for_user(user=user)
-            return {
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "phone_number": user.phone_number,
-                "email": user.email,
-                "token": token.key,
-                "attached_company": company,
-            }
+    def _serialize_invite(self, invite: models.UserInvite) -> types.UserInvite:
+        """
+        Serialize `models.UserInvite` instance.
 
+        :param invite: `models.UserInvite` instance.
+        :return: Serialized `models.UserInvite` instance.
+        """
         return {
+            "email": invite.user.email,
+            "invite_url": settings.USER_INVITE_URL.format(key=invite.key),
+            "expires_at": invite.expires_at,
+        }
+
+    def _serialize_user(
+        self,
+        user: models.TRSUser,
+        token: models.AuthToken | AccessToken | None,
+        company: Company | None = None,
+        with_access_token: bool = False,
+    ) -> types.User:
+        """
+        Serialize `models.User` instance.
+
+        :param user: `models.User` instance.
+        :param token: User's auth token, if any. Only `AuthToken` keys are returned.
+        :param company: Serialized company attached to user, if requested.
+        :param with_access_token: Whether to issue signed access token for the auth token (if enabled).
+        :return: Serialized `models.User` instance.
+        """
+        serialized_user: types.User = {
             "first_name": user.first_name,
             "last_name": user.last_name,
             "phone_number": user.phone_number,
             "email": user.email,
-            "token": token.key,
+            # Signed access tokens aren't returned as the auth token.
+            "token": token.key if isinstance(token, models.AuthToken) else None,
         }
+        if company is not None:
+            serialized_user["attached_company"] = company
+
+        if with_access_token and settings.ACCESS_TOKENS_ENABLED:
+            serialized_user["access_token"] = generate_access_token(token)
+
+        return serialized_user
@@ -0,0 +1,113 @@
+"""Signal handlers for `users` models."""
+
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from base_idcu.base_authentication import invalidate_cached_tokens
+from companies.models import Company, Iban
+from users.lib.access_tokens import revoke_access_tokens
+from users.models import AuthToken, TRSUser
+
+
+@receiver(post_delete, sender=AuthToken)
+def invalidate_deleted_token(sender, instance: AuthToken, **kwargs) -> None:
+    """Drop deleted token from authentication cache once the transaction is committed and revoke its access tokens."""
+    invalidate_cached_tokens_on_commit([instance.key])
+    if settings.ACCESS_TOKENS_ENABLED:
+        revoke_access_tokens([instance])
+
+
+@receiver(post_save, sender=TRSUser)
+@receiver(pre_delete, sender=TRSUser)
+def invalidate_user_tokens(sender, instance: TRSUser, **kwargs) -> None:
+    """Drop tokens of changed user from authentication cache once the transaction is committed."""
+    invalidate_cached_tokens_on_commit(list(AuthToken.objects.filter(user=instance).values_list("key", flat=True)))
+
+
+@receiver(post_save, sender=TRSUser)
+def revoke_user_access_tokens(sender, instance: TRSUser, created: bool, **kwargs) -> None:
+    """Revoke access tokens of the user, if user's company or active state (embedded in access tokens) changed."""
+    access_claims = (instance.company_id, instance.is_active)
+    loaded_access_claims = getattr(instance, "_loaded_access_claims", access_claims)
+    instance._loaded_access_claims = access_claims
+
+    if settings.ACCESS_TOKENS_ENABLED and not created and access_claims != loaded_access_claims:
+        revoke_access_tokens(list(AuthToken.objects.filter(user=instance)))
+
+
+def invalidate_cached_tokens_on_commit(keys: list[str]) -> None:
+    """
+    Drop tokens from authentication cache once the transaction is committed.
+
+    Tokens dropped before the commit could be cached again by concurrent requests, with the data before the change.
+
+    :param keys: Token keys to drop.
+    """
+    if keys:
+        transaction.on_commit(partial(invalidate_cached_tokens, keys))
+
+
+class _CommitInvalidations(threading.local):
+    """Companies of the thread, whose tokens were invalidated by the commit being run."""
+
+    def __init__(self) -> None:
+        self.company_ids: set[int] | None = None
+
+
+_commit_invalidations = _CommitInvalidations()
+
+
+def invalidate_company_tokens_on_commit(company_id: int) -> None:
+    """
+    Drop tokens of company's users from authentication cache once the transaction is committed.
+
+    Callbacks of a transaction share a set of invalidated companies, so changes of the company and its IBANs
+    within one transaction invalidate the tokens once. The set is only filled by callbacks run on commit and
+    is detached by the first of them, so nothing of rolled back transactions is kept.
+
+    :param company_id: Company identifier.
+    """
+    if _commit_invalidations.company_ids is None:
+        _commit_invalidations.company_ids = set()
+    invalidated_company_ids = _commit_invalidations.company_ids
+
+    def invalidate() -> None:
+        # Transactions after this commit get a new set.
+        _commit_invalidations.company_ids = None
+        if company_id in invalidated_company_ids:
+            return
+        invalidated_company_ids.add(company_id)
+        invalidate_cached_tokens(list(AuthToken.objects.filter(user__company_id=company_id).values_list("key", flat=True)))
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_tokens(sender, instance: Company, **kwargs) -> None:
+    """Drop tokens of changed company's users from authentication cache."""
+    invalidate_company_tokens_on_commit(instance.id)
+
+
+@receiver(pre_delete, sender=Company)
+def invalidate_deleted_company_tokens(sender, instance: Company, **kwargs) -> None:
+    """Drop tokens of deleted company's users from authentication cache, users are detached without signals."""
+    invalidate_cached_tokens_on_commit(list(AuthToken.objects.filter(user__company=instance).values_list("key", flat=True)))
+
+
+@receiver(pre_delete, sender=Company)
+def revoke_company_access_tokens(sender, instance: Company, **kwargs) -> None:
+    """Revoke access tokens of deleted company's users, users are detached from the company without signals."""
+    if settings.ACCESS_TOKENS_ENABLED:
+        revoke_access_tokens(list(AuthToken.objects.filter(user__company=instance)))
+
+
+@receiver(post_save, sender=Iban)
+@receiver(post_delete, sender=Iban)
+def invalidate_iban_company_tokens(sender, instance: Iban, **kwargs) -> None:
+    """Drop tokens of changed IBAN company's users from authentication cache."""
+    invalidate_company_tokens_on_commit(instance.company_id)
@@ -0,0 +1,300 @@
+"""Tests of `users` endpoints and signals."""
+
+import json
+import time
+from pathlib import Path
+from unittest import mock
+
+import fakeredis
+
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.crypto import salted_hmac
+
+from base_idcu.base_authentication import token_cache
+from base_idcu.lib import throttling
+from base_idcu.lib.cache import MISSING
+from base_idcu.lib.throttling import LocalTokenBucketStore, RedisTokenBucketStore
+from base_idcu.base_testing import QueryCountSnapshotMixin
+from companies.lib.enum import CompanyParty
+from companies.models import Company
+from users import signals
+from users.exceptions import AccessTokenError
+from users.lib import access_tokens
+from users.lib.access_tokens import generate_access_token, parse_access_token, revoke_access_tokens
+from users.models import AuthToken, TRSUser
+
+
+class UserEndpointsTest(QueryCountSnapshotMixin, TestCase):
+    """Query counts of user endpoints, with cold caches."""
+
+    query_snapshot_path = Path(__file__).with_name("query_counts.json")
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        company = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=company)
+        cls.auth_headers = {"Authorization": f"Token {AuthToken.objects.create(user=user).key}"}
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+
+    def test_login_user(self):
+        with self.assertQueryCountSnapshot("login-user"):
+            response = self.client.post(
+                "/users/login-user", {"email": "a@a.com", "password": "pw"}, content_type="application/json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_deletes_oldest_tokens(self):
+        old_token = AuthToken.objects.get()
+        self.client.get("/users/get-user-info", headers=self.auth_headers)
+
+        with self.settings(AUTH_TOKENS_PER_USER=2), self.captureOnCommitCallbacks(execute=True):
+            keys = [
+                self.client.post(
+                    "/users/login-user", {"email": "a@a.com", "password": "pw"}, content_type="application/json"
+                ).json()["token"]
+                for _ in range(2)
+            ]
+
+        self.assertEqual(set(AuthToken.objects.values_list("key", flat=True)), set(keys))
+        self.assertIs(token_cache.get(old_token.key), MISSING)
+        self.assertEqual(self.client.get("/users/get-user-info", headers=self.auth_headers).status_code, 403)
+        for key in keys:
+            response = self.client.get("/users/get-user-info", headers={"Authorization": f"Token {key}"})
+            self.assertEqual(response.status_code, 200)
+
+    def test_get_user_info(self):
+        with self.assertQueryCountSnapshot("get-user-info"):
+            response = self.client.get("/users/get-user-info", headers=self.auth_headers)
+
+        self.assertEqual(response.status_code, 200)
+
+
+class TokenCacheInvalidationTest(TestCase):
+    """Cached tokens are dropped once changes of their users and companies are committed."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.company = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        cls.user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=cls.company)
+        cls.token = AuthToken.objects.create(user=cls.user)
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        token_cache.local.clear()
+        self.client.get("/users/get-user-info", headers={"Authorization": f"Token {self.token.key}"})
+        self.assertIsNot(token_cache.get(self.token.key), MISSING)
+
+    def test_user_change_invalidates_token_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Changed"
+            self.user.save()
+            self.assertIsNot(token_cache.get(self.token.key), MISSING)
+
+        self.assertIs(token_cache.get(self.token.key), MISSING)
+
+    def test_company_changes_invalidate_token_once(self):
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.company.address = "Tbilisi"
+            self.company.save()
+            self.company.save()
+            self.assertIsNot(token_cache.get(self.token.key), MISSING)
+
+        self.assertIs(token_cache.get(self.token.key), MISSING)
+        self.assertEqual(len([query for query in queries if '"users_authtoken"' in query["sql"]]), 1)
+        self.assertIsNone(signals._commit_invalidations.company_ids)
+
+    def test_rolled_back_company_change_keeps_token(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.company.save()
+                    raise RuntimeError("rollback")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertIsNot(token_cache.get(self.token.key), MISSING)
+        self.assertFalse(signals._commit_invalidations.company_ids)
+
+
+@override_settings(ACCESS_TOKENS_ENABLED=True, ACCESS_TOKEN_KEYS=["new:new-secret", "old:old-secret"])
+class AccessTokenTest(TestCase):
+    """Signed access tokens issued for `AuthToken`s."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.company = Company.objects.create(name="FW", party_type=CompanyParty.FORWARDER.name, vat_number="111")
+        cls.other_company = Company.objects.create(name="SH", party_type=CompanyParty.SHIPPER.name, vat_number="222")
+        cls.user = TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw", company=cls.company)
+        AuthToken.objects.create(user=cls.user)
+
+    def setUp(self) -> None:
+        caches["default"].clear()
+        access_tokens.revoked_tokens_cache.local.clear()
+        self.auth_token = AuthToken.objects.select_related("user").get()
+
+    def assertRejected(self, value: str, message: str) -> None:
+        with self.assertRaisesMessage(AccessTokenError, message):
+            parse_access_token(value)
+
+    def test_token_is_signed(self):
+        value = generate_access_token(self.auth_token)
+        key_id, payload, signature = value.split(".")
+
+        self.assertEqual(key_id, "new")
+        expected = salted_hmac(access_tokens.SALT, f"new.{payload}", secret="new-secret", algorithm="sha256")
+        self.assertEqual(access_tokens._b64decode(signature), expected.digest())
+        token = parse_access_token(value)
+        self.assertEqual((token.user_id, token.company_id), (self.user.id, self.company.id))
+
+        claims = {**json.loads(access_tokens._b64decode(payload)), "cid": self.other_company.id}
+        forged_payload = access_tokens._b64encode(json.dumps(claims).encode())
+        self.assertRejected(f"new.{forged_payload}.{signature}", "Invalid access token signature.")
+        self.assertRejected(f"old.{payload}.{signature}", "Invalid access token signature.")
+
+    def test_rotated_keys(self):
+        with self.settings(ACCESS_TOKEN_KEYS=["old:old-secret"]):
+            old_value = generate_access_token(self.auth_token)
+
+        # The old key is still accepted after the rotation.
+        self.assertEqual(parse_access_token(old_value).user_id, self.user.id)
+        # Tokens signed with removed keys are rejected.
+        with self.settings(ACCESS_TOKEN_KEYS=["new:new-secret"]):
+            self.assertRejected(old_value, "Invalid access token signature.")
+        _, payload, signature = old_value.split(".")
+        self.assertRejected(f"unknown.{payload}.{signature}", "Invalid access token signature.")
+
+    def test_token_expires(self):
+        value = generate_access_token(self.auth_token)
+
+        with self.settings(ACCESS_TOKEN_TTL=60):
+            short_lived_value = generate_access_token(self.auth_token)
+        with mock.patch.object(access_tokens.time, "time", return_value=time.time() + 61):
+            self.assertEqual(parse_access_token(value).user_id, self.user.id)
+            self.assertRejected(short_lived_value, "Access token expired.")
+
+    def test_token_is_revoked_with_company_change(self):
+        value = generate_access_token(self.auth_token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = TRSUser.objects.get(id=self.user.id)
+            user.company = self.other_company
+            user.save()
+
+        self.assertRejected(value, "Access token revoked.")
+        # Tokens issued after the change carry the new company.
+        auth_token = AuthToken.objects.select_related("user").get()
+        self.assertEqual(parse_access_token(generate_access_token(auth_token)).company_id, self.other_company.id)
+
+    def test_token_is_revoked_with_deactivation(self):
+        value = generate_access_token(self.auth_token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = TRSUser.objects.get(id=self.user.id)
+            user.is_active = False
+            user.save()
+
+        self.assertRejected(value, "Access token revoked.")
+
+    def test_unrelated_user_change_doesnt_revoke(self):
+        value = generate_access_token(self.auth_token)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            user = TRSUser.objects.get(id=self.user.id)
+            user.first_name = "A"
+            user.save()
+
+        self.assertEqual(parse_access_token(value).user_id, self.user.id)
+
+    def test_revoked_tokens_are_cached(self):
+        value = generate_access_token(self.auth_token)
+        with self.captureOnCommitCallbacks(execute=True):
+            revoke_access_tokens([self.auth_token])
+
+        self.assertRejected(value, "Access token revoked.")
+        with self.assertNumQueries(0):
+            self.assertRejected(value, "Access token revoked.")
+
+
+class RedisTokenBucketStoreTest(SimpleTestCase):
+    """Token buckets in Redis, with an in-memory stand-in server running the Lua script."""
+
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis()
+        self.store = RedisTokenBucketStore(client=self.client)
+
+    def test_bucket_rejects_over_capacity(self):
+        waits = [self.store.consume(key="bucket", capacity=2, refill_rate=1) for _ in range(3)]
+
+        self.assertEqual(waits[:2], [0, 0])
+        self.assertGreater(waits[2], 0)
+        self.assertLessEqual(waits[2], 1)
+        self.assertEqual(self.store.consume(key="other", capacity=2, refill_rate=1), 0)
+        self.assertGreater(self.client.ttl("bucket"), 0)
+
+    def test_bucket_is_refilled(self):
+        for _ in range(2):
+            self.store.consume(key="bucket", capacity=2, refill_rate=1)
+        updated_at = float(self.client.hget("bucket", "updated_at"))
+        # A second passed since the bucket was emptied.
+        self.client.hset("bucket", "updated_at", str(updated_at - 1))
+
+        self.assertEqual(self.store.consume(key="bucket", capacity=2, refill_rate=1), 0)
+        self.assertGreater(self.store.consume(key="bucket", capacity=2, refill_rate=1), 0)
+
+    def test_unavailable_server_doesnt_throttle(self):
+        client = mock.Mock()
+        client.register_script.return_value.side_effect = ConnectionError()
+        store = RedisTokenBucketStore(client=client)
+
+        with self.assertLogs("base_idcu.lib.throttling", level="ERROR"):
+            self.assertEqual(store.consume(key="bucket", capacity=1, refill_rate=1), 0)
+
+
+@mock.patch("base_idcu.lib.throttling.time.monotonic")
+class LoginThrottleTest(TestCase):
+    """Token bucket throttles of `login-user`, with a fresh local store."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        TRSUser.objects.create_user(username="a@a.com", email="a@a.com", password="pw")
+
+    def setUp(self) -> None:
+        store_patcher = mock.patch.object(throttling, "_store", LocalTokenBucketStore())
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+        rates = self.settings(THROTTLE_RATES={"login_ip": "100/min", "login_email": "2/min"})
+        rates.enable()
+        self.addCleanup(rates.disable)
+
+    def login(self, email: str = "a@a.com"):
+        return self.client.post("/users/login-user", {"email": email, "password": "pw"}, content_type="application/json")
+
+    def test_login_over_limit_is_rejected_before_db_queries(self, monotonic):
+        monotonic.return_value = 1000.0
+        self.assertEqual([self.login().status_code for _ in range(2)], [200, 200])
+
+        with self.assertNumQueries(0):
+            response = self.login(email=" A@a.com ")
+
+        self.assertEqual(response.status_code, 429)
+        # A token is added every 30 seconds.
+        self.assertEqual(response.headers["Retry-After"], "30")
+
+    def test_bucket_is_refilled(self, monotonic):
+        monotonic.return_value = 1000.0
+        for _ in range(2):
+            self.login()
+
+        monotonic.return_value = 1029.0
+        self.assertEqual(self.login().status_code, 429)
+        monotonic.return_value = 1030.0
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login().status_code, 429)
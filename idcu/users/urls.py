@@ -7,5 +7,8 @@ urlpatterns = [
     path('get-user-info', users.UserView.as_view(), name='fetch-user'),
     path('create-user', users.UserCreateView.as_view(), name='create-user'),
     path('login-user', users.UserLoginView.as_view(), name='login-user'),
+    path('invite-users', users.InviteUsersView.as_view(), name='invite-users'),
+    path('accept-invite', users.AcceptInviteView.as_view(), name='accept-invite'),
+    path('refresh-access-token', users.AccessTokenView.as_view(), name='refresh-access-token'),
     path('ping-view', users.PingView.as_view(), name='ping'),
 ]
@@ -1,10 +1,12 @@
 """Base views for `users` view."""
 
 from rest_framework.views import APIView
+
+from base_idcu.lib.container import RequestScoped
 from users.services import UserService
 
 
 class BaseUserView(APIView):
     """Base user view."""
 
-    service_class = UserService()
+    service_class = RequestScoped(UserService)
@@ -2,82 +2,180 @@
 
 from typing import Any
 
+from base_idcu.base_authentication import AUTHENTICATION_CLASSES, READ_AUTHENTICATION_CLASSES, CachedTokenAuthentication
+from base_idcu.base_throttling import THROTTLE_CLASSES, IPTokenBucketThrottle
+from base_idcu.lib.queries import query_budget
 from base_idcu.views.base import IDCUView
 from users.views.base import BaseUserView
-from users.serializers.output import UserResponse, PongResponse
-from users.serializers.input import UserToCreate, UserToLogin, UserToFetch, Ping
-
-from rest_framework.decorators import authentication_classes, permission_classes
-from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from users.serializers.output import AccessTokenResponse, UserInviteResponse, UserResponse, PongResponse
+from users.serializers.input import (
+    AccessTokenToFetch,
+    InviteToAccept,
+    Ping,
+    UserToCreate,
+    UserToFetch,
+    UserToLogin,
+    UsersToInvite,
+)
+
+from rest_framework.decorators import authentication_classes, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 
 
+@authentication_classes([])
+@throttle_classes(THROTTLE_CLASSES)
+@query_budget(7)
 class UserCreateView(BaseUserView, IDCUView):
     """Handles request to the `users/create-user/` endpoint."""
 
     http_method_names = ['post']
+    throttle_scope = 'create_user'
     in_serializer_cls = UserToCreate
+    out_serializer_cls = UserResponse
 
-    def process_request(self, request_params: Any) -> UserResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `user/create-user/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
         response_data = self.service_class.create_user(**request_params)
 
-        return UserResponse(response_data).data
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(READ_AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(5)
 class UserView(BaseUserView, IDCUView):
     """Handles request to the `users/get-user-info/` endpoint."""
 
     http_method_names = ['get']
+    read_only = True
     in_serializer_cls = UserToFetch
+    out_serializer_cls = UserResponse
 
-    def process_request(self, request_params: Any) -> UserResponse:
+    async def process_request(self, request_params: Any) -> dict:
         """
         process request for `user/get-user-info/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
         """
-        user = self.request.user
-        response_data = self.service_class.fetch_user_with_company(user=user)
+        response_data = await self.service_class.afetch_user_with_company(user=self.request.user, token=self.request.auth)
 
-        return UserResponse(response_data).data
+        return response_data
 
 
+@authentication_classes([])
+@throttle_classes(THROTTLE_CLASSES)
+@query_budget(5)
 class UserLoginView(BaseUserView, IDCUView):
     """Handles request to the `users/login-user/` endpoint."""
 
     http_method_names = ['post']
+    throttle_scope = 'login'
     in_serializer_cls = UserToLogin
+    out_serializer_cls = UserResponse
 
-    def process_request(self, request_params: Any) -> UserResponse:
+    async def process_request(self, request_params: Any) -> dict:
         """
         process request for `user/login-user/` endpoint.
 
         :param request_params: Request parameters.
-        :return: Serialized response.
+        :return: Response data.
+        """
+        response_data = await self.service_class.alogin_user(**request_params)
+
+        return response_data
+
+
+@authentication_classes(AUTHENTICATION_CLASSES)
+@permission_classes([IsAuthenticated])
+class InviteUsersView(BaseUserView, IDCUView):
+    """Handles request to the `users/invite-users/` endpoint."""
+
+    http_method_names = ['post']
+    in_serializer_cls = UsersToInvite
+    out_serializer_cls = UserInviteResponse
+    out_serializer_kwargs = {"many": True}
+
+    def process_request(self, request_params: Any) -> list[dict]:
+        """
+        process request for `user/invite-users/` endpoint.
+
+        Creates users attached to the request user's company and returns their invite links.
+
+        :param request_params: Request parameters.
+        :return: Response data.
+        """
+        response_data = self.service_class.invite_users(
+            company_id=self.request.user.company_id,
+            users=request_params["users"],
+        )
+
+        return response_data
+
+
+@authentication_classes([])
+@throttle_classes([IPTokenBucketThrottle])
+@query_budget(6)
+class AcceptInviteView(BaseUserView, IDCUView):
+    """Handles request to the `users/accept-invite/` endpoint."""
+
+    http_method_names = ['post']
+    in_serializer_cls = InviteToAccept
+    throttle_scope = 'accept_invite'
+    out_serializer_cls = UserResponse
+
+    def process_request(self, request_params: Any) -> dict:
+        """
+        process request for `user/accept-invite/` endpoint.
+
+        :param request_params: Request parameters.
+        :return: Response data.
+        """
+        response_data = self.service_class.accept_invite(**request_params)
+
+        return response_data
+
+
+@authentication_classes([CachedTokenAuthentication])
+@permission_classes([IsAuthenticated])
+@query_budget(3)
+class AccessTokenView(BaseUserView, IDCUView):
+    """Handles request to the `users/refresh-access-token/` endpoint."""
+
+    http_method_names = ['post']
+    in_serializer_cls = AccessTokenToFetch
+    out_serializer_cls = AccessTokenResponse
+
+    def process_request(self, request_params: Any) -> dict:
+        """
+        process request for `user/refresh-access-token/` endpoint.
+
+        Issues a new signed access token for the auth token of the request.
+
+        :param request_params: Request parameters.
+        :return: Response data.
         """
-        response_data = self.service_class.login_user(**request_params)
+        response_data = self.service_class.fetch_access_token(token=self.request.auth)
 
-        return UserResponse(response_data).data
+        return response_data
 
 
-@authentication_classes([SessionAuthentication, TokenAuthentication])
+@authentication_classes(AUTHENTICATION_CLASSES)
 @permission_classes([IsAuthenticated])
+@query_budget(3)
 class PingView(BaseUserView, IDCUView):
     """Handles request to the `users/ping/` endpoint."""
 
     http_method_names = ['post']
     in_serializer_cls = Ping
+    out_serializer_cls = None
 
-    def process_request(self, request_params: Any) -> PongResponse:
+    def process_request(self, request_params: Any) -> dict:
         """
         process request for `user/ping/` endpoint.
 